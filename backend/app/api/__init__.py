@@ -2,6 +2,7 @@ from fastapi import APIRouter
 from .routes_email import router as email_router
 from .routes_chatbot import router as chatbot_router
 from .reindex_routes import router as reindex_router
+from .routes_health import router as health_router
 
 
 main_router = APIRouter()
@@ -9,6 +10,7 @@ main_router = APIRouter()
 main_router.include_router(email_router)
 main_router.include_router(chatbot_router)
 main_router.include_router(reindex_router)
+main_router.include_router(health_router)
 
 
 __all__ = [
@@ -1,20 +1,31 @@
+import hmac
 import logging
+from typing import Optional
 
-from fastapi import APIRouter, Form, HTTPException
+from fastapi import APIRouter, Body, Form, Header, HTTPException
 from fastapi.responses import HTMLResponse
 
 from app.core.config import settings
-from app.services.rag.cms_service import cms
-from app.services.rag.embedding_document_store import EmbeddingDocumentStore
+from app.models.reindex_job import ReindexJob
+from app.services.rag.cms_scheduler import cms_scheduler
+from app.services.rag.cms_service import CMS_TABLES, find_table
+from app.services.rag.cms_webhook import cms_webhook
+from app.services.rag.components import embedding_store
+from app.services.rag.reindex_jobs import reindex_jobs
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/rag", tags=["rag"])
-embedding_db = EmbeddingDocumentStore()
 
 # Admin password (store in environment variable for security)
 ADMIN_PASSWORD = settings.ADMIN_PASSWORD
 
+# Secret configured in the Strapi webhook headers, None to disable the webhook
+CMS_WEBHOOK_SECRET = settings.CMS_WEBHOOK_SECRET
+
+# Strapi events changing the content of an entry
+ENTRY_EVENTS = {"entry.create", "entry.update", "entry.delete", "entry.publish", "entry.unpublish"}
+
 
 @router.get("/reindex", response_class=HTMLResponse)
 async def reindex_form():
@@ -34,37 +45,186 @@ async def reindex_form():
             <form action="/rag/reindex" method="post">
                 <label for="password">Admin Password:</label>
                 <input type="password" id="password" name="password" required>
+                <label for="delta">Only changes since last sync:</label>
+                <input type="checkbox" id="delta" name="delta" value="true">
+                <label for="rebuild">Rebuild into a new collection:</label>
+                <input type="checkbox" id="rebuild" name="rebuild" value="true">
+                <label for="tables">Only these tables:</label>
+                <input type="text" id="tables" name="tables" placeholder="{', '.join(table.route for table in CMS_TABLES)}">
                 <button type="submit">Reindex</button>
             </form>
+            <h2>Rollback</h2>
+            <form action="/rag/rollback" method="post">
+                <label for="rollback-password">Admin Password:</label>
+                <input type="password" id="rollback-password" name="password" required>
+                <button type="submit">Serve the previous collection</button>
+            </form>
         </body>
     </html>
     """
     return HTMLResponse(content=html_content)
 
 
-@router.post("/reindex")
-async def reindex_post(password: str = Form(...)):
+@router.post("/reindex", status_code=202)
+async def reindex_post(
+        password: str = Form(...),
+        delta: bool = Form(False),
+        rebuild: bool = Form(False),
+        tables: str = Form("")
+):
     """
-    Perform CMS documents reindexing after verifying admin password.
+    Queue a CMS documents reindexing after verifying admin password.
+
+    The reindex runs in a background worker, one job at a time, and the job ID is returned
+    immediately; its progress is available at `/rag/reindex/jobs/{job_id}`. Triggers
+    arriving while a job of the same mode is already queued are coalesced into it.
+
+    Only new or changed chunks are embedded, and chunks of removed documents are deleted.
+    The collection is never cleared, so the chatbot keeps answering during the reindex.
+
+    In delta mode, only documents modified in the CMS since the previous delta sync
+    are downloaded, plus an ID-only listing to detect deletions.
+
+    In rebuild mode, every document is re-embedded into a new collection, which replaces
+    the live one only once validated. The replaced collection is kept for rollback.
+
+    When tables are given, only those tables are fetched (in parallel) and synced,
+    and the chunks of the other tables are left untouched.
 
     Args:
         password (str): Admin password submitted via the form.
+        delta (bool): Fetch only the CMS changes since the previous delta sync.
+        rebuild (bool): Re-embed everything into a new collection and swap it live.
+        tables (str): Comma-separated routes of the tables to sync, all tables when empty.
 
     Returns:
-        dict: Status message and number of indexed document chunks.
+        dict: Job ID, job status and number of triggers coalesced into the job.
 
     Raises:
-        HTTPException: If the password is incorrect (401 Unauthorized).
+        HTTPException: If the password is incorrect (401 Unauthorized), or if a
+            table is unknown (422).
     """
     # Verify admin password
     if password != ADMIN_PASSWORD:
         raise HTTPException(status_code=401, detail="Unauthorized")
 
-    embedding_db.clear_collection()
+    routes = [route.strip() for route in tables.split(",") if route.strip()]
+    unknown = [route for route in routes if find_table(route) is None]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Unknown tables: {', '.join(unknown)}")
+
+    if routes:
+        job = reindex_jobs.submit("tables", tables=[find_table(route).route for route in routes])
+    else:
+        job = reindex_jobs.submit("rebuild" if rebuild else "delta" if delta else "full")
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "mode": job.mode,
+        "requests": job.requests,
+        "status_url": f"/rag/reindex/jobs/{job.id}",
+    }
+
+
+@router.get("/reindex/jobs/{job_id}", response_model=ReindexJob)
+async def reindex_job_status(job_id: str):
+    """
+    Get the progress of a reindex job.
+
+    Args:
+        job_id (str): Job ID returned when the reindex was queued.
+
+    Returns:
+        ReindexJob: Status, current phase, per-phase timings, chunk throughput,
+            and the chunk changes or the error once finished.
+
+    Raises:
+        HTTPException: If the job is unknown or was dropped from the history (404).
+    """
+    job = reindex_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown reindex job")
+    return job
+
+
+@router.get("/reindex/tables")
+async def reindex_tables():
+    """
+    Get the indexed tables with their refresh schedule and the metrics of their last sync.
+
+    Returns:
+        dict: Refresh interval, seconds until the next scheduled refresh and
+            last per-table sync (fetch and sync durations, documents, chunk changes, error), by route.
+    """
+    return cms_scheduler.stats()
+
+
+@router.post("/cms-webhook", status_code=202)
+async def cms_webhook_post(payload: dict = Body(...), authorization: Optional[str] = Header(None)):
+    """
+    Receive a Strapi entry webhook and reindex only the changed entry.
+
+    The entry is added to a debounced batch: once the CMS edits settle, a background job
+    refetches each changed entry and re-embeds only its chunks (aggregated tables and single
+    types are refetched whole). Deleted or unpublished entries have their chunks removed.
+
+    Args:
+        payload (dict): Strapi webhook body, with "event", "model" and "entry".
+        authorization (Optional[str]): Webhook secret, as "Bearer <secret>" or raw.
+
+    Returns:
+        dict: "queued" with the entry, or "ignored" for events and models that are not indexed.
+
+    Raises:
+        HTTPException: If no webhook secret is configured (404), if the secret is incorrect
+            (401 Unauthorized), or if the entry has no document ID (422).
+    """
+    if not CMS_WEBHOOK_SECRET:
+        raise HTTPException(status_code=404, detail="CMS webhook is not enabled")
+
+    token = (authorization or "").removeprefix("Bearer ").strip()
+    if not hmac.compare_digest(token.encode(), CMS_WEBHOOK_SECRET.encode()):
+        raise HTTPException(status_code=401, detail="Unauthorized")
+
+    event = payload.get("event")
+    table = find_table(payload.get("uid") or payload.get("model") or "")
+    if event not in ENTRY_EVENTS or table is None:
+        return {"status": "ignored", "event": event, "model": payload.get("model")}
+
+    document_id = (payload.get("entry") or {}).get("documentId")
+    if not document_id:
+        raise HTTPException(status_code=422, detail="Missing entry documentId")
+
+    cms_webhook.notify(table.route, document_id)
+    logger.info(f"🪝 CMS webhook {event} on {table.route}/{document_id}")
+    return {"status": "queued", "event": event, "entry": f"{table.route}/{document_id}"}
+
+
+@router.post("/rollback")
+async def rollback_post(password: str = Form(...)):
+    """
+    Serve the collection that was live before the last rebuild again.
+
+    Args:
+        password (str): Admin password submitted via the form.
+
+    Returns:
+        dict: Status message and the name of the collection now live.
+
+    Raises:
+        HTTPException: If the password is incorrect (401 Unauthorized), if a rebuild
+            is running (409 Conflict) or if there is no previous collection (404).
+    """
+    if password != ADMIN_PASSWORD:
+        raise HTTPException(status_code=401, detail="Unauthorized")
 
-    # Fetch all documents from CMS and index them in the vector store
-    documents = cms.fetch_all()
-    nb_chunks = embedding_db.add_documents(documents)
+    embedding_db = await embedding_store.aget()
+    try:
+        live = embedding_db.rollback_collection()
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-    logger.info(f"Reindexed {nb_chunks} document chunks.")
-    return {"status": "success", "indexed_documents": nb_chunks}
+    logger.info(f"Rolled back to collection '{live}'.")
+    return {"status": "success", "live_collection": live}
@@ -1,18 +1,17 @@
+import json
 import logging
 
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from app.services.rag.embedding_document_store import EmbeddingDocumentStore
-from app.services.rag.rag_pipeline import RAGPipeline
+from app.services.rag.components import embedding_store, rag_pipeline
+from app.services.rag.rag_pipeline import memory
 
 router = APIRouter(prefix="/chatbot", tags=["chat"])
 
 logger = logging.getLogger(__name__)
 
-embedding_db = EmbeddingDocumentStore()
-rag = RAGPipeline()
-
 
 class MessageModel(BaseModel):
     """
@@ -40,6 +39,29 @@ def get_chatbot_status():
     return {"message": "Chatbot service online !"}
 
 
+@router.get(
+    "/stats",
+    summary="Get chatbot memory and cache counters",
+    response_description="Conversation memory and cache usage"
+)
+def get_chatbot_stats():
+    """
+    Returns the conversation memory counters (live sessions, bytes held, evictions)
+    the usage of the answer, embedding and query caches, the local routing decisions, the speculative retrievals and the conversation summaries. Caches of services still loading are reported as None.
+    """
+    rag = rag_pipeline.get() if rag_pipeline.ready else None
+    embedding_db = embedding_store.get() if embedding_store.ready else None
+    return {
+        "sessions": memory.stats(),
+        "answer_cache": rag.answer_cache.stats() if rag else None,
+        "intent_router": rag.intent_router.stats() if rag else None,
+        "speculative_retrieval": rag.speculative.stats() if rag else None,
+        "summarization": rag.summarizer.stats() if rag else None,
+        "embedding_cache": embedding_db.embedding_cache.stats() if embedding_db and embedding_db.embedding_cache else None,
+        "query_cache": embedding_db.query_cache.stats() if embedding_db and embedding_db.query_cache else None,
+    }
+
+
 @router.post(
     "/send-message",
     summary="Ask a question to the chatbot",
@@ -49,6 +71,8 @@ async def ask_question(payload: MessageModel):
     """
     Send a message to the RAG chatbot and return the answer.
 
+    The pipeline runs asynchronously, so a slow answer does not block other requests.
+
     Args:
         payload (MessageModel): The user's message.
 
@@ -58,10 +82,46 @@ async def ask_question(payload: MessageModel):
     query = payload.message
     session_id = payload.session_id
 
-    response = rag.execute(question=query, session_id=session_id)
+    rag = await rag_pipeline.aget()
+    response = await rag.aexecute(question=query, session_id=session_id)
 
     ret = {
         "message": payload.message,
         "answer": response
     }
-    return ret
\ No newline at end of file
+    return ret
+
+
+@router.post(
+    "/stream-message",
+    summary="Ask a question to the chatbot and stream the answer",
+    response_description="Server-sent events carrying the answer tokens"
+)
+async def stream_question(payload: MessageModel):
+    """
+    Send a message to the RAG chatbot and stream the answer as server-sent events.
+
+    Each `token` event carries a piece of the answer as soon as the LLM produces it.
+    The stream ends with a `done` event, or an `error` event if the pipeline fails.
+
+    Args:
+        payload (MessageModel): The user's message.
+
+    Returns:
+        StreamingResponse: `text/event-stream` response.
+    """
+    async def event_stream():
+        try:
+            rag = await rag_pipeline.aget()
+            async for token in rag.astream(question=payload.message, session_id=payload.session_id):
+                yield f"event: token\ndata: {json.dumps({'token': token})}\n\n"
+            yield f"event: done\ndata: {json.dumps({'message': payload.message})}\n\n"
+        except Exception:
+            logger.exception("Error while streaming chatbot answer")
+            yield f"event: error\ndata: {json.dumps({'detail': 'Internal server error'})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,44 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.core.startup import startup
+
+router = APIRouter(tags=["health"])
+
+
+@router.get(
+    "/health",
+    summary="Liveness probe",
+    response_description="The API process is running"
+)
+def health():
+    """
+    Returns as soon as the server accepts requests, even while the services are still loading.
+    """
+    return {"status": "alive"}
+
+
+@router.get(
+    "/ready",
+    summary="Readiness probe",
+    response_description="Loading state of the services"
+)
+def ready():
+    """
+    Reports the loading state of every service.
+
+    Responds 200 once all of them are loaded, 503 while some are still loading or failed,
+    so a load balancer only routes chatbot traffic to warmed-up instances.
+
+    Returns:
+        JSONResponse: Global status, cold-start duration and per-service state.
+    """
+    is_ready = startup.is_ready()
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={
+            "status": "ready" if is_ready else "loading",
+            "cold_start_seconds": round(startup.cold_start_seconds, 3) if startup.cold_start_seconds is not None else None,
+            "components": startup.readiness(),
+        }
+    )
@@ -1,6 +1,24 @@
-from pydantic import ValidationError
+from importlib.util import find_spec
+from typing import Literal, Optional
+
+from pydantic import ValidationError, field_validator
 from pydantic_settings import BaseSettings
 
+# Modules each non-default embedding backend needs, installed by the extra of the same name
+EMBEDDING_BACKEND_MODULES = {
+    "onnx": ("optimum", "onnxruntime"),
+    "openvino": ("optimum.intel", "openvino"),
+}
+
+
+def _is_installed(module: str) -> bool:
+    """Check whether a module can be imported, without importing it."""
+    try:
+        return find_spec(module) is not None
+    except ModuleNotFoundError:
+        return False
+
+
 class Settings(BaseSettings):
     """
     Application configuration loaded from environment variables.
@@ -13,9 +31,31 @@ class Settings(BaseSettings):
     MISTRAL_API_KEY: str
 
     CHROMA_API_URL: str
+    # "chroma" or "numpy" (in-process memory-mapped index stored in VECTOR_INDEX_PATH)
+    VECTOR_BACKEND: str = "chroma"
+    VECTOR_INDEX_PATH: str = ".cache/vector_index"
+
+    # Embedding model runtime: "torch", "onnx" or "openvino", and optional model file (e.g. int8-quantized ONNX)
+    EMBEDDING_BACKEND: Literal["torch", "onnx", "openvino"] = "torch"
+    EMBEDDING_MODEL_FILE: Optional[str] = None
+
+    # SQLite file persisting chatbot conversations, kept in memory only when unset
+    SESSION_DB_PATH: Optional[str] = None
+    # JSON lines file logging visitors' questions with the LLM routing decision, to train the
+    # intent router (disabled when unset, as it stores personal data)
+    INTENT_TRAFFIC_LOG_PATH: Optional[str] = None
 
     CMS_API_URL: str
     CMS_API_KEY: str
+    # Documents per page and maximum simultaneous requests when fetching the CMS
+    CMS_PAGE_SIZE: int = 100
+    CMS_MAX_CONCURRENCY: int = 4
+    # JSON file describing the indexed tables, their field mappings and refresh policy (defaults when unset)
+    CMS_TABLES_PATH: Optional[str] = None
+    # Dedicated secret sent by the CMS webhooks in the Authorization header (webhook disabled
+    # when unset), and quiet period grouping bursts of edits into one reindex
+    CMS_WEBHOOK_SECRET: Optional[str] = None
+    CMS_WEBHOOK_DEBOUNCE_SECONDS: float = 2.0
 
     EMAIL_HOST: str
     EMAIL_PORT: int
@@ -23,6 +63,28 @@ class Settings(BaseSettings):
     EMAIL_PASSWORD: str
     EMAIL_RECIPIENT: str
 
+    @field_validator("EMBEDDING_BACKEND")
+    @classmethod
+    def check_embedding_backend_installed(cls, backend: str) -> str:
+        """
+        Fail at startup, rather than when the model loads, if the backend's runtime is missing.
+
+        Args:
+            backend (str): Configured embedding backend.
+
+        Returns:
+            str: The backend.
+
+        Raises:
+            ValueError: If a module the backend needs is not installed.
+        """
+        missing = [module for module in EMBEDDING_BACKEND_MODULES.get(backend, ()) if not _is_installed(module)]
+        if missing:
+            raise ValueError(
+                f"the {backend} backend needs {', '.join(missing)}: install it with `uv sync --extra {backend}`"
+            )
+        return backend
+
     class Config:
         """
         Pydantic configuration for environment variable loading and validation.
@@ -40,6 +102,9 @@ except ValidationError as e:
        Raises:
            RuntimeError: If one or more environment variables are missing or invalid.
        """
-    missing = [err['loc'][0] for err in e.errors()]
+    missing = [
+        err['loc'][0] if err['type'] == 'missing' else f"{err['loc'][0]} ({err['msg']})"
+        for err in e.errors()
+    ]
     msg = f"Missing or invalid environment variables: {', '.join(missing)}"
     raise RuntimeError(msg)
\ No newline at end of file
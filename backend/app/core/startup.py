@@ -0,0 +1,168 @@
+import asyncio
+import logging
+import threading
+import time
+from enum import Enum
+from typing import Callable, Dict, Generic, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ComponentState(str, Enum):
+    """Loading state of a lazy component."""
+    PENDING = "pending"
+    LOADING = "loading"
+    READY = "ready"
+    FAILED = "failed"
+
+
+class LazyComponent(Generic[T]):
+    """
+    Expensive service built on first use, or ahead of time by the StartupManager warmup.
+
+    Building is thread-safe: concurrent callers wait for the same build. A failed build
+    is retried on the next access.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        """
+        Declare a component.
+
+        Args:
+            name (str): Name reported in readiness checks and logs.
+            factory (Callable[[], T]): Builds the component.
+        """
+        self.name = name
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._lock = threading.Lock()
+
+        self.state = ComponentState.PENDING
+        self.load_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+
+    @property
+    def ready(self) -> bool:
+        """True once the component has been built."""
+        return self.state == ComponentState.READY
+
+    def get(self) -> T:
+        """
+        Get the component, building it first if needed. Blocks while it is being built.
+
+        Returns:
+            T: The component instance.
+        """
+        if self.state == ComponentState.READY:
+            return self._instance
+
+        with self._lock:
+            if self.state == ComponentState.READY:
+                return self._instance
+
+            self.state = ComponentState.LOADING
+            start = time.perf_counter()
+            try:
+                self._instance = self._factory()
+            except Exception as e:
+                self.state = ComponentState.FAILED
+                self.error = str(e)
+                logger.exception(f"❌ Failed to load {self.name}: {e}")
+                raise
+
+            self.load_seconds = time.perf_counter() - start
+            self.error = None
+            self.state = ComponentState.READY
+            logger.info(f"✅ {self.name} loaded in {self.load_seconds:.2f}s")
+            return self._instance
+
+    async def aget(self) -> T:
+        """
+        Get the component without blocking the event loop while it is being built.
+
+        Returns:
+            T: The component instance.
+        """
+        if self.state == ComponentState.READY:
+            return self._instance
+        return await asyncio.to_thread(self.get)
+
+    def status(self) -> dict:
+        """
+        Report the loading state of the component.
+
+        Returns:
+            dict: State, load time and last error.
+        """
+        return {
+            "state": self.state.value,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+            "error": self.error,
+        }
+
+
+class StartupManager:
+    """
+    Warms up registered components in parallel in the background,
+    so the application accepts requests while they load.
+    """
+
+    def __init__(self):
+        self.components: List[LazyComponent] = []
+        self.cold_start_seconds: Optional[float] = None
+
+    def register(self, component: LazyComponent) -> LazyComponent:
+        """
+        Add a component to the warmup and readiness checks.
+
+        Args:
+            component (LazyComponent): Component to register.
+
+        Returns:
+            LazyComponent: The same component.
+        """
+        self.components.append(component)
+        return component
+
+    async def warmup(self):
+        """
+        Build every registered component in parallel worker threads and log the cold-start time.
+        Components depending on each other wait for their dependencies through LazyComponent.get().
+        """
+        start = time.perf_counter()
+        logger.info(f"🚀 Warming up {', '.join(c.name for c in self.components)}...")
+
+        results = await asyncio.gather(
+            *(asyncio.to_thread(component.get) for component in self.components),
+            return_exceptions=True
+        )
+
+        self.cold_start_seconds = time.perf_counter() - start
+        failed = [c.name for c, result in zip(self.components, results) if isinstance(result, Exception)]
+        if failed:
+            logger.error(f"⚠️ Warmup finished in {self.cold_start_seconds:.2f}s with failures: {', '.join(failed)}")
+        else:
+            logger.info(f"🚀 All components ready, cold start took {self.cold_start_seconds:.2f}s")
+
+    def is_ready(self) -> bool:
+        """
+        Check whether the application can serve every feature.
+
+        Returns:
+            bool: True if every registered component is ready.
+        """
+        return all(component.ready for component in self.components)
+
+    def readiness(self) -> Dict[str, dict]:
+        """
+        Report the state of every registered component.
+
+        Returns:
+            Dict[str, dict]: Status of each component by name.
+        """
+        return {component.name: component.status() for component in self.components}
+
+
+startup = StartupManager()
@@ -1,5 +1,7 @@
+import asyncio
 import time
 import traceback
+from contextlib import asynccontextmanager
 
 import uvicorn
 import logging
@@ -10,8 +12,25 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import main_router
 from app.core.config import settings
+from app.core.startup import startup
+from app.services.rag.cms_scheduler import cms_scheduler
 
-app = FastAPI(title="Portfolio API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Warm up the RAG services in the background: the server accepts requests immediately,
+    /ready reports when everything is loaded. Tables with a refresh interval are then
+    refreshed in the background.
+    """
+    warmup_task = asyncio.create_task(startup.warmup())
+    cms_scheduler.start()
+    yield
+    cms_scheduler.stop()
+    warmup_task.cancel()
+
+
+app = FastAPI(title="Portfolio API", lifespan=lifespan)
 app.include_router(main_router)
 
 
@@ -0,0 +1,30 @@
+from typing import Dict, List, Optional, Set
+
+from pydantic import BaseModel, Field
+
+from app.models.document_model import DocumentModel
+
+
+class TableSyncState(BaseModel):
+    """Remembers what a delta sync already fetched from a CMS table."""
+    watermark: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    cms_ids: List[str] = Field(default_factory=list)
+    document_ids: List[str] = Field(default_factory=list)
+
+
+class CMSDelta(BaseModel):
+    """
+    Changes fetched from the CMS since the previous delta sync.
+
+    Attributes:
+        documents (List[DocumentModel]): New or modified documents.
+        present_ids (Set[str]): IDs of every document still in the CMS, changed or not.
+        changed_tables (List[str]): Tables with at least one new, modified or deleted document.
+        table_states (Dict[str, TableSyncState]): Sync state to keep once the changes are indexed.
+    """
+    documents: List[DocumentModel] = Field(default_factory=list)
+    present_ids: Set[str] = Field(default_factory=set)
+    changed_tables: List[str] = Field(default_factory=list)
+    table_states: Dict[str, TableSyncState] = Field(default_factory=dict)
@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, Field
+
+from app.models.indexing_report import IndexingReport
+
+
+class CMSTableSpec(BaseModel):
+    """
+    Describes how a CMS table is fetched and turned into RAG documents.
+
+    Attributes:
+        route (str): CMS API route of the table.
+        model (Optional[str]): Strapi model name, as sent in webhooks.
+        title_keys (List[str]): Fields building the document title.
+        content_keys (List[str]): Fields building the document text.
+        link_keys (List[str]): Fields holding links (URLs or emails).
+        category_name (str): Category of the documents, unique per table.
+        aggregate_documents (bool): Merge all entries of the table into one document.
+        paginated (bool): False for single types, which are fetched in one request.
+        params (Optional[dict]): Query parameters added to the table requests.
+        page_size (Optional[int]): Documents per page, the service's page size by default.
+        refresh_seconds (Optional[float]): Interval of the scheduled refresh of the table,
+            None to refresh it only on manual reindexes and webhooks.
+    """
+    route: str
+    model: Optional[str] = None
+    title_keys: List[str]
+    content_keys: List[str]
+    link_keys: List[str] = Field(default_factory=list)
+    category_name: str
+    aggregate_documents: bool = False
+    paginated: bool = True
+    params: Optional[dict] = None
+    page_size: Optional[int] = None
+    refresh_seconds: Optional[float] = None
+
+
+class TableSyncStats(BaseModel):
+    """
+    Metrics of the last sync of a single CMS table.
+
+    Attributes:
+        syncs (int): Number of syncs of the table.
+        last_synced_at (Optional[datetime]): End of the last sync, successful or not.
+        fetch_seconds (float): CMS fetch duration of the last sync.
+        sync_seconds (float): Split, embedding and write duration of the last sync.
+        documents (int): Documents fetched by the last sync.
+        report (Optional[IndexingReport]): Chunk changes of the last successful sync.
+        error (Optional[str]): Failure message of the last sync, if it failed.
+    """
+    syncs: int = 0
+    last_synced_at: Optional[datetime] = None
+    fetch_seconds: float = 0.0
+    sync_seconds: float = 0.0
+    documents: int = 0
+    report: Optional[IndexingReport] = None
+    error: Optional[str] = None
@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+
+
+class IndexingReport(BaseModel):
+    """Summarizes the chunk-level changes applied by an incremental reindex."""
+    added: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    duration_seconds: float = 0.0
+
+    @property
+    def indexed(self) -> int:
+        """Number of chunks present in the index after the sync."""
+        return self.added + self.updated + self.unchanged
+
+    @property
+    def embedded(self) -> int:
+        """Number of chunks that actually went through the embedding model."""
+        return self.added + self.updated
+
+    @property
+    def chunks_per_second(self) -> float:
+        """Embedding and write throughput of the sync."""
+        return self.embedded / self.duration_seconds if self.duration_seconds else 0.0
@@ -0,0 +1,49 @@
+from datetime import datetime
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+from app.models.indexing_report import IndexingReport
+
+
+class ReindexPhase(BaseModel):
+    """Time spent in one phase of a reindex, and the number of items it processed."""
+    seconds: float = 0.0
+    items: int = 0
+
+
+class ReindexJob(BaseModel):
+    """
+    State of a background reindex job.
+
+    Attributes:
+        id (str): Job ID.
+        mode (str): "full" sync, "delta" sync of the CMS changes, blue/green "rebuild",
+            "entries" sync of the CMS entries reported by webhooks, or "tables" sync of some tables.
+        status (str): "queued", "running", "succeeded", "partial" (some tables of a "tables" job
+            failed, the others were synced) or "failed".
+        requests (int): Number of triggers coalesced into this job.
+        entries (List[str]): CMS entries of an "entries" job, as "route/documentId".
+        tables (List[str]): Routes of the tables of a "tables" job.
+        phase (Optional[str]): Phase the job is in (fetch, clean, split, embed, upsert).
+        phases (Dict[str, ReindexPhase]): Time and items of each phase so far.
+        chunks (int): Chunks embedded so far.
+        chunks_per_second (float): Embedding throughput since the job started.
+        report (Optional[IndexingReport]): Chunk changes, once the job succeeded or partially succeeded.
+        error (Optional[str]): Failure message, if the job failed, or the failed tables of a partial job.
+    """
+    id: str
+    mode: Literal["full", "delta", "rebuild", "entries", "tables"]
+    status: Literal["queued", "running", "succeeded", "partial", "failed"] = "queued"
+    requests: int = 1
+    entries: List[str] = Field(default_factory=list)
+    tables: List[str] = Field(default_factory=list)
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    phase: Optional[str] = None
+    phases: Dict[str, ReindexPhase] = Field(default_factory=dict)
+    chunks: int = 0
+    chunks_per_second: float = 0.0
+    report: Optional[IndexingReport] = None
+    error: Optional[str] = None
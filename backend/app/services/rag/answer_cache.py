@@ -0,0 +1,171 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticAnswerCacheParams(BaseModel):
+    """
+    Configuration parameters for the SemanticAnswerCache.
+
+    Attributes:
+        similarity_threshold (float): Minimum cosine similarity between two questions to reuse an answer.
+        ttl_seconds (float): Lifetime of a cached answer.
+        max_entries (int): Maximum number of cached answers, least recently used ones are evicted first.
+    """
+    similarity_threshold: float = 0.92
+    ttl_seconds: float = 3600
+    max_entries: int = 256
+
+
+@dataclass
+class _CachedAnswer:
+    question: str
+    vector: np.ndarray
+    answer: str
+    created_at: float
+
+
+class SemanticAnswerCache:
+    """
+    In-memory cache of chatbot answers, looked up by question embedding similarity.
+
+    Entries expire after a TTL, are evicted in LRU order, and are all dropped when
+    the vector store index version changes (i.e. after a reindex modified the collection).
+    """
+
+    def __init__(self, params: Optional[SemanticAnswerCacheParams] = None):
+        """
+        Initialize an empty cache.
+
+        Args:
+            params (Optional[SemanticAnswerCacheParams]): Custom cache parameters.
+        """
+        if params is None:
+            params = SemanticAnswerCacheParams()
+        self.params = params
+
+        self._entries: "OrderedDict[int, _CachedAnswer]" = OrderedDict()
+        self._next_key = 0
+        self._index_version = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        """Convert a vector to a unit-norm float32 array, so dot products are cosine similarities."""
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm else array
+
+    def _sync_index_version(self, index_version: int):
+        """Drop every entry if the vector store changed since they were cached."""
+        if self._index_version != index_version:
+            if self._entries:
+                logger.info(f"🧹 Vector store changed, dropping {len(self._entries)} cached answers.")
+            self._entries.clear()
+            self._index_version = index_version
+
+    def _purge_expired(self):
+        """Remove the entries older than the TTL."""
+        deadline = time.monotonic() - self.params.ttl_seconds
+        expired = [key for key, entry in self._entries.items() if entry.created_at < deadline]
+        for key in expired:
+            del self._entries[key]
+
+    def lookup(self, vector: List[float], index_version: int) -> Optional[str]:
+        """
+        Find the answer of the most similar cached question.
+
+        Args:
+            vector (List[float]): Embedding of the new question.
+            index_version (int): Current version of the vector store index.
+
+        Returns:
+            str | None: Cached answer if a question is similar enough, None otherwise.
+        """
+        query = self._normalize(vector)
+
+        with self._lock:
+            self._sync_index_version(index_version)
+            self._purge_expired()
+
+            if not self._entries:
+                self.misses += 1
+                return None
+
+            keys = list(self._entries.keys())
+            matrix = np.stack([self._entries[key].vector for key in keys])
+            similarities = matrix @ query
+            best = int(np.argmax(similarities))
+
+            if similarities[best] < self.params.similarity_threshold:
+                self.misses += 1
+                return None
+
+            key = keys[best]
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            entry = self._entries[key]
+            logger.info(f"⚡ Answer cache hit ({similarities[best]:.3f}) for cached question {entry.question!r}")
+            return entry.answer
+
+    def store(self, question: str, vector: List[float], answer: str, index_version: int):
+        """
+        Cache the answer of a question.
+
+        Args:
+            question (str): The question.
+            vector (List[float]): Embedding of the question.
+            answer (str): Answer to reuse for similar questions.
+            index_version (int): Version of the vector store index the answer was built from.
+        """
+        if not answer:
+            return
+
+        with self._lock:
+            # The collection changed while the answer was being generated
+            if self._index_version is not None and index_version < self._index_version:
+                return
+            self._sync_index_version(index_version)
+
+            self._entries[self._next_key] = _CachedAnswer(
+                question=question,
+                vector=self._normalize(vector),
+                answer=answer,
+                created_at=time.monotonic()
+            )
+            self._next_key += 1
+
+            while len(self._entries) > self.params.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Drop every cached answer."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Report the cache usage.
+
+        Returns:
+            dict: Cache size and hit/miss counters.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.params.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,114 @@
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+from app.models.cms_table import CMSTableSpec
+from app.services.rag.cms_service import CMS_TABLES
+from app.services.rag.reindex_jobs import reindex_jobs
+
+logger = logging.getLogger(__name__)
+
+
+class CMSSchedulerParams(BaseModel):
+    """
+    Configuration parameters for the scheduled table refreshes.
+
+    Attributes:
+        tick_seconds (float): Interval between two checks of the tables due for a refresh.
+    """
+    tick_seconds: float = 10.0
+
+
+class CMSSyncScheduler:
+    """
+    Refreshes each CMS table on its own schedule, from the `refresh_seconds` of its definition.
+
+    Tables due at the same time are synced by a single "tables" job, which fetches them in
+    parallel and only touches their chunks. Tables without `refresh_seconds` are left to manual
+    reindexes and webhooks.
+    """
+
+    def __init__(self, tables: List[CMSTableSpec], params: Optional[CMSSchedulerParams] = None):
+        """
+        Args:
+            tables (List[CMSTableSpec]): Table definitions.
+            params (Optional[CMSSchedulerParams]): Scheduler configuration.
+        """
+        self.tables = tables
+        self.scheduled = [table for table in tables if table.refresh_seconds]
+        self.params = params or CMSSchedulerParams()
+
+        self._next_refresh: Dict[str, float] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start refreshing the tables in a background thread. The first refresh of a table is one interval away."""
+        if not self.scheduled or self._thread is not None:
+            return
+
+        now = time.monotonic()
+        self._next_refresh = {table.route: now + table.refresh_seconds for table in self.scheduled}
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="cms-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(
+            "⏰ CMS refresh scheduled: "
+            + ", ".join(f"{table.route} every {table.refresh_seconds:g}s" for table in self.scheduled)
+        )
+
+    def stop(self):
+        """Stop the background thread."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def due_tables(self, now: float) -> List[str]:
+        """
+        List the tables due for a refresh and schedule their next one.
+
+        Args:
+            now (float): Current `time.monotonic()` value.
+
+        Returns:
+            List[str]: Routes of the tables to sync.
+        """
+        due = []
+        for table in self.scheduled:
+            if self._next_refresh.get(table.route, now) <= now:
+                due.append(table.route)
+                self._next_refresh[table.route] = now + table.refresh_seconds
+        return due
+
+    def _loop(self):
+        """Queue a "tables" job whenever some tables are due."""
+        while not self._stop.wait(self.params.tick_seconds):
+            due = self.due_tables(time.monotonic())
+            if due:
+                job = reindex_jobs.submit("tables", tables=due)
+                logger.info(f"⏰ Scheduled refresh of {', '.join(due)} in job {job.id}")
+
+    def stats(self) -> dict:
+        """
+        Get the schedule and the per-table sync metrics of every table.
+
+        Returns:
+            dict: Refresh interval, seconds until the next scheduled refresh and last sync metrics, by route.
+        """
+        now = time.monotonic()
+        table_stats = reindex_jobs.table_stats()
+        return {
+            table.route: {
+                "refresh_seconds": table.refresh_seconds,
+                "next_refresh_in": round(max(0.0, self._next_refresh[table.route] - now), 1) if table.route in self._next_refresh else None,
+                "last_sync": table_stats.get(table.route),
+            }
+            for table in self.tables
+        }
+
+
+cms_scheduler = CMSSyncScheduler(CMS_TABLES)
@@ -1,32 +1,149 @@
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Union, Optional
+from typing import Dict, List, Union, Optional, Tuple
 import requests
+from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
 
 from app.core.config import settings
+from app.models.cms_delta import CMSDelta, TableSyncState
+from app.models.cms_table import CMSTableSpec
 from app.models.document_model import DocumentModel
 from app.services.rag.prepare_text import prepare_text, concatenate_texts
+from app.utils.hashing import sha256_hex
+
+logger = logging.getLogger(__name__)
+
+
+class CMSFetchParams(BaseModel):
+    """
+    Configuration parameters for CMS requests.
+
+    Attributes:
+        page_size (int): Number of documents requested per page of a collection.
+        max_concurrency (int): Maximum number of requests sent to the CMS at the same time.
+        timeout (float): Timeout of a request, in seconds.
+    """
+    page_size: int = 100
+    max_concurrency: int = 4
+    timeout: float = 30
+
+
+# Tables indexed for the RAG, with the fields used to build each document
+DEFAULT_CMS_TABLES = [
+    CMSTableSpec(route="experiences", model="experience", title_keys=["title", "subtitle"], content_keys=["text"], category_name="Expériences"),
+    CMSTableSpec(route="projects", model="project", title_keys=["title"], content_keys=["description", "markdown"], category_name="Projets"),
+    CMSTableSpec(route="skills", model="skill", title_keys=["name"], content_keys=["description"], category_name="Compétences"),
+    CMSTableSpec(route="contact-links", model="contact-link", title_keys=["socialMedia"], content_keys=["text"], link_keys=["link"], category_name="Contacts", aggregate_documents=True),
+    CMSTableSpec(route="homepage", model="homepage", title_keys=["textSectionTitle"], content_keys=["textSectionText"], category_name="Plus sur toi", paginated=False),
+    CMSTableSpec(route="ai-documents", model="ai-document", title_keys=["title"], content_keys=["text"], category_name="Informations", refresh_seconds=600),
+]
+
+
+def load_table_specs(path: Optional[str] = None) -> List[CMSTableSpec]:
+    """
+    Load the definitions of the indexed tables.
+
+    Args:
+        path (Optional[str]): JSON file holding a list of table definitions (see CMSTableSpec),
+            the default tables when None.
+
+    Returns:
+        List[CMSTableSpec]: Table definitions.
+
+    Raises:
+        RuntimeError: If the file is invalid or two tables share a route or a category.
+    """
+    if not path:
+        return list(DEFAULT_CMS_TABLES)
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            tables = [CMSTableSpec.model_validate(table) for table in json.load(f)]
+    except (OSError, ValueError) as e:
+        raise RuntimeError(f"Invalid CMS tables file '{path}': {e}")
+
+    for field in ("route", "category_name"):
+        values = [getattr(table, field) for table in tables]
+        if len(set(values)) != len(values):
+            raise RuntimeError(f"Invalid CMS tables file '{path}': duplicate {field}")
+    return tables
+
+
+CMS_TABLES = load_table_specs(settings.CMS_TABLES_PATH)
+
+# Categories stored in the chunk metadata, usable as retrieval filters
+CMS_CATEGORIES = [table.category_name for table in CMS_TABLES]
+
+# Strapi model names (as sent in webhooks) of the indexed tables
+CMS_MODELS = {table.model: table.route for table in CMS_TABLES if table.model}
+
+
+def find_table(model: str) -> Optional[CMSTableSpec]:
+    """
+    Find the indexed table of a Strapi model.
+
+    Args:
+        model (str): Model name ("project"), UID ("api::project.project") or API route ("projects").
+
+    Returns:
+        CMSTableSpec | None: Table definition from CMS_TABLES, None if the model is not indexed.
+    """
+    if "::" in model:
+        model = model.split("::", 1)[1].split(".", 1)[0]
+    route = CMS_MODELS.get(model, model)
+    return next((table for table in CMS_TABLES if table.route == route), None)
 
 
 class CMSService:
     """
     Handles communication with a CMS and transforms raw CMS data
     into cleaned, RAG-ready DocumentModel objects.
+
+    Requests share a keep-alive connection pool, and tables and pages are fetched concurrently.
     """
 
-    def __init__(self, cms_api_url: str, api_key: Optional[str] = None):
+    def __init__(self, cms_api_url: str, api_key: Optional[str] = None, params: Optional[CMSFetchParams] = None):
         """
         Initialize the CMS service.
 
         Args:
             cms_api_url (str): Base URL of the CMS API.
             api_key (Optional[str]): Optional API key for authenticated requests.
+            params (Optional[CMSFetchParams]): Custom fetching parameters.
         """
         self.base_url = cms_api_url.rstrip("/")
         self.api_key = api_key
 
-    def _fetch_cms(self, route: str, headers: dict = None, params: dict = None) -> dict:
+        if params is None:
+            params = CMSFetchParams()
+        self.params = params
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.params.max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if self.api_key:
+            self.session.headers.update({
+                "Authorization": f"Bearer {self.api_key}",
+                "User-Agent": "Mozilla/5.0 (compatible; MyBackend/1.0)",
+                "Accept": "application/json",
+            })
+
+        # Bounds the requests in flight across all tables and pages
+        self._request_slots = threading.BoundedSemaphore(self.params.max_concurrency)
+
+        # Delta sync state of each table, committed once the changes are indexed
+        self.sync_state: Dict[str, TableSyncState] = {}
+        self._delta_lock = threading.Lock()
+
+    def _request(self, route: str, headers: dict = None, params: dict = None) -> requests.Response:
         """
-        Perform a GET request to the CMS.
+        Perform a GET request to the CMS and check its status.
 
         Args:
             route (str): The API route (relative to the base URL).
@@ -34,23 +151,64 @@ class CMSService:
             params (dict, optional): Query parameters.
 
         Returns:
-            dict: Parsed JSON response from the CMS.
+            requests.Response: The response, which may be a 304 Not Modified for conditional requests.
         """
         url = f"{self.base_url}/{route}"
         params = params or {}
         headers = headers or {}
 
-        if self.api_key:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "User-Agent": "Mozilla/5.0 (compatible; MyBackend/1.0)",
-                "Accept": "application/json",
+        with self._request_slots:
+            response = self.session.get(url, params=params, headers=headers, timeout=self.params.timeout)
+        response.raise_for_status()
+
+        return response
+
+    def _fetch_cms(self, route: str, headers: dict = None, params: dict = None) -> dict:
+        """
+        Perform a GET request to the CMS.
+
+        Args:
+            route (str): The API route (relative to the base URL).
+            headers (dict, optional): Additional request headers.
+            params (dict, optional): Query parameters.
+
+        Returns:
+            dict: Parsed JSON response from the CMS.
+        """
+        return self._request(route, headers=headers, params=params).json()
+
+    def _fetch_all_pages(self, route: str, params: dict = None, page_size: Optional[int] = None) -> List[dict]:
+        """
+        Fetch every page of a collection.
+
+        The first page gives the page count, the other pages are then fetched concurrently.
+
+        Args:
+            route (str): The API route of the collection.
+            params (dict, optional): Query parameters added to every page request.
+            page_size (int, optional): Documents per page, the service's page size by default.
+
+        Returns:
+            List[dict]: Raw documents of all pages, in page order.
+        """
+        def fetch_page(page: int) -> dict:
+            page_params = {
+                **(params or {}),
+                "pagination[page]": page,
+                "pagination[pageSize]": page_size or self.params.page_size,
             }
+            return self._fetch_cms(route, params=page_params)
 
-        response = requests.get(url, params=params, headers=headers)
-        response.raise_for_status()
+        first_page = fetch_page(1)
+        data = first_page.get("data", [])
+        page_count = first_page.get("meta", {}).get("pagination", {}).get("pageCount", 1)
+
+        if page_count > 1:
+            with ThreadPoolExecutor(max_workers=min(self.params.max_concurrency, page_count - 1)) as executor:
+                for page in executor.map(fetch_page, range(2, page_count + 1)):
+                    data += page.get("data", [])
 
-        return response.json()
+        return data
 
     @staticmethod
     def _parse_date(date_str: Optional[str]) -> Optional[datetime]:
@@ -109,6 +267,20 @@ class CMSService:
         )
 
 
+    @staticmethod
+    def _aggregate_id(doc_ids: List[str]) -> str:
+        """
+        Build the ID of a document aggregating several CMS documents.
+
+        Args:
+            doc_ids (List[str]): CMS IDs of the aggregated documents.
+
+        Returns:
+            str: Aggregated document ID.
+        """
+        return f"agg_{'_'.join(sorted(doc_ids))}"
+
+
     def _clean_aggregated_documents(
             self,
             cms_documents: List[dict],
@@ -135,7 +307,11 @@ class CMSService:
 
         # Aggregate ID
         doc_ids = [str(doc.get("documentId", "")) for doc in cms_documents if doc.get("documentId")]
-        aggr_id = f"agg_{'_'.join(sorted(doc_ids))}" if doc_ids else f"agg_{hash(str(cms_documents))}"
+        if doc_ids:
+            aggr_id = self._aggregate_id(doc_ids)
+        else:
+            # Stable across processes and runs, unlike hash(): the reindex compares IDs with the indexed ones
+            aggr_id = f"agg_{category}" if category else f"agg_{sha256_hex(json.dumps(cms_documents, sort_keys=True, default=str))}"
 
         # Last UpdatedAt (detect change on every document)
         updated_dates = [self._parse_date(doc.get("updatedAt")) for doc in cms_documents if doc.get("updatedAt")]
@@ -164,46 +340,49 @@ class CMSService:
 
 
 
-    def _fetch_table(
-        self,
-        route: str,
-        title_keys: List[str],
-        content_keys: List[str],
-        link_keys: Optional[List[str]] = None,
-        category_name: str = None,
-        aggregate_documents: bool = False,
-        params: dict = None,
-    ) -> List[DocumentModel]:
+    def fetch_table(self, table: CMSTableSpec) -> List[DocumentModel]:
         """
         Fetch and clean documents from a specific CMS table.
 
         Args:
-            route (str): CMS API route for the table.
-            title_keys (List[str]): Keys to extract title fields.
-            content_keys (List[str]): Keys to extract content fields.
-            link_keys (List[str], optional): Keys to extract links.
-            category_name (str, optional): Category name for the documents.
-            aggregate_documents (bool, optional): If True, aggregate multiple documents into one.
-            params (dict, optional): Query parameters for the API request.
+            table (CMSTableSpec): Table definition.
 
         Returns:
             List[DocumentModel]: List of cleaned documents.
         """
-        if not link_keys:
-            link_keys = []
+        if table.paginated:
+            data = self._fetch_all_pages(table.route, params=table.params, page_size=table.page_size)
+        else:
+            data = self._fetch_cms(table.route, params=table.params).get("data", [])
+
+        return self._clean_table(data, table)
+
+
+    def _clean_table(self, data: Union[dict, List[dict]], table: CMSTableSpec) -> List[DocumentModel]:
+        """
+        Clean the raw documents of a CMS table.
+
+        Args:
+            data (dict | List[dict]): Raw CMS documents, or the single document of a single type.
+            table (CMSTableSpec): Table definition, giving the field mappings and aggregation mode.
 
-        response = self._fetch_cms(route, params=params)
-        data = response.get("data", [])
+        Returns:
+            List[DocumentModel]: List of cleaned documents.
+        """
         if not isinstance(data, list):
             data = [data]
 
         documents = []
-        if aggregate_documents:
-            aggregated_doc = self._clean_aggregated_documents(data, title_keys, content_keys, link_keys, category_name)
+        if table.aggregate_documents:
+            aggregated_doc = self._clean_aggregated_documents(
+                data, table.title_keys, table.content_keys, table.link_keys, table.category_name
+            )
             documents.append(aggregated_doc)
         else:
             for item in data:
-                cleaned_doc = self._clean_document(item, title_keys, content_keys, link_keys, category_name)
+                cleaned_doc = self._clean_document(
+                    item, table.title_keys, table.content_keys, table.link_keys, table.category_name
+                )
                 documents.append(cleaned_doc)
 
         return documents
@@ -217,6 +396,7 @@ class CMSService:
         content_keys: List[str],
         link_keys: List[str],
         params: dict = None,
+        category: Optional[str] = None,
     ) -> Optional[DocumentModel]:
         """
         Fetch and clean a single document by ID from a CMS table.
@@ -228,52 +408,248 @@ class CMSService:
            content_keys (List[str]): Keys to extract content fields.
            link_keys (List[str]): Keys to extract links.
            params (dict, optional): Query parameters for the API request.
+           category (str, optional): Category name for the document.
 
         Returns:
-           DocumentModel | None: Cleaned document or None if not found.
+           DocumentModel | None: Cleaned document or None if not found (deleted or unpublished).
         """
         route = f"{table}/{document_id}"
-        response = self._fetch_cms(route, params=params)
+        try:
+            response = self._fetch_cms(route, params=params)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
         item = response.get("data")
 
         if not item:
             return None
 
-        return self._clean_document(item, title_keys, content_keys, link_keys)
+        return self._clean_document(item, title_keys, content_keys, link_keys, category)
+
+
+    @staticmethod
+    def refetches_table(table: CMSTableSpec) -> bool:
+        """
+        Tell whether a change to one entry of a table requires refetching the whole table.
+
+        Args:
+            table (CMSTableSpec): Table definition.
+
+        Returns:
+            bool: True for aggregated tables and single types.
+        """
+        return table.aggregate_documents or not table.paginated
+
+
+    def fetch_entry(self, table: CMSTableSpec, document_id: str) -> Tuple[List[DocumentModel], dict]:
+        """
+        Fetch the documents to reindex after a change of a single CMS entry.
+
+        Entries of regular tables are fetched alone. Aggregated tables and single types are
+        refetched whole, as the entry is part of a document built from the whole table.
+
+        Args:
+            table (CMSTableSpec): Table definition.
+            document_id (str): CMS ID of the created, modified or deleted entry.
+
+        Returns:
+            Tuple[List[DocumentModel], dict]: Current documents (empty if the entry no longer
+                exists) and the chunk metadata filter of the indexed documents they replace.
+        """
+        if self.refetches_table(table):
+            return self.fetch_table(table), {"category": table.category_name}
+
+        document = self.fetch_document(
+            table.route, document_id, table.title_keys, table.content_keys,
+            table.link_keys, params=table.params, category=table.category_name
+        )
+        return [document] if document else [], {"id": document_id}
 
 
     def fetch_all(self) -> List[DocumentModel]:
         """
         Fetch and clean all relevant CMS tables for RAG indexing.
 
+        Tables are fetched concurrently, so the duration is bounded by the slowest table.
+
         Returns:
             list[DocumentModel]: All cleaned documents across tables.
         """
-        all_docs = []
-        all_docs += self._fetch_table(
-            "experiences",
-            title_keys=["title", "subtitle"],
-            content_keys=["text"],
-            link_keys=[],
-            category_name="Expériences"
-        )
-        all_docs += self._fetch_table(
-            "projects", title_keys=["title"], content_keys=["description", "markdown"], category_name="Projets"
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=len(CMS_TABLES), thread_name_prefix="cms-fetch") as executor:
+            results = list(executor.map(self.fetch_table, CMS_TABLES))
+
+        all_docs = [doc for documents in results for doc in documents]
+        logger.info(f"📥 Fetched {len(all_docs)} CMS documents from {len(CMS_TABLES)} tables in {time.perf_counter() - start:.2f}s")
+        return all_docs
+
+
+    def _latest_update(self, data: List[dict], watermark: Optional[str]) -> Optional[str]:
+        """
+        Get the most recent `updatedAt` among raw CMS documents and the current watermark.
+
+        Args:
+            data (List[dict]): Raw CMS documents.
+            watermark (str, optional): Current watermark of the table.
+
+        Returns:
+            str | None: The most recent date, as returned by the CMS.
+        """
+        dates = [doc.get("updatedAt") for doc in data if doc.get("updatedAt")]
+        if watermark:
+            dates.append(watermark)
+        return max(dates, key=self._parse_date, default=None)
+
+
+    def _fetch_single_type_delta(
+        self,
+        route: str,
+        state: TableSyncState,
+        table: CMSTableSpec
+    ) -> Tuple[List[DocumentModel], TableSyncState]:
+        """
+        Fetch a single type only if it changed, with a conditional request.
+
+        Args:
+            route (str): CMS API route of the single type.
+            state (TableSyncState): Sync state of the previous delta sync.
+            table (CMSTableSpec): Table definition.
+
+        Returns:
+            Tuple[List[DocumentModel], TableSyncState]: Changed documents (empty if unchanged) and new sync state.
+        """
+        headers = {}
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+
+        response = self._request(route, headers=headers, params=table.params)
+        if response.status_code == 304:
+            return [], state
+
+        item = response.json().get("data") or {}
+        new_state = TableSyncState(
+            watermark=self._latest_update([item], None),
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
         )
-        all_docs += self._fetch_table(
-            "skills", title_keys=["name"], content_keys=["description"], category_name="Compétences"
+
+        if (
+            state.document_ids and new_state.watermark and state.watermark
+            and self._parse_date(new_state.watermark) <= self._parse_date(state.watermark)
+        ):
+            new_state.document_ids = state.document_ids
+            return [], new_state
+
+        documents = self._clean_table(item, table)
+        new_state.document_ids = [doc.id for doc in documents]
+        return documents, new_state
+
+
+    def _fetch_table_delta(self, table: CMSTableSpec) -> Tuple[List[DocumentModel], TableSyncState]:
+        """
+        Fetch the documents of a table created or modified since the previous delta sync.
+
+        The first sync of a table is a full fetch. Afterwards, only documents with an
+        `updatedAt` greater than the table watermark are downloaded, and an ID-only listing,
+        filtered like the table, tells which documents still exist. Aggregated tables are fully refetched when
+        any of their documents changed.
+
+        Args:
+            table (CMSTableSpec): Table definition.
+
+        Returns:
+            Tuple[List[DocumentModel], TableSyncState]: Changed documents and new sync state.
+        """
+        route = table.route
+        params = table.params or {}
+        state = self.sync_state.get(route, TableSyncState())
+
+        if not table.paginated:
+            return self._fetch_single_type_delta(route, state, table)
+
+        def full_fetch() -> Tuple[List[DocumentModel], TableSyncState]:
+            data = self._fetch_all_pages(route, params=params, page_size=table.page_size)
+            documents = self._clean_table(data, table)
+            return documents, TableSyncState(
+                watermark=self._latest_update(data, None),
+                cms_ids=[doc.get("documentId") for doc in data],
+                document_ids=[doc.id for doc in documents],
+            )
+
+        if state.watermark is None:
+            return full_fetch()
+
+        # Same filters as the table (locale, publication status...), but only the IDs
+        listing_params = {
+            key: value for key, value in params.items() if not key.startswith(("fields", "populate"))
+        }
+        listing = self._fetch_all_pages(
+            route, params={**listing_params, "fields[0]": "documentId"}, page_size=table.page_size
         )
-        all_docs += self._fetch_table(
-            "contact-links", title_keys=["socialMedia"], content_keys=["text"], link_keys=["link"], category_name="Contacts", aggregate_documents=True
+        cms_ids = [doc.get("documentId") for doc in listing]
+        changed = self._fetch_all_pages(
+            route, params={**params, "filters[updatedAt][$gt]": state.watermark}, page_size=table.page_size
         )
-        all_docs += self._fetch_table(
-            "homepage", title_keys=["textSectionTitle"], content_keys=["textSectionText"], link_keys=[], category_name="Plus sur toi"
+
+        if table.aggregate_documents:
+            if not changed and set(cms_ids) == set(state.cms_ids):
+                return [], state
+            return full_fetch()
+
+        documents = self._clean_table(changed, table)
+        return documents, TableSyncState(
+            watermark=self._latest_update(changed, state.watermark),
+            cms_ids=cms_ids,
+            document_ids=cms_ids,
         )
-        all_docs += self._fetch_table(
-            "ai-documents", title_keys=["title"], content_keys=["text"], category_name="Informations"
+
+
+    def fetch_delta(self) -> CMSDelta:
+        """
+        Fetch the CMS changes since the previous delta sync, table by table and concurrently.
+
+        Call commit_delta() once the changes are indexed, so a failed indexing is retried
+        on the next sync.
+
+        Returns:
+            CMSDelta: Changed documents, IDs of every document still in the CMS and new sync state.
+        """
+        start = time.perf_counter()
+
+        with self._delta_lock:
+            with ThreadPoolExecutor(max_workers=len(CMS_TABLES), thread_name_prefix="cms-delta") as executor:
+                results = list(executor.map(self._fetch_table_delta, CMS_TABLES))
+
+        delta = CMSDelta()
+        for table, (documents, state) in zip(CMS_TABLES, results):
+            route = table.route
+            previous = self.sync_state.get(route)
+            delta.documents += documents
+            delta.present_ids.update(state.document_ids)
+            delta.table_states[route] = state
+            if documents or previous is None or set(state.document_ids) != set(previous.document_ids):
+                delta.changed_tables.append(route)
+
+        logger.info(
+            f"📥 Delta fetched {len(delta.documents)} changed CMS documents "
+            f"({', '.join(delta.changed_tables) or 'no table changed'}) in {time.perf_counter() - start:.2f}s"
         )
+        return delta
 
-        return all_docs
+
+    def commit_delta(self, delta: CMSDelta):
+        """
+        Remember the sync state of a delta once its changes are indexed.
+
+        Args:
+            delta (CMSDelta): Delta returned by fetch_delta().
+        """
+        with self._delta_lock:
+            self.sync_state.update(delta.table_states)
 
 
     def fetch_ai_information(self):
@@ -287,4 +663,8 @@ class CMSService:
         return ai_info.get("data")
 
 
-cms = CMSService(cms_api_url=settings.CMS_API_URL, api_key=settings.CMS_API_KEY)
\ No newline at end of file
+cms = CMSService(
+    cms_api_url=settings.CMS_API_URL,
+    api_key=settings.CMS_API_KEY,
+    params=CMSFetchParams(page_size=settings.CMS_PAGE_SIZE, max_concurrency=settings.CMS_MAX_CONCURRENCY)
+)
\ No newline at end of file
@@ -0,0 +1,82 @@
+import logging
+import threading
+import time
+from typing import Optional, Set
+
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.services.rag.reindex_jobs import reindex_jobs
+
+logger = logging.getLogger(__name__)
+
+
+class CMSWebhookParams(BaseModel):
+    """
+    Configuration parameters for webhook-driven reindexing.
+
+    Attributes:
+        debounce_seconds (float): Quiet period after the last event before the changed entries are reindexed.
+        max_delay_seconds (float): Maximum wait after the first event of a burst, so a continuous
+            stream of edits still gets indexed.
+    """
+    debounce_seconds: float = 2.0
+    max_delay_seconds: float = 10.0
+
+
+class CMSWebhookDebouncer:
+    """
+    Groups the CMS entries reported by webhooks into reindex jobs.
+
+    Each event (re)starts a timer; once no event arrived for `debounce_seconds`, the entries
+    changed in the meantime are reindexed by a single "entries" job. Several saves of the same
+    entry therefore reindex it once.
+    """
+
+    def __init__(self, params: Optional[CMSWebhookParams] = None):
+        """
+        Args:
+            params (Optional[CMSWebhookParams]): Debounce configuration.
+        """
+        self.params = params or CMSWebhookParams()
+
+        self._pending: Set[str] = set()
+        self._first_event: Optional[float] = None
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def notify(self, route: str, document_id: str):
+        """
+        Record a changed CMS entry and postpone the reindex until the edits settle.
+
+        Args:
+            route (str): API route of the entry's table.
+            document_id (str): CMS ID of the entry.
+        """
+        with self._lock:
+            self._pending.add(f"{route}/{document_id}")
+
+            now = time.monotonic()
+            if self._first_event is None:
+                self._first_event = now
+            delay = min(self.params.debounce_seconds, max(0.0, self._first_event + self.params.max_delay_seconds - now))
+
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Queue a reindex job for the pending entries."""
+        with self._lock:
+            entries, self._pending = sorted(self._pending), set()
+            self._first_event = None
+            self._timer = None
+
+        if entries:
+            job = reindex_jobs.submit("entries", entries)
+            logger.info(f"🪝 {len(entries)} CMS entries queued for reindex in job {job.id}")
+
+
+cms_webhook = CMSWebhookDebouncer(CMSWebhookParams(debounce_seconds=settings.CMS_WEBHOOK_DEBOUNCE_SECONDS))
@@ -0,0 +1,60 @@
+from langchain.chat_models import init_chat_model
+
+from app.core.config import settings
+from app.core.startup import LazyComponent, startup
+from app.services.rag.cms_service import cms
+from app.services.rag.embedding_document_store import EmbeddingDocumentStore, EmbeddingDocumentStoreParams
+from app.services.rag.intent_router import IntentRouterParams
+from app.services.rag.rag_pipeline import RAGPipeline
+
+
+def _load_chat_model():
+    """
+    Initialize the Mistral chat model.
+
+    Returns:
+        BaseChatModel: The chat model.
+    """
+    return init_chat_model(
+        settings.MISTRAL_MODEL_NAME,
+        model_provider="mistralai",
+        api_key=settings.MISTRAL_API_KEY
+    )
+
+
+def _load_embedding_store() -> EmbeddingDocumentStore:
+    """
+    Load the embedding model and open the vector store, with the configured backends.
+
+    Returns:
+        EmbeddingDocumentStore: The store.
+    """
+    return EmbeddingDocumentStore(EmbeddingDocumentStoreParams(
+        embedding_backend=settings.EMBEDDING_BACKEND,
+        embedding_model_file=settings.EMBEDDING_MODEL_FILE,
+        vector_backend=settings.VECTOR_BACKEND,
+        numpy_index_path=settings.VECTOR_INDEX_PATH
+    ))
+
+
+def _load_rag_pipeline() -> RAGPipeline:
+    """
+    Assemble the RAG pipeline, waiting for the components it depends on.
+
+    Returns:
+        RAGPipeline: The pipeline.
+    """
+    return RAGPipeline(
+        vector_store=embedding_store.get(),
+        llm=chat_model.get(),
+        ai_information=ai_information.get(),
+        intent_router_params=IntentRouterParams(traffic_log_path=settings.INTENT_TRAFFIC_LOG_PATH)
+    )
+
+
+# Embedding model loading, Chroma connection, LLM client and CMS fetch are independent:
+# the warmup builds them in parallel, and the pipeline only waits for them to finish.
+embedding_store = startup.register(LazyComponent("embedding_store", _load_embedding_store))
+chat_model = startup.register(LazyComponent("chat_model", _load_chat_model))
+ai_information = startup.register(LazyComponent("ai_information", cms.fetch_ai_information))
+rag_pipeline = startup.register(LazyComponent("rag_pipeline", _load_rag_pipeline))
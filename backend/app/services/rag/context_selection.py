@@ -0,0 +1,156 @@
+from typing import Dict, List, Optional
+
+from langchain_core.documents import Document
+from pydantic import BaseModel
+
+
+class ContextSelectionParams(BaseModel):
+    """
+    Configuration parameters of the retrieved context sent to the LLM.
+
+    Attributes:
+        candidates (int): Number of chunks retrieved before selection.
+        min_relevance (float): Chunks less relevant than this (0 to 1) are dropped.
+        relative_cutoff (float): Chunks less relevant than this fraction of the best chunk are dropped.
+        max_context_tokens (int): Approximate token budget of the whole context.
+    """
+    candidates: int = 10
+    min_relevance: float = 0.3
+    relative_cutoff: float = 0.5
+    max_context_tokens: int = 1200
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate the number of tokens of a text, like count_tokens_approximately (4 characters per token).
+
+    Args:
+        text (str): Text to measure.
+
+    Returns:
+        int: Approximate token count.
+    """
+    return (len(text) + 3) // 4
+
+
+def _overlap(previous: str, following: str, start_gap: Optional[int]) -> int:
+    """
+    Find how many leading characters of a chunk repeat the end of the previous one.
+
+    Args:
+        previous (str): Text of the previous chunk.
+        following (str): Text of the following chunk.
+        start_gap (Optional[int]): Difference of the chunks' start_index, when known.
+
+    Returns:
+        int: Length of the repeated prefix.
+    """
+    if start_gap is not None:
+        return max(0, min(len(previous) - start_gap, len(following)))
+
+    # Chunks indexed without start_index: look for the longest suffix/prefix match,
+    # knowing the splitter overlap is always shorter than half a chunk
+    for size in range(min(len(previous), len(following)) // 2, 0, -1):
+        if previous.endswith(following[:size]):
+            return size
+    return 0
+
+
+def merge_adjacent_chunks(documents: List[Document]) -> List[Document]:
+    """
+    Merge chunks that follow each other in the same source document into one passage.
+
+    Chunks are grouped by source document, in the order of their best chunk, and
+    consecutive `chunk_nb` are joined without repeating their overlap.
+
+    Args:
+        documents (List[Document]): Selected chunks, most relevant first.
+
+    Returns:
+        List[Document]: Merged passages, most relevant document first.
+    """
+    groups: Dict[str, List[Document]] = {}
+    for doc in documents:
+        groups.setdefault(doc.metadata.get("id", doc.id or ""), []).append(doc)
+
+    merged = []
+    for chunks in groups.values():
+        chunks.sort(key=lambda d: d.metadata.get("chunk_nb", 0))
+
+        current = chunks[0]
+        text = current.page_content
+        for chunk in chunks[1:]:
+            if chunk.metadata.get("chunk_nb", 0) == current.metadata.get("chunk_nb", 0) + 1:
+                start, previous_start = chunk.metadata.get("start_index", -1), current.metadata.get("start_index", -1)
+                gap = start - previous_start if start >= 0 and previous_start >= 0 else None
+                text += chunk.page_content[_overlap(current.page_content, chunk.page_content, gap):]
+            else:
+                merged.append(Document(page_content=text, metadata=chunks[0].metadata))
+                text = chunk.page_content
+            current = chunk
+        merged.append(Document(page_content=text, metadata=chunks[0].metadata))
+
+    return merged
+
+
+def select_context(documents: List[Document], relevances: List[Optional[float]], params: ContextSelectionParams) -> List[Document]:
+    """
+    Keep the chunks worth sending to the LLM and merge adjacent ones.
+
+    Chunks are dropped below the absolute relevance cutoff and below the relative drop-off
+    from the most relevant chunk, and selection stops once the token budget is spent. The
+    first chunk is always kept. Hybrid search ranks chunks by fused score, so relevances
+    are not sorted and a low one does not end the selection. Keyword-only hits without a
+    relevance are only limited by the token budget.
+
+    Args:
+        documents (List[Document]): Retrieved chunks, in ranking order.
+        relevances (List[Optional[float]]): Relevance of each chunk, from 0 to 1, or None if unscored.
+        params (ContextSelectionParams): Selection parameters.
+
+    Returns:
+        List[Document]: Selected passages.
+    """
+    if not documents:
+        return []
+
+    best = max((relevance for relevance in relevances if relevance is not None), default=0.0)
+    selected, tokens = [], 0
+    for doc, relevance in zip(documents, relevances):
+        if selected:
+            if relevance is not None and (relevance < params.min_relevance or relevance < best * params.relative_cutoff):
+                continue
+            if tokens + estimate_tokens(doc.page_content) > params.max_context_tokens:
+                break
+        selected.append(doc)
+        tokens += estimate_tokens(doc.page_content)
+
+    return merge_adjacent_chunks(selected)
+
+
+def source_label(doc: Document) -> str:
+    """
+    Build a short label of a chunk's source.
+
+    Args:
+        doc (Document): Retrieved chunk.
+
+    Returns:
+        str: Category and title of the source document.
+    """
+    category = doc.metadata.get("category")
+    title = (doc.metadata.get("title") or "").replace("[Title]: ", "").strip()
+    return " - ".join(part for part in (category, title) if part) or "Document"
+
+
+def format_context(documents: List[Document]) -> str:
+    """
+    Serialize selected passages into the tool message content.
+
+    Args:
+        documents (List[Document]): Selected passages.
+
+    Returns:
+        str: Passages with their compact source labels.
+    """
+    return "\n\n".join(f"[{source_label(doc)}]\n{doc.page_content}" for doc in documents)
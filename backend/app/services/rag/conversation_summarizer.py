@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import time
+import weakref
+from typing import List, Optional, Set, Tuple
+
+from langchain_core.messages import AnyMessage, RemoveMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+from langmem.short_term import RunningSummary, asummarize_messages, summarize_messages
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_MESSAGE_ID = "conversation_summary"
+SUMMARY_PREFIX = "Summary of the conversation so far: "
+
+
+class ConversationSummaryParams(BaseModel):
+    """
+    Configuration parameters for the ConversationSummarizer.
+
+    Attributes:
+        enabled (bool): Summarize long conversations at all.
+        background (bool): Summarize after the answer is returned, instead of before generating it.
+        max_tokens_before_summary (int): History size (approximate tokens) that triggers a summarization.
+        max_tokens (int): History size to get back under, summary included.
+        max_summary_tokens (int): Maximum size of the summary.
+    """
+    enabled: bool = True
+    background: bool = True
+    max_tokens_before_summary: int = 1024
+    max_tokens: int = 768
+    max_summary_tokens: int = 256
+
+
+class ConversationSummarizer:
+    """
+    Incremental, token-triggered summarization of the conversation history.
+
+    The history starts with a summary message once a first summarization happened. Each new
+    summarization folds the oldest messages into that summary instead of reprocessing the
+    whole history. Summaries run as background tasks after the answer is returned; the
+    rewrite of the history holds a per-session lock that turns also take, so it never
+    interleaves with a running turn.
+    """
+
+    def __init__(self, model, params: Optional[ConversationSummaryParams] = None):
+        """
+        Args:
+            model: Chat model writing the summaries.
+            params (Optional[ConversationSummaryParams]): Custom summarization parameters.
+        """
+        if params is None:
+            params = ConversationSummaryParams()
+        self.params = params
+        self.model = model
+
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.summaries = 0
+        self.total_seconds = 0.0
+
+    def session_lock(self, session_id: str) -> asyncio.Lock:
+        """
+        Get the lock serializing the turns and history rewrites of a session.
+
+        Args:
+            session_id (str): Unique session/thread identifier.
+
+        Returns:
+            asyncio.Lock: The session lock, shared while anyone holds a reference to it.
+        """
+        lock = self._locks.get(session_id)
+        if lock is None:
+            lock = asyncio.Lock()
+            self._locks[session_id] = lock
+        return lock
+
+    def needs_summary(self, messages: List[AnyMessage]) -> bool:
+        """
+        Tell whether the history exceeds the token budget.
+
+        Args:
+            messages (List[AnyMessage]): Conversation history.
+
+        Returns:
+            bool: True if a summarization should run.
+        """
+        return self.params.enabled and count_tokens_approximately(messages) > self.params.max_tokens_before_summary
+
+    @staticmethod
+    def _split_summary(messages: List[AnyMessage]) -> Tuple[Optional[RunningSummary], List[AnyMessage]]:
+        """
+        Separate the current summary from the messages not summarized yet.
+
+        Args:
+            messages (List[AnyMessage]): Conversation history.
+
+        Returns:
+            Tuple[Optional[RunningSummary], List[AnyMessage]]: Running summary (None before the first one)
+            and the other messages.
+        """
+        if messages and messages[0].id == SUMMARY_MESSAGE_ID:
+            summary = messages[0].content.removeprefix(SUMMARY_PREFIX)
+            return RunningSummary(summary=summary, summarized_message_ids=set(), last_summarized_message_id=None), messages[1:]
+        return None, messages
+
+    def _summary_kwargs(self) -> dict:
+        """Arguments shared by the sync and async langmem summarization calls."""
+        return {
+            "model": self.model,
+            "max_tokens": self.params.max_tokens,
+            "max_tokens_before_summary": self.params.max_tokens_before_summary,
+            "max_summary_tokens": self.params.max_summary_tokens,
+            "token_counter": count_tokens_approximately,
+        }
+
+    @staticmethod
+    def _rewrite(messages: List[AnyMessage], previous: Optional[RunningSummary], result) -> Optional[List[AnyMessage]]:
+        """
+        Build the history update replacing the summarized messages with the new summary.
+
+        Args:
+            messages (List[AnyMessage]): Current conversation history, possibly longer than the summarized snapshot.
+            previous (Optional[RunningSummary]): Summary the snapshot started with.
+            result: langmem summarization result.
+
+        Returns:
+            Optional[List[AnyMessage]]: Messages update, None if nothing was summarized.
+        """
+        running_summary = result.running_summary
+        if running_summary is None or running_summary is previous:
+            return None
+
+        kept = [
+            message for message in messages
+            if message.id != SUMMARY_MESSAGE_ID and message.id not in running_summary.summarized_message_ids
+        ]
+        summary_message = SystemMessage(content=f"{SUMMARY_PREFIX}{running_summary.summary}", id=SUMMARY_MESSAGE_ID)
+        return [RemoveMessage(id=REMOVE_ALL_MESSAGES), summary_message, *kept]
+
+    def summarize(self, graph, config: dict):
+        """
+        Summarize a session's history in place if it exceeds the token budget.
+
+        Args:
+            graph: Compiled conversation graph, with a checkpointer.
+            config (dict): Graph configuration of the session.
+        """
+        messages = graph.get_state(config).values.get("messages", [])
+        if not self.needs_summary(messages):
+            return
+
+        start = time.perf_counter()
+        previous, to_summarize = self._split_summary(messages)
+        result = summarize_messages(to_summarize, running_summary=previous, **self._summary_kwargs())
+
+        update = self._rewrite(graph.get_state(config).values.get("messages", []), previous, result)
+        if update is not None:
+            graph.update_state(config, {"messages": update}, as_node="cleanup_markdown")
+            self._record(time.perf_counter() - start, config)
+
+    async def asummarize(self, graph, config: dict):
+        """
+        Asynchronous version of summarize(). The LLM call runs without the session lock;
+        only the history rewrite takes it, on the latest state.
+
+        Args:
+            graph: Compiled conversation graph, with a checkpointer.
+            config (dict): Graph configuration of the session.
+        """
+        messages = (await graph.aget_state(config)).values.get("messages", [])
+        if not self.needs_summary(messages):
+            return
+
+        start = time.perf_counter()
+        previous, to_summarize = self._split_summary(messages)
+        result = await asummarize_messages(to_summarize, running_summary=previous, **self._summary_kwargs())
+
+        async with self.session_lock(config["configurable"]["thread_id"]):
+            update = self._rewrite((await graph.aget_state(config)).values.get("messages", []), previous, result)
+            if update is not None:
+                await graph.aupdate_state(config, {"messages": update}, as_node="cleanup_markdown")
+        if update is not None:
+            self._record(time.perf_counter() - start, config)
+
+    def schedule(self, graph, config: dict):
+        """
+        Summarize a session in a background task, unless one is already running for it.
+
+        Args:
+            graph: Compiled conversation graph, with a checkpointer.
+            config (dict): Graph configuration of the session.
+        """
+        session_id = config["configurable"]["thread_id"]
+        if not self.params.enabled or session_id in self._running:
+            return
+
+        async def run():
+            try:
+                await self.asummarize(graph, config)
+            except Exception as e:
+                logger.exception(f"❌ Background summarization failed for session {session_id!r}: {e}")
+            finally:
+                self._running.discard(session_id)
+
+        self._running.add(session_id)
+        task = asyncio.create_task(run())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _record(self, seconds: float, config: dict):
+        """Count a summarization and log its duration."""
+        self.summaries += 1
+        self.total_seconds += seconds
+        logger.info(f"📝 Summarized session {config['configurable']['thread_id']!r} in {seconds * 1000:.0f} ms")
+
+    def stats(self) -> dict:
+        """
+        Get the summarization counters.
+
+        Returns:
+            dict: Number of summaries, their average duration, and the ones running.
+        """
+        return {
+            "summaries": self.summaries,
+            "average_ms": round(self.total_seconds / self.summaries * 1000, 1) if self.summaries else None,
+            "running": len(self._running),
+        }
@@ -0,0 +1,336 @@
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from app.utils.hashing import sha256_hex
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """
+    Persistent LRU cache of embedding vectors stored in SQLite.
+
+    Vectors are keyed by (embedding model, kind, sha256(text)) and stored as float32 blobs.
+    When the number of entries exceeds `max_entries`, the least recently used entries are evicted.
+
+    Lookups do not write: access times are buffered in memory and written in batches of
+    `access_flush_size`, before an eviction and at exit. The number of entries is tracked
+    in memory, and only recounted when it crosses `max_entries`, since other processes may
+    share the file.
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000, access_flush_size: int = 256):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path (str): Path of the SQLite database file.
+            max_entries (int): Maximum number of vectors kept in the cache.
+            access_flush_size (int): Number of buffered access times that triggers a write.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.access_flush_size = access_flush_size
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)")
+        self._conn.commit()
+
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        self._pending_access: Dict[Tuple[str, str], float] = {}
+        atexit.register(self.flush)
+
+    def get_many(self, model: str, text_hashes: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up cached vectors and mark them as recently used.
+
+        Args:
+            model (str): Cache namespace (embedding model and kind).
+            text_hashes (List[str]): Hashes of the texts to look up.
+
+        Returns:
+            Dict[str, List[float]]: Cached vectors by text hash. Missing hashes are absent.
+        """
+        if not text_hashes:
+            return {}
+
+        found: Dict[str, List[float]] = {}
+        unique_hashes = list(dict.fromkeys(text_hashes))
+
+        with self._lock:
+            # Stay well under SQLite's bound parameter limit
+            for start in range(0, len(unique_hashes), 500):
+                batch = unique_hashes[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *batch],
+                ).fetchall()
+                for text_hash, blob in rows:
+                    vector = array("f")
+                    vector.frombytes(blob)
+                    found[text_hash] = vector.tolist()
+
+            self._touch(model, found)
+            if len(self._pending_access) >= self.access_flush_size:
+                self._flush_access()
+                self._conn.commit()
+
+            self.hits += len(found)
+            self.misses += len(unique_hashes) - len(found)
+
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]):
+        """
+        Store vectors in the cache, evicting least recently used entries if needed.
+
+        Args:
+            model (str): Cache namespace (embedding model and kind).
+            vectors (Dict[str, List[float]]): Vectors by text hash.
+        """
+        if not vectors:
+            return
+
+        with self._lock:
+            now = time.time()
+            # A text always gets the same vector: entries already cached (by another process) are only touched
+            inserted = self._conn.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                [(model, text_hash, array("f", vector).tobytes(), now) for text_hash, vector in vectors.items()],
+            ).rowcount
+            self._count += inserted
+            if inserted < len(vectors):
+                self._touch(model, vectors)
+            self._evict()
+            self._conn.commit()
+
+    def flush(self):
+        """Write the buffered access times."""
+        with self._lock:
+            if self._pending_access:
+                self._flush_access()
+                self._conn.commit()
+
+    def _touch(self, model: str, text_hashes: Iterable[str]):
+        """Buffer the access time of entries."""
+        now = time.time()
+        for text_hash in text_hashes:
+            self._pending_access[(model, text_hash)] = now
+
+    def _flush_access(self):
+        """Write the buffered access times, in the caller's transaction."""
+        self._conn.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+            [(last_used, model, text_hash) for (model, text_hash), last_used in self._pending_access.items()],
+        )
+        self._pending_access.clear()
+
+    def _evict(self):
+        """Delete the least recently used entries above `max_entries`."""
+        if self._count <= self.max_entries:
+            return
+
+        # Other processes sharing the file may have added or evicted entries
+        self._count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = self._count - self.max_entries
+        if overflow <= 0:
+            return
+
+        self._flush_access()
+        deleted = self._conn.execute(
+            "DELETE FROM embeddings WHERE rowid IN (SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+            (overflow,),
+        ).rowcount
+        self._count -= deleted
+        logger.debug(f"Evicted {deleted} embeddings from cache '{self.path}'")
+
+    def stats(self) -> dict:
+        """
+        Report the cache usage.
+
+        Returns:
+            dict: Cache size and hit/miss counters.
+        """
+        with self._lock:
+            return {"entries": self._count, "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that checks an EmbeddingCache before calling the wrapped model.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache, model_name: str):
+        """
+        Wrap an embedding model with a persistent cache.
+
+        Args:
+            embeddings (Embeddings): Embedding model used on cache misses.
+            cache (EmbeddingCache): Persistent vector cache.
+            model_name (str): Name of the embedding model, used as cache namespace.
+        """
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model_name = model_name
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents, only sending texts absent from the cache to the model.
+
+        Args:
+            texts (List[str]): Texts to embed.
+
+        Returns:
+            List[List[float]]: One vector per text, in the same order.
+        """
+        namespace = f"{self.model_name}:document"
+        hashes = [sha256_hex(text) for text in texts]
+        vectors = self.cache.get_many(namespace, hashes)
+
+        missing = {h: text for h, text in zip(hashes, texts) if h not in vectors}
+        if missing:
+            computed = self.embeddings.embed_documents(list(missing.values()))
+            new_vectors = dict(zip(missing.keys(), computed))
+            self.cache.put_many(namespace, new_vectors)
+            vectors.update(new_vectors)
+
+        logger.debug(f"Embedding cache: {len(texts) - len(missing)}/{len(texts)} documents served from cache")
+        return [vectors[h] for h in hashes]
+
+    def cached_documents(self, texts: List[str]) -> Dict[str, List[float]]:
+        """
+        Look up the cached vectors of documents, without calling the model on misses.
+
+        Args:
+            texts (List[str]): Document texts.
+
+        Returns:
+            Dict[str, List[float]]: Cached vectors by text. Texts absent from the cache are missing.
+        """
+        hashes = {sha256_hex(text): text for text in texts}
+        vectors = self.cache.get_many(f"{self.model_name}:document", list(hashes))
+        return {hashes[text_hash]: vector for text_hash, vector in vectors.items()}
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, using the cached vector if the same query was embedded before.
+
+        Args:
+            text (str): Query to embed.
+
+        Returns:
+            List[float]: Query vector.
+        """
+        namespace = f"{self.model_name}:query"
+        text_hash = sha256_hex(text)
+        cached = self.cache.get_many(namespace, [text_hash])
+        if text_hash in cached:
+            return cached[text_hash]
+
+        vector = self.embeddings.embed_query(text)
+        self.cache.put_many(namespace, {text_hash: vector})
+        return vector
+
+
+class LRUQueryEmbeddings(Embeddings):
+    """
+    Embeddings wrapper keeping the most recent query vectors in process memory.
+
+    Repeated questions and retried tool calls are served without touching the model
+    or the persistent cache. Documents are passed through unchanged.
+    """
+
+    def __init__(self, embeddings: Embeddings, max_entries: int = 1024):
+        """
+        Wrap an embedding model with an in-memory query cache.
+
+        Args:
+            embeddings (Embeddings): Embedding model used on cache misses.
+            max_entries (int): Maximum number of query vectors kept, least recently used ones are evicted first.
+        """
+        self.embeddings = embeddings
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._vectors: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents with the wrapped model.
+
+        Args:
+            texts (List[str]): Texts to embed.
+
+        Returns:
+            List[List[float]]: One vector per text, in the same order.
+        """
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query, reusing the vector of a recent identical query.
+
+        Args:
+            text (str): Query to embed.
+
+        Returns:
+            List[float]: Query vector.
+        """
+        with self._lock:
+            vector = self._vectors.get(text)
+            if vector is not None:
+                self._vectors.move_to_end(text)
+                self.hits += 1
+                return vector
+            self.misses += 1
+
+        vector = self.embeddings.embed_query(text)
+
+        with self._lock:
+            self._vectors[text] = vector
+            self._vectors.move_to_end(text)
+            while len(self._vectors) > self.max_entries:
+                self._vectors.popitem(last=False)
+        return vector
+
+    def stats(self) -> dict:
+        """
+        Report the cache usage.
+
+        Returns:
+            dict: Cache size and hit/miss counters.
+        """
+        with self._lock:
+            return {"entries": len(self._vectors), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
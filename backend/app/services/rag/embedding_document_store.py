@@ -1,6 +1,18 @@
+import asyncio
+import atexit
 import logging
-from typing import List, Optional
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Literal, Optional, Set, Tuple
 
+import numpy as np
+from langchain_core.documents import Document
 from pydantic import BaseModel
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
@@ -8,6 +20,13 @@ from langchain_huggingface import HuggingFaceEmbeddings
 
 from app.core.config import settings
 from app.models.document_model import DocumentModel
+from app.models.indexing_report import IndexingReport
+from app.services.rag.indexing_progress import IndexingProgress, track
+from app.services.rag.embedding_cache import CachedEmbeddings, EmbeddingCache, LRUQueryEmbeddings
+from app.services.rag.keyword_index import BM25Index, reciprocal_rank_fusion
+from app.services.rag.multiprocess_embeddings import MultiProcessEmbeddings
+from app.services.rag.numpy_vector_index import NumpyVectorIndex
+from app.utils.hashing import sha256_hex
 from app.utils.text_cleaner import clean_text
 
 logger = logging.getLogger(__name__)
@@ -19,20 +38,67 @@ class EmbeddingDocumentStoreParams(BaseModel):
 
     Attributes:
         embedding_model (str): Name of the embedding model to use.
+        embedding_backend (str): sentence-transformers backend running the model: "torch", "onnx" or "openvino".
+        embedding_model_file (Optional[str]): Model file to load with the onnx/openvino backends,
+            e.g. "onnx/model_qint8_avx2.onnx" for the int8-quantized model. None for the default file.
         collection_name (str): Name of the vector store collection.
+        vector_backend (str): "chroma" for the Chroma server, "numpy" for the in-process memory-mapped index.
+        numpy_index_path (str): Directory of the in-process index files, used with the "numpy" backend.
         chunk_size (int): Maximum size of text chunks.
         chunk_overlap (int): Number of overlapping characters between chunks.
+        embedding_cache_path (Optional[str]): SQLite file of the persistent embedding cache, None to disable it.
+        embedding_cache_max_entries (int): Maximum number of vectors kept in the embedding cache.
+        query_cache_size (int): Number of recent query vectors kept in process memory, 0 to disable.
+        search_workers (int): Size of the thread pool running searches off the event loop.
+        search_mode (str): "dense" for vector search only, "hybrid" to fuse it with BM25 keyword search.
+        hybrid_candidates (int): Number of results taken from each ranking before fusion.
+        max_chunks_per_document (int): Maximum number of chunks of the same source document in search results.
+        ingest_batch_size (int): Number of chunks embedded and written together when indexing.
+        encode_processes (int): Worker processes encoding document batches, -1 for one per core,
+            0 or 1 to encode in the current process.
+        min_rebuild_ratio (float): Minimum size of a rebuilt collection, as a fraction of the live one,
+            for it to replace the live one.
+        refresh_check_seconds (float): Minimum interval between two checks for changes made by other
+            processes: a rebuild switching the alias, or writes to the live collection.
+        retired_grace_seconds (float): Time a collection replaced by a rebuild, and no longer kept for
+            rollback, stays in place before being dropped, so other processes stop serving it first.
+            Must exceed `refresh_check_seconds` plus the duration of a search.
     """
     embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_backend: Literal["torch", "onnx", "openvino"] = "torch"
+    embedding_model_file: Optional[str] = None
     collection_name: str = "cms_documents"
+    vector_backend: Literal["chroma", "numpy"] = "chroma"
+    numpy_index_path: str = ".cache/vector_index"
     chunk_size: int = 500
     chunk_overlap: int = 50
+    embedding_cache_path: Optional[str] = ".cache/embeddings.sqlite3"
+    embedding_cache_max_entries: int = 100_000
+    query_cache_size: int = 1024
+    search_workers: int = 4
+    search_mode: Literal["dense", "hybrid"] = "hybrid"
+    hybrid_candidates: int = 20
+    max_chunks_per_document: int = 3
+    ingest_batch_size: int = 256
+    encode_processes: int = 0
+    min_rebuild_ratio: float = 0.5
+    refresh_check_seconds: float = 5.0
+    retired_grace_seconds: float = 300.0
 
 
 class EmbeddingDocumentStore:
     """
     Handles storage, splitting, embedding, and retrieval of documents
     using a vector store.
+
+    `collection_name` is an alias: the live physical collection is recorded next to it, so a
+    full rebuild can fill a new collection in the background and replace the live one at once,
+    keeping the previous one for rollback.
+
+    Several processes (workers, replicas) can serve the same alias. Each one re-reads it before
+    searching, at most every `refresh_check_seconds`, and follows a switch made by another one.
+    Collections replaced by a rebuild are only dropped `retired_grace_seconds` later, at a
+    following rebuild, so they are never deleted under a process still serving them.
     """
     _instance = None
 
@@ -52,7 +118,29 @@ class EmbeddingDocumentStore:
             params = EmbeddingDocumentStoreParams()
         self.params = params
 
-        self.embeddings = HuggingFaceEmbeddings(model_name=self.params.embedding_model)
+        processes = (os.cpu_count() or 1) if self.params.encode_processes == -1 else self.params.encode_processes
+        if processes > 1:
+            self.embeddings = MultiProcessEmbeddings(self.params.embedding_model, processes, self._model_kwargs())
+            atexit.register(self.embeddings.close)
+        else:
+            self.embeddings = HuggingFaceEmbeddings(
+                model_name=self.params.embedding_model,
+                model_kwargs=self._model_kwargs()
+            )
+        if self.params.embedding_cache_path:
+            self.embedding_cache = EmbeddingCache(
+                path=self.params.embedding_cache_path,
+                max_entries=self.params.embedding_cache_max_entries
+            )
+            self.embeddings = self.document_cache = CachedEmbeddings(self.embeddings, self.embedding_cache, self.embedding_id)
+        else:
+            self.embedding_cache = self.document_cache = None
+
+        if self.params.query_cache_size > 0:
+            self.query_cache = LRUQueryEmbeddings(self.embeddings, self.params.query_cache_size)
+            self.embeddings = self.query_cache
+        else:
+            self.query_cache = None
 
         self.text_splitter = RecursiveCharacterTextSplitter(
             chunk_size=self.params.chunk_size,
@@ -60,32 +148,384 @@ class EmbeddingDocumentStore:
             add_start_index=True
         )
 
+        # Bounded pool for query embedding (CPU-bound) and vector store calls (blocking I/O)
+        self._search_executor = ThreadPoolExecutor(
+            max_workers=self.params.search_workers,
+            thread_name_prefix="similarity-search"
+        )
+
+        # Incremented whenever the collection content changes, so caches built on it can be invalidated
+        self.index_version = 0
+
+        # Keyword index kept alongside the vector store, with the chunks it can return
+        self.keyword_index = BM25Index()
+        self._keyword_chunks: Dict[str, Document] = {}
+        self._category_chunks: Dict[str, Set[str]] = {}
+
+        # Revision of the live collection the keyword index reflects, compared with the stored one
+        # to pick up the switches and writes of other processes (other workers, another replica)
+        self._keyword_revision = None
+        self._next_revision_check = 0.0
+        self._live_writers = 0
+        self._refresh_lock = threading.Lock()
+
+        # Serializes collection rebuilds, swaps and rollbacks
+        self._swap_lock = threading.Lock()
+        self._alias_store = None
+
         self.vector_store = None
-        self._connect_to_chroma()
+        self.live_collection = self.params.collection_name
+        self._connect_vector_store()
+        self._rebuild_keyword_index()
+
+    def _connect_vector_store(self):
+        """
+        Open the live collection of the configured vector store backend.
+        """
+        self.live_collection = self._read_alias()["live"]
+        self.vector_store = self._open_collection(self.live_collection)
+
+    def _open_collection(self, name: str):
+        """
+        Open a physical collection of the configured backend, creating it if needed.
+
+        Args:
+            name (str): Physical collection name.
+
+        Returns:
+            Chroma | NumpyVectorIndex: The collection.
+        """
+        if self.params.vector_backend == "numpy":
+            return NumpyVectorIndex(os.path.join(self.params.numpy_index_path, name))
+        return self._connect_to_chroma(name, self.embeddings)
 
-    def _connect_to_chroma(self):
+    @staticmethod
+    def _connect_to_chroma(collection_name: str, embedding_function=None) -> Chroma:
         """
         Try to connect to ChromaDB using remote host,
         fallback to local in-memory instance if it fails.
+
+        Args:
+            collection_name (str): Collection to open.
+            embedding_function: Embeddings of the collection, None for collections written with raw vectors only.
+
+        Returns:
+            Chroma: The collection.
         """
         try:
             logger.info(f"Trying to connect to chromaDB via: {settings.CHROMA_API_URL}")
-            self.vector_store = Chroma(
-                collection_name=self.params.collection_name,
-                embedding_function=self.embeddings,
+            vector_store = Chroma(
+                collection_name=collection_name,
+                embedding_function=embedding_function,
                 host=settings.CHROMA_API_URL
             )
             logger.info("✅ Connected to remote ChromaDB.")
         except ValueError:
             logger.warning("⚠️ Could not connect to ChromaDB. Fallback on memory storage.")
-            self.vector_store = Chroma(
-                collection_name=self.params.collection_name,
-                embedding_function=self.embeddings,
+            vector_store = Chroma(
+                collection_name=collection_name,
+                embedding_function=embedding_function,
             )
+        return vector_store
+
+    # ------------------- Collection alias -------------------
+
+    def _alias_path(self) -> str:
+        """File recording the live collection of the in-process backend."""
+        return os.path.join(self.params.numpy_index_path, f"{self.params.collection_name}.alias.json")
+
+    def _read_alias(self) -> dict:
+        """
+        Read which physical collections are live and kept for rollback.
+
+        Returns:
+            dict: "live" and "previous" collection names, and the "retired" collections waiting
+            to be dropped, with the time they were retired. Without any recorded alias, the live
+            collection is the one named `collection_name`.
+        """
+        alias = None
+        if self.params.vector_backend == "numpy":
+            if os.path.exists(self._alias_path()):
+                with open(self._alias_path(), encoding="utf-8") as f:
+                    alias = json.load(f)
+        else:
+            if self._alias_store is None:
+                self._alias_store = self._connect_to_chroma(f"{self.params.collection_name}__alias")
+            stored = self._alias_store.get(ids=["alias"], include=["metadatas"])
+            if stored["ids"]:
+                alias = stored["metadatas"][0]
+
+        if not alias:
+            return {"live": self.params.collection_name, "previous": "", "retired": {}}
+        retired = alias.get("retired") or {}
+        if isinstance(retired, str):
+            retired = json.loads(retired)
+        return {"live": alias["live"], "previous": alias.get("previous", ""), "retired": retired}
+
+    def _write_alias(self, live: str, previous: str, retired: Optional[Dict[str, float]] = None):
+        """
+        Atomically point the alias to another physical collection.
+
+        Args:
+            live (str): Collection to serve.
+            previous (str): Collection kept for rollback.
+            retired (Optional[Dict[str, float]]): Collections waiting to be dropped, with the time they were retired.
+        """
+        alias = {"live": live, "previous": previous, "retired": retired or {}}
+        if self.params.vector_backend == "numpy":
+            os.makedirs(self.params.numpy_index_path, exist_ok=True)
+            tmp_path = f"{self._alias_path()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(alias, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._alias_path())
+        else:
+            # Single record, so the write is atomic on the Chroma side. Metadata values are scalars.
+            metadata = {**alias, "retired": json.dumps(alias["retired"])}
+            self._alias_store._collection.upsert(ids=["alias"], embeddings=[[0.0]], metadatas=[metadata], documents=[""])
+
+    def _store_revision(self):
+        """
+        Identify the stored content of the live collection, to tell whether another process changed it.
+
+        Returns:
+            The manifest modification time of the in-process index, or the revision recorded
+            next to the alias by the last Chroma write. None if the collection was never written.
+        """
+        if isinstance(self.vector_store, NumpyVectorIndex):
+            return self.vector_store.revision()
+        stored = self._alias_store.get(ids=["revision"], include=["metadatas"])
+        return stored["metadatas"][0].get("revision") if stored["ids"] else None
+
+    def _bump_revision(self):
+        """Record that the live Chroma collection changed, for the other processes serving it."""
+        if not isinstance(self.vector_store, NumpyVectorIndex):
+            self._alias_store._collection.upsert(
+                ids=["revision"], embeddings=[[0.0]], metadatas=[{"revision": time.time_ns()}], documents=[""]
+            )
+
+    @contextmanager
+    def _live_write(self):
+        """
+        Wrap writes of this process to the live collection. The keyword index follows them
+        incrementally, so it is not refreshed meanwhile, and the written revision is recorded as known.
+        """
+        with self._refresh_lock:
+            self._live_writers += 1
+        try:
+            yield
+        finally:
+            self._bump_revision()
+            with self._refresh_lock:
+                self._live_writers -= 1
+                self._keyword_revision = self._store_revision()
+
+    def _refresh_live_collection(self, force: bool = False):
+        """
+        Follow the changes made by other processes: serve the collection the alias points to if
+        another process switched it, and rebuild the keyword index if another process wrote to it.
+
+        Checked at most every `refresh_check_seconds` unless forced, and skipped while this
+        process writes to the collection, swaps it, or another search already checks it.
+
+        Args:
+            force (bool): Check now, waiting for a running check, e.g. before writing to the live collection.
+        """
+        now = time.monotonic()
+        if not force and now < self._next_revision_check:
+            return
+        if self._swap_lock.locked() or not self._refresh_lock.acquire(blocking=force):
+            return
+        try:
+            if self._live_writers:
+                return
+            self._next_revision_check = now + self.params.refresh_check_seconds
+
+            live = self._read_alias()["live"]
+            if live != self.live_collection:
+                logger.info(f"🔀 Collection '{self.params.collection_name}' switched to '{live}' by another process")
+                self.vector_store = self._open_collection(live)
+                self.live_collection = live
+            elif self._store_revision() != self._keyword_revision:
+                logger.info(f"🔤 Collection '{live}' changed in another process, rebuilding the keyword index")
+            else:
+                return
+            self._rebuild_keyword_index()
+            self.index_version += 1
+        finally:
+            self._refresh_lock.release()
+
+    def _drop_collection(self, name: str):
+        """
+        Delete a physical collection that is no longer live nor kept for rollback.
+
+        Args:
+            name (str): Physical collection name.
+        """
+        try:
+            if self.params.vector_backend == "numpy":
+                shutil.rmtree(os.path.join(self.params.numpy_index_path, name))
+            else:
+                self._open_collection(name).delete_collection()
+            logger.info(f"🗑️ Dropped collection '{name}'")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not drop collection '{name}': {e}")
+
+    def _drop_retired(self, retired: Dict[str, float]) -> Dict[str, float]:
+        """
+        Drop the retired collections older than `retired_grace_seconds`.
+
+        Args:
+            retired (Dict[str, float]): Retired collections, with the time they were retired.
+
+        Returns:
+            Dict[str, float]: Retired collections still within their grace period.
+        """
+        now = time.time()
+        kept = {}
+        for name, retired_at in retired.items():
+            if now - retired_at >= self.params.retired_grace_seconds:
+                self._drop_collection(name)
+            else:
+                kept[name] = retired_at
+        return kept
+
+    def _switch_to(self, name: str, store, previous: str, retired: Optional[Dict[str, float]] = None):
+        """
+        Serve another collection: record the alias, then switch searches and the keyword index to it.
+
+        Args:
+            name (str): Physical collection to serve.
+            store: The opened collection.
+            previous (str): Collection kept for rollback.
+            retired (Optional[Dict[str, float]]): Collections waiting to be dropped.
+        """
+        self._write_alias(name, previous, retired)
+        self.vector_store = store
+        self.live_collection = name
+        self._rebuild_keyword_index()
+        self.index_version += 1
+        logger.info(f"🔀 Collection '{self.params.collection_name}' now serves '{name}' (rollback: '{previous}')")
+
+    def rebuild_collection(
+        self,
+        documents: Iterable[DocumentModel],
+        smoke_query: Optional[str] = None,
+        progress: Optional[IndexingProgress] = None
+    ) -> IndexingReport:
+        """
+        Re-index every document into a new collection, validate it, then swap it live (blue/green).
+
+        Searches keep using the live collection while the new one is filled. The new collection
+        must hold every written chunk, at least `min_rebuild_ratio` of the live collection size,
+        and answer a smoke query with chunks of the current fingerprint; otherwise it is dropped
+        and the live collection stays untouched. The replaced collection is kept for rollback,
+        and the one kept before it is retired, to be dropped by a rebuild once other processes
+        cannot serve it anymore.
+
+        Args:
+            documents (Iterable[DocumentModel]): Complete set of documents to index.
+            smoke_query (Optional[str]): Query checked against the new collection. Defaults to the first document title.
+            progress (Optional[IndexingProgress]): Tracker of the indexing phases.
+
+        Returns:
+            IndexingReport: Number of chunks written to the new collection.
+
+        Raises:
+            RuntimeError: If another rebuild is running.
+            ValueError: If the new collection fails validation.
+        """
+        if not self._swap_lock.acquire(blocking=False):
+            raise RuntimeError("A collection rebuild is already running.")
+        try:
+            start = time.perf_counter()
+            alias = self._read_alias()
+            shadow_name = f"{self.params.collection_name}__{time.strftime('%Y%m%d%H%M%S')}_{time.time_ns() % 1_000_000:06d}"
+            shadow = self._open_collection(shadow_name)
+            logger.info(f"🏗️ Building collection '{shadow_name}' alongside live '{alias['live']}'")
+
+            documents = list(documents)
+
+            def chunks() -> Iterator[Tuple[str, str, dict]]:
+                for doc in documents:
+                    yield from zip(*self._prepare_chunks(doc, progress))
+
+            try:
+                count, _ = self._ingest(chunks(), target=shadow, progress=progress)
+                if isinstance(shadow, NumpyVectorIndex):
+                    shadow.persist()
+                self._validate_collection(shadow, count, smoke_query or next((d.title for d in documents if d.title), None))
+            except Exception:
+                self._drop_collection(shadow_name)
+                raise
+
+            retired = dict(alias["retired"])
+            if alias["previous"] and alias["previous"] not in (alias["live"], shadow_name):
+                retired[alias["previous"]] = time.time()
+            self._switch_to(shadow_name, shadow, previous=alias["live"], retired=self._drop_retired(retired))
+
+            return IndexingReport(added=count, duration_seconds=time.perf_counter() - start)
+        finally:
+            self._swap_lock.release()
+
+    def _validate_collection(self, store, expected_count: int, smoke_query: Optional[str]):
+        """
+        Check that a rebuilt collection can replace the live one.
+
+        Args:
+            store: The rebuilt collection.
+            expected_count (int): Number of chunks written to it.
+            smoke_query (Optional[str]): Query that must return chunks.
+
+        Raises:
+            ValueError: If a check fails.
+        """
+        stored_count = len(store.get(include=["metadatas"])["ids"])
+        if stored_count != expected_count:
+            raise ValueError(f"Rebuilt collection holds {stored_count} chunks, {expected_count} were written.")
+
+        live_count = len(self._keyword_chunks)
+        if stored_count < live_count * self.params.min_rebuild_ratio:
+            raise ValueError(
+                f"Rebuilt collection holds {stored_count} chunks, less than {self.params.min_rebuild_ratio:.0%} "
+                f"of the {live_count} live ones."
+            )
+
+        if smoke_query and stored_count:
+            results = store.similarity_search_by_vector_with_relevance_scores(embedding=self.embed_query(smoke_query), k=3)
+            if not results or any(doc.metadata.get("fingerprint") != self.index_fingerprint for doc, _ in results):
+                raise ValueError(f"Rebuilt collection failed the smoke query {smoke_query!r}.")
+
+        logger.info(f"✅ Rebuilt collection validated ({stored_count} chunks, live had {live_count})")
+
+    def rollback_collection(self) -> str:
+        """
+        Serve the collection that was live before the last rebuild again.
+
+        Returns:
+            str: Name of the collection now live.
+
+        Raises:
+            RuntimeError: If a rebuild is running.
+            ValueError: If there is no collection to roll back to.
+        """
+        if not self._swap_lock.acquire(blocking=False):
+            raise RuntimeError("A collection rebuild is running.")
+        try:
+            alias = self._read_alias()
+            if not alias["previous"]:
+                raise ValueError("No previous collection to roll back to.")
+            self._switch_to(
+                alias["previous"], self._open_collection(alias["previous"]), previous=alias["live"], retired=alias["retired"]
+            )
+            return alias["previous"]
+        finally:
+            self._swap_lock.release()
 
     def clear_collection(self):
         """
-        Delete all existing vectors from the Chroma collection and recreate it.
+        Delete all existing vectors from the collection and recreate it.
         Keeps the same connection logic (remote with fallback).
         """
         try:
@@ -94,7 +534,9 @@ class EmbeddingDocumentStore:
         except Exception as e:
             logger.warning(f"⚠️ Could not delete collection directly: {e}")
 
-        self._connect_to_chroma()
+        self._connect_vector_store()
+        self._rebuild_keyword_index()
+        self.index_version += 1
         logger.info(f"✅ Collection '{self.params.collection_name}' cleared and reinitialized.")
 
 
@@ -111,47 +553,631 @@ class EmbeddingDocumentStore:
         chunks = self.text_splitter.split_text(text)
         return chunks
 
-    def add_documents(self, documents: List[DocumentModel]):
+    def _model_kwargs(self) -> dict:
+        """
+        Build the sentence-transformers constructor arguments selecting the embedding backend.
+
+        Returns:
+            dict: Backend and model file arguments, empty for the default PyTorch model.
+        """
+        if self.params.embedding_backend == "torch":
+            return {}
+
+        kwargs = {"backend": self.params.embedding_backend}
+        if self.params.embedding_model_file:
+            kwargs["model_kwargs"] = {"file_name": self.params.embedding_model_file}
+        return kwargs
+
+    @property
+    def embedding_id(self) -> str:
+        """
+        Identifies the model producing the vectors. Backends and quantized files give
+        slightly different vectors, so they do not share cached vectors.
+        """
+        if self.params.embedding_backend == "torch":
+            return self.params.embedding_model
+        return f"{self.params.embedding_model}[{self.params.embedding_backend}:{self.params.embedding_model_file or 'default'}]"
+
+    @property
+    def index_fingerprint(self) -> str:
         """
-        Cleans, splits, and stores a list of documents in the vector store.
+        Identifies the settings that shape the stored chunks and vectors.
+        Chunks indexed under another fingerprint are always re-embedded.
+        """
+        return f"{self.embedding_id}:{self.params.chunk_size}:{self.params.chunk_overlap}"
+
+    @staticmethod
+    def _chunk_id(doc_id: str, chunk_nb: int) -> str:
+        """
+        Build the deterministic vector store ID of a document chunk.
 
         Args:
-            documents (List[DocumentModel]): List of documents to store.
+            doc_id (str): ID of the source document.
+            chunk_nb (int): Position of the chunk in the document.
 
         Returns:
-            int: Total number of text chunks added.
+            str: Stable chunk ID, so re-indexing a chunk overwrites it instead of duplicating it.
+        """
+        return f"{doc_id}:{chunk_nb}"
+
+    def _prepare_chunks(self, doc: DocumentModel, progress: Optional[IndexingProgress] = None) -> Tuple[List[str], List[str], List[dict]]:
         """
-        all_splits = []
-        metadatas = []
+        Clean and split a document into chunks with their IDs and metadata.
+
+        Args:
+            doc (DocumentModel): Document to prepare.
+            progress (Optional[IndexingProgress]): Tracker timing the clean and split phases.
 
-        for doc in documents:
-            # Clean the text
+        Returns:
+            Tuple[List[str], List[str], List[dict]]: Chunk IDs, chunk texts and chunk metadata.
+        """
+        # Clean the text
+        with track(progress, "clean", items=1):
             text = clean_text(doc.text)
 
-            # Split large texts into chunks
-            splits = self.split_text(text)
-            all_splits.extend(splits)
+        # Split large texts into chunks, keeping their position so adjacent chunks can be merged back
+        with track(progress, "split", items=1):
+            split_documents = self.text_splitter.create_documents([text])
+        splits = [split.page_content for split in split_documents]
 
-            # Add metadata for each chunk
-            metadatas.extend([{"id": doc.id, "title": doc.title, "chunk_nb": i, "category": doc.category} for i, _ in
-                              enumerate(splits)])
+        ids = [self._chunk_id(doc.id, i) for i, _ in enumerate(splits)]
+        metadatas = [
+            {
+                "id": doc.id,
+                "title": doc.title,
+                "chunk_nb": i,
+                "start_index": split_documents[i].metadata.get("start_index", -1),
+                "category": doc.category,
+                "updated_at": doc.updated_at.isoformat() if doc.updated_at else "",
+                "content_hash": sha256_hex(split),
+                "fingerprint": self.index_fingerprint,
+            }
+            for i, split in enumerate(splits)
+        ]
+        return ids, splits, metadatas
 
-        # Store and index chunks
-        _ = self.vector_store.add_texts(texts=all_splits, metadatas=metadatas)
-        return len(all_splits)
+    def add_documents(self, documents: Iterable[DocumentModel]):
+        """
+        Cleans, splits, and stores documents in the vector store, batch by batch.
+
+        Args:
+            documents (Iterable[DocumentModel]): Documents to store.
+
+        Returns:
+            int: Total number of text chunks added.
+        """
+        def chunks() -> Iterator[Tuple[str, str, dict]]:
+            for doc in documents:
+                yield from zip(*self._prepare_chunks(doc))
+
+        self._refresh_live_collection(force=True)
+        with self._live_write():
+            count, _ = self._ingest(chunks())
+            if count:
+                self._persist()
+                self.index_version += 1
+        return count
 
-    def similarity_search(self, query: str, k: int = 10):
+    def _upsert(self, ids: List[str], texts: List[str], vectors: List[List[float]], metadatas: List[dict], target=None):
         """
-        Performs a similarity search for a query in the vector store.
+        Write already embedded chunks to the vector store.
+
+        Args:
+            ids (List[str]): Chunk IDs.
+            texts (List[str]): Chunk texts.
+            vectors (List[List[float]]): Chunk vectors.
+            metadatas (List[dict]): Chunk metadata.
+            target: Collection to write to, the live one by default. The keyword index
+                only follows writes to the live collection.
+        """
+        store = target if target is not None else self.vector_store
+        if isinstance(store, NumpyVectorIndex):
+            store.upsert(ids=ids, texts=texts, vectors=vectors, metadatas=metadatas)
+        else:
+            # Same call as Chroma.add_texts(), minus the embedding step done beforehand
+            store._collection.upsert(ids=ids, embeddings=vectors, metadatas=metadatas, documents=texts)
+        if store is self.vector_store:
+            self._index_keywords(ids, texts, metadatas)
+
+    def _tracked_upsert(self, progress: Optional[IndexingProgress], ids, texts, vectors, metadatas, target=None):
+        """_upsert() timed as the upsert phase, from the background writer thread."""
+        with track(progress, "upsert", items=len(ids), current=False):
+            self._upsert(ids, texts, vectors, metadatas, target)
+
+    def _rebuild_keyword_index(self):
+        """
+        Rebuild the keyword index from the chunks stored in the vector store.
+        The new index is built aside and replaces the current one at once.
+        """
+        # Read before the chunks, so a change made while they are listed is picked up by the next refresh
+        revision = self._store_revision()
+        stored = self.vector_store.get(include=["metadatas", "documents"])
+        keyword_index, keyword_chunks, category_chunks = BM25Index(), {}, {}
+        for chunk_id, text, metadata in zip(stored["ids"], stored["documents"], stored["metadatas"]):
+            metadata = metadata or {}
+            keyword_index.add(chunk_id, text or "")
+            keyword_chunks[chunk_id] = Document(id=chunk_id, page_content=text or "", metadata=metadata)
+            category_chunks.setdefault(metadata.get("category"), set()).add(chunk_id)
+
+        self.keyword_index, self._keyword_chunks, self._category_chunks = keyword_index, keyword_chunks, category_chunks
+        self._keyword_revision = revision
+        if stored["ids"]:
+            logger.info(f"🔤 Keyword index built with {len(stored['ids'])} chunks")
+
+    def _index_keywords(self, ids: List[str], texts: List[str], metadatas: List[dict]):
+        """
+        Add or replace chunks in the keyword index.
+
+        Args:
+            ids (List[str]): Chunk IDs.
+            texts (List[str]): Chunk texts.
+            metadatas (List[dict]): Chunk metadata.
+        """
+        for chunk_id, text, metadata in zip(ids, texts, metadatas):
+            self._unindex_keywords([chunk_id])
+            metadata = metadata or {}
+            self.keyword_index.add(chunk_id, text or "")
+            self._keyword_chunks[chunk_id] = Document(id=chunk_id, page_content=text or "", metadata=metadata)
+            self._category_chunks.setdefault(metadata.get("category"), set()).add(chunk_id)
+
+    def _unindex_keywords(self, ids: List[str]):
+        """
+        Remove chunks from the keyword index.
+
+        Args:
+            ids (List[str]): Chunk IDs.
+        """
+        for chunk_id in ids:
+            self.keyword_index.remove(chunk_id)
+            doc = self._keyword_chunks.pop(chunk_id, None)
+            if doc is not None:
+                self._category_chunks.get(doc.metadata.get("category"), set()).discard(chunk_id)
+
+    def _persist(self):
+        """
+        Make the changes of a sync durable and visible to other workers.
+        Chroma writes are immediate, the in-process index writes a new version of its files.
+        """
+        if isinstance(self.vector_store, NumpyVectorIndex):
+            self.vector_store.persist()
+
+    def _ingest(
+        self,
+        chunks: Iterable[Tuple[str, str, dict]],
+        target=None,
+        progress: Optional[IndexingProgress] = None
+    ) -> Tuple[int, float]:
+        """
+        Embed and write chunks to the vector store in batches of `ingest_batch_size`.
+
+        Chunks are pulled lazily, so cleaning and splitting also happen batch by batch,
+        and the vector store write of a batch runs in the background while the next one is
+        prepared and embedded. At most two batches are held in memory.
+
+        Args:
+            chunks (Iterable[Tuple[str, str, dict]]): Chunk IDs, texts and metadata.
+            target: Collection to write to, the live one by default.
+            progress (Optional[IndexingProgress]): Tracker timing the embed and upsert phases.
+
+        Returns:
+            Tuple[int, float]: Number of chunks written and duration in seconds.
+        """
+        start = time.perf_counter()
+        count = 0
+        chunks = iter(chunks)
+        pending_write: Optional[Future] = None
+
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="chroma-writer") as writer:
+            while batch := list(islice(chunks, self.params.ingest_batch_size)):
+                ids, texts, metadatas = (list(column) for column in zip(*batch))
+                with track(progress, "embed", items=len(texts)):
+                    vectors = self.embeddings.embed_documents(texts)
+
+                if pending_write is not None:
+                    pending_write.result()
+                pending_write = writer.submit(self._tracked_upsert, progress, ids, texts, vectors, metadatas, target)
+                count += len(batch)
+
+            if pending_write is not None:
+                pending_write.result()
+
+        duration = time.perf_counter() - start
+        if count:
+            logger.info(f"📦 Indexed {count} chunks in {duration:.2f}s ({count / duration:.1f} chunks/s)")
+        return count, duration
+
+    def _get_indexed_chunks(self, scope: Optional[dict] = None) -> Dict[str, Dict[str, dict]]:
+        """
+        List the chunks currently stored in the collection, grouped by source document.
+
+        Args:
+            scope (Optional[dict]): Metadata values the listed chunks must have, all chunks by default.
+
+        Returns:
+            Dict[str, Dict[str, dict]]: Mapping of document ID to {chunk ID: chunk metadata}.
+        """
+        if scope:
+            stored = self.vector_store.get(include=["metadatas"], where=scope)
+        else:
+            stored = self.vector_store.get(include=["metadatas"])
+
+        indexed: Dict[str, Dict[str, dict]] = {}
+        for chunk_id, metadata in zip(stored["ids"], stored["metadatas"]):
+            metadata = metadata or {}
+            indexed.setdefault(metadata.get("id", ""), {})[chunk_id] = metadata
+        return indexed
+
+    def sync_documents(
+        self,
+        documents: Iterable[DocumentModel],
+        present_ids: Optional[Set[str]] = None,
+        progress: Optional[IndexingProgress] = None,
+        scope: Optional[dict] = None
+    ) -> IndexingReport:
+        """
+        Incrementally synchronize the collection with the given documents.
+
+        Documents whose `updated_at` is unchanged are skipped without being re-split.
+        Otherwise, only chunks whose content hash changed are re-embedded, chunks that
+        no longer exist are deleted, and documents missing from `documents` are removed.
+        The collection is never emptied, so retrieval keeps working during the sync.
+        Changed chunks are embedded and written in batches as documents are processed.
+
+        Args:
+            documents (Iterable[DocumentModel]): Complete set of documents that should be indexed,
+                or only the changed ones when `present_ids` is given.
+            present_ids (Optional[Set[str]]): IDs of every document that should stay indexed.
+                Indexed documents in this set but absent from `documents` are kept as they are.
+            progress (Optional[IndexingProgress]): Tracker of the indexing phases.
+            scope (Optional[dict]): Metadata filter (e.g. {"id": ...} for a single document)
+                restricting the sync to the matching chunks. Chunks outside of it are neither
+                listed nor deleted, so a sync of one document only touches that document.
+
+        Returns:
+            IndexingReport: Number of added, updated, deleted and unchanged chunks.
+        """
+        self._refresh_live_collection(force=True)
+        indexed = self._get_indexed_chunks(scope)
+        report = IndexingReport()
+
+        delete_ids = []
+
+        def changed_chunks() -> Iterator[Tuple[str, str, dict]]:
+            for doc in documents:
+                existing = indexed.pop(doc.id, {})
+                updated_at = doc.updated_at.isoformat() if doc.updated_at else ""
+
+                # Fast path: the CMS reports no change since the chunks were indexed
+                if existing and updated_at and all(
+                    m.get("updated_at") == updated_at and m.get("fingerprint") == self.index_fingerprint
+                    for m in existing.values()
+                ):
+                    report.unchanged += len(existing)
+                    continue
+
+                ids, splits, metadatas = self._prepare_chunks(doc, progress)
+                for chunk_id, split, metadata in zip(ids, splits, metadatas):
+                    previous = existing.pop(chunk_id, None)
+                    if previous is None:
+                        report.added += 1
+                    elif (
+                        previous.get("content_hash") != metadata["content_hash"]
+                        or previous.get("fingerprint") != self.index_fingerprint
+                    ):
+                        report.updated += 1
+                    else:
+                        report.unchanged += 1
+                        continue
+
+                    yield chunk_id, split, metadata
+
+                # Chunks left over when a document got shorter
+                delete_ids.extend(existing.keys())
+
+        with self._live_write():
+            # Write new chunks before deleting stale ones to keep the collection populated
+            written, report.duration_seconds = self._ingest(changed_chunks(), progress=progress)
+
+            # Documents removed from the CMS
+            for doc_id, chunks in indexed.items():
+                if present_ids is not None and doc_id in present_ids:
+                    report.unchanged += len(chunks)
+                else:
+                    delete_ids.extend(chunks.keys())
+            report.deleted = len(delete_ids)
+
+            if delete_ids:
+                with track(progress, "upsert", items=len(delete_ids)):
+                    self.vector_store.delete(ids=delete_ids)
+                    self._unindex_keywords(delete_ids)
+            if written or delete_ids:
+                self._persist()
+                self.index_version += 1
+
+        logger.info(
+            f"🔄 Synced collection '{self.params.collection_name}': "
+            f"{report.added} added, {report.updated} updated, "
+            f"{report.deleted} deleted, {report.unchanged} unchanged."
+        )
+        return report
+
+    def current_index_version(self) -> int:
+        """
+        Get the index version, once the reindexes and rollbacks of other processes are picked up.
+        Caches of search results check it before a hit skips the search that would notice them.
+
+        Returns:
+            int: Current index version.
+        """
+        self._refresh_live_collection()
+        return self.index_version
+
+    async def acurrent_index_version(self) -> int:
+        """
+        Asynchronous version of current_index_version(), run in the store's thread pool
+        as the check may read the alias or the collection revision.
+
+        Returns:
+            int: Current index version.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._search_executor, self.current_index_version)
+
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embeds a query with the store's embedding model.
+
+        Args:
+            query (str): The query string.
+
+        Returns:
+            List[float]: The query vector.
+        """
+        return self.embeddings.embed_query(query)
+
+    async def aembed_query(self, query: str) -> List[float]:
+        """
+        Embeds a query in the store's thread pool, without blocking the event loop.
+
+        Args:
+            query (str): The query string.
+
+        Returns:
+            List[float]: The query vector.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._search_executor, self.embed_query, query)
+
+    def similarity_search(self, query: str, k: int = 10, category: Optional[str] = None):
+        """
+        Performs a similarity search for a query, dense or hybrid depending on `search_mode`.
+
+        Args:
+            query (str): The query string.
+            k (int): Number of results to return.
+            category (Optional[str]): Only search the chunks of this category.
+
+        Returns:
+            Tuple[List[Document], List[Optional[float]]]: Retrieved documents and their vector distances
+            to the query, in fused order in hybrid mode (None for unscored keyword-only hits).
+        """
+        if self.params.search_mode == "hybrid":
+            return self.hybrid_search(query, k, category)
+        return self.similarity_search_by_vector(self.embed_query(query), k, category)
+
+    def hybrid_search(self, query: str, k: int = 10, category: Optional[str] = None):
+        """
+        Fuse vector search and BM25 keyword search with Reciprocal Rank Fusion.
+
+        Keyword search finds exact terms (technologies, companies, project titles)
+        that the embedding model represents poorly.
+
+        Results are ranked by fused score, but scored with their vector distance to the query,
+        so relevance cutoffs keep meaning a similarity. Keyword-only hits get theirs from vectors
+        held locally (see `_local_distances`), or None when there is none, which exempts them
+        from the cutoffs: the vector store is not queried a second time.
 
         Args:
             query (str): The query string.
             k (int): Number of results to return.
+            category (Optional[str]): Only search the chunks of this category.
+
+        Returns:
+            Tuple[List[Document], List[Optional[float]]]: Retrieved documents, best fused score first, and their distances.
+        """
+        self._refresh_live_collection()
+        candidates = max(k, self.params.hybrid_candidates)
+        vector = self.embed_query(query)
+        dense_results = self._dense_search(vector, candidates, category)
+        allowed_ids = self._category_chunks.get(category, set()) if category else None
+        keyword_results = self.keyword_index.search(query, candidates, allowed_ids=allowed_ids)
+
+        documents, distances = {}, {}
+        for doc, distance in dense_results:
+            chunk_id = self._document_chunk_id(doc)
+            documents[chunk_id], distances[chunk_id] = doc, distance
+        fused = reciprocal_rank_fusion([list(documents), [chunk_id for chunk_id, _ in keyword_results]])
+
+        results = []
+        for chunk_id, _ in fused:
+            doc = documents.get(chunk_id) or self._keyword_chunks.get(chunk_id)
+            if doc is not None:
+                results.append((chunk_id, doc))
+        distances.update(self._local_distances(vector, {
+            chunk_id: doc for chunk_id, doc in results if chunk_id not in distances
+        }))
+        return self._limit_per_document([(doc, distances.get(chunk_id)) for chunk_id, doc in results], k)
+
+    def _local_distances(self, vector: List[float], chunks: Dict[str, Document]) -> Dict[str, float]:
+        """
+        Compute the distance between a query vector and chunks, like the vector store scores,
+        from the vectors available in process.
+
+        The numpy index holds every vector in memory. With Chroma, the stored vectors are behind
+        a network call, so they are read from the embedding cache instead, when it is enabled.
+
+        Args:
+            vector (List[float]): The query vector.
+            chunks (Dict[str, Document]): Chunks by ID.
+
+        Returns:
+            Dict[str, float]: Squared L2 distance between the normalized vectors, by chunk ID.
+            Chunks without a local vector are missing.
+        """
+        if not chunks:
+            return {}
+        if self.params.vector_backend == "numpy":
+            stored = self.vector_store.get(ids=list(chunks), include=["embeddings"])
+            local_vectors = dict(zip(stored["ids"], stored["embeddings"]))
+        elif self.document_cache is not None:
+            cached = self.document_cache.cached_documents([doc.page_content for doc in chunks.values()])
+            local_vectors = {
+                chunk_id: cached[doc.page_content] for chunk_id, doc in chunks.items() if doc.page_content in cached
+            }
+        else:
+            return {}
+        if not local_vectors:
+            return {}
+
+        query = np.asarray(vector, dtype=np.float32)
+        query /= np.linalg.norm(query) or 1.0
+        vectors = np.asarray(list(local_vectors.values()), dtype=np.float32)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return {chunk_id: float(2 - 2 * similarity) for chunk_id, similarity in zip(local_vectors, vectors @ query)}
+
+    def relevances(self, scores: List[Optional[float]]) -> List[Optional[float]]:
+        """
+        Convert search scores into relevances from 0 to 1 (higher is better).
+
+        Scores are squared L2 distances between normalized vectors, in both search modes,
+        turned back into cosine similarities. Unscored keyword-only hits stay None.
+
+        Args:
+            scores (List[Optional[float]]): Scores returned by similarity_search().
+
+        Returns:
+            List[Optional[float]]: Relevance of each result.
+        """
+        return [None if distance is None else max(0.0, min(1.0, 1 - distance / 2)) for distance in scores]
+
+    def _document_chunk_id(self, doc: Document) -> str:
+        """
+        Get the chunk ID of a retrieved document.
+
+        Args:
+            doc (Document): Document returned by the vector store.
+
+        Returns:
+            str: Chunk ID.
+        """
+        if doc.id:
+            return doc.id
+        return self._chunk_id(doc.metadata.get("id", ""), doc.metadata.get("chunk_nb", 0))
+
+    def _limit_per_document(
+        self,
+        results: List[Tuple[Document, Optional[float]]],
+        k: int
+    ) -> Tuple[List[Document], List[Optional[float]]]:
+        """
+        Keep the best results, with at most `max_chunks_per_document` chunks of each source document.
+
+        Args:
+            results (List[Tuple[Document, Optional[float]]]): Ranked results, best first.
+            k (int): Number of results to return.
+
+        Returns:
+            Tuple[List[Document], List[Optional[float]]]: Kept documents and their scores.
+        """
+        per_document: Dict[str, int] = {}
+        documents, scores = [], []
+        for doc, score in results:
+            source = doc.metadata.get("id", "")
+            if per_document.get(source, 0) >= self.params.max_chunks_per_document:
+                continue
+            per_document[source] = per_document.get(source, 0) + 1
+            documents.append(doc)
+            scores.append(score)
+            if len(documents) == k:
+                break
+        return documents, scores
+
+    def _dense_search(self, vector: List[float], k: int, category: Optional[str] = None) -> List[Tuple[Document, float]]:
+        """
+        Query the vector store, with the category pushed down as a metadata filter.
+
+        Args:
+            vector (List[float]): The query vector.
+            k (int): Number of results to return.
+            category (Optional[str]): Only search the chunks of this category.
+
+        Returns:
+            List[Tuple[Document, float]]: Documents and their distances, closest first.
+        """
+        return self.vector_store.similarity_search_by_vector_with_relevance_scores(
+            embedding=vector,
+            k=k,
+            filter={"category": category} if category else None
+        )
+
+    def similarity_search_by_vector(self, vector: List[float], k: int = 10, category: Optional[str] = None):
+        """
+        Performs a similarity search for an already embedded query.
+
+        Args:
+            vector (List[float]): The query vector, from embed_query().
+            k (int): Number of results to return.
+            category (Optional[str]): Only search the chunks of this category.
+
+        Returns:
+            Tuple[List[Document], List[float]]: Retrieved documents and their similarity scores.
+        """
+        self._refresh_live_collection()
+        # Over-fetch so that enough documents remain once limited per source document
+        results = self._dense_search(vector, k * 3, category)
+        return self._limit_per_document(results, k)
+
+    def similarity_search_future(self, query: str, k: int = 10, category: Optional[str] = None) -> Future:
+        """
+        Start a similarity search in the store's thread pool and return immediately.
+
+        Args:
+            query (str): The query string.
+            k (int): Number of results to return.
+            category (Optional[str]): Only search the chunks of this category.
+
+        Returns:
+            Future: Resolves to the retrieved documents and their similarity scores.
+        """
+        return self._search_executor.submit(self.similarity_search, query, k, category)
+
+    async def asimilarity_search(self, query: str, k: int = 10, category: Optional[str] = None):
+        """
+        Asynchronous similarity search, run in the store's bounded thread pool
+        so the event loop is never blocked by embedding or vector store calls.
+
+        Args:
+            query (str): The query string.
+            k (int): Number of results to return.
+            category (Optional[str]): Only search the chunks of this category.
+
+        Returns:
+            Tuple[List[Document], List[Optional[float]]]: Retrieved documents and their similarity scores.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._search_executor, self.similarity_search, query, k, category)
+
+    async def asimilarity_search_by_vector(self, vector: List[float], k: int = 10, category: Optional[str] = None):
+        """
+        Asynchronous version of similarity_search_by_vector().
+
+        Args:
+            vector (List[float]): The query vector, from embed_query().
+            k (int): Number of results to return.
+            category (Optional[str]): Only search the chunks of this category.
 
         Returns:
             Tuple[List[Document], List[float]]: Retrieved documents and their similarity scores.
         """
-        results_with_scores = self.vector_store.similarity_search_with_score(query=query, k=k)
-        results = [doc for doc, _ in results_with_scores]
-        scores = [score for _, score in results_with_scores]
-        return results, scores
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._search_executor, self.similarity_search_by_vector, vector, k, category)
@@ -0,0 +1,89 @@
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, Optional
+
+from app.models.reindex_job import ReindexPhase
+
+PHASES = ("fetch", "clean", "split", "embed", "upsert")
+
+
+class IndexingProgress:
+    """
+    Thread-safe timings and item counts of the phases of an indexing run.
+
+    Phases interleave (documents are cleaned, split, embedded and written batch by batch),
+    so each phase accumulates its own time, and `phase` is the one the run entered last.
+    """
+
+    def __init__(self):
+        self.phase: Optional[str] = None
+        self._phases: Dict[str, ReindexPhase] = {phase: ReindexPhase() for phase in PHASES}
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def track(self, phase: str, items: int = 0, current: bool = True):
+        """
+        Time a step of a phase.
+
+        Args:
+            phase (str): Phase name, one of PHASES.
+            items (int): Number of items (documents or chunks) processed by the step.
+            current (bool): Report the phase as the current one. Steps running in a
+                background thread alongside the main one should not.
+        """
+        if current:
+            self.phase = phase
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._phases[phase].seconds += time.perf_counter() - start
+                self._phases[phase].items += items
+
+    def count(self, phase: str, items: int):
+        """
+        Add items to a phase whose size is only known once its step is done (e.g. fetch).
+
+        Args:
+            phase (str): Phase name, one of PHASES.
+            items (int): Number of items processed.
+        """
+        with self._lock:
+            self._phases[phase].items += items
+
+    def snapshot(self) -> dict:
+        """
+        Get the progress so far.
+
+        Returns:
+            dict: Current phase, per-phase timings, embedded chunks and their throughput.
+        """
+        with self._lock:
+            phases = {name: phase.model_copy() for name, phase in self._phases.items()}
+        elapsed = time.perf_counter() - self._started
+        chunks = phases["embed"].items
+        return {
+            "phase": self.phase,
+            "phases": phases,
+            "chunks": chunks,
+            "chunks_per_second": round(chunks / elapsed, 1) if elapsed else 0.0,
+        }
+
+
+def track(progress: Optional[IndexingProgress], phase: str, items: int = 0, current: bool = True):
+    """
+    Time a step if a progress tracker is given.
+
+    Args:
+        progress (Optional[IndexingProgress]): Tracker of the run, or None.
+        phase (str): Phase name.
+        items (int): Number of items processed by the step.
+        current (bool): Report the phase as the current one.
+
+    Returns:
+        ContextManager: Timing context, or a no-op one.
+    """
+    return progress.track(phase, items, current) if progress is not None else nullcontext()
@@ -0,0 +1,277 @@
+import json
+import logging
+import os
+import re
+import unicodedata
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Literal, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from pydantic import BaseModel
+
+from app.services.rag.keyword_index import french_tokenize
+
+logger = logging.getLogger(__name__)
+
+Intent = Literal["retrieve", "smalltalk", "uncertain"]
+
+
+class IntentRouterParams(BaseModel):
+    """
+    Configuration parameters for the IntentRouter.
+
+    Attributes:
+        enabled (bool): Route questions locally, or always let the LLM decide.
+        min_similarity (float): Minimum cosine similarity to the closest intent centroid.
+        min_margin (float): Minimum similarity gap between the closest and the second closest centroid.
+        min_retrieve_terms (int): Minimum number of search terms of a question routed straight to retrieval.
+            Shorter questions usually refer to the conversation and are left to the LLM.
+        traffic_log_path (Optional[str]): JSON lines file of the routing decisions taken by the LLM,
+            used as extra training examples. It holds visitors' questions, so it is disabled (None)
+            unless configured.
+        max_traffic_examples (int): Maximum number of logged decisions loaded as examples. The log
+            is trimmed to the last ones once it holds twice as many.
+    """
+    enabled: bool = True
+    min_similarity: float = 0.5
+    min_margin: float = 0.05
+    min_retrieve_terms: int = 2
+    traffic_log_path: Optional[str] = None
+    max_traffic_examples: int = 2000
+
+
+# Seed examples of each intent, completed by the logged traffic
+SEED_EXAMPLES: Dict[str, List[str]] = {
+    "retrieve": [
+        "Quels sont tes projets ?",
+        "Parle-moi de ton expérience professionnelle.",
+        "Quelles technologies maîtrises-tu ?",
+        "Quelles sont tes compétences ?",
+        "Quelle formation as-tu suivie ?",
+        "Où as-tu fait ton stage ?",
+        "Dans quelles entreprises as-tu travaillé ?",
+        "As-tu déjà utilisé Python ?",
+        "Quels langages de programmation connais-tu ?",
+        "Quel est ton parcours ?",
+        "Quels diplômes as-tu obtenus ?",
+        "Sur quoi travailles-tu en ce moment ?",
+        "Quels sont tes centres d'intérêt ?",
+        "Comment te contacter ?",
+    ],
+    "smalltalk": [
+        "Bonjour",
+        "Salut !",
+        "Coucou",
+        "Hello",
+        "Merci",
+        "Merci beaucoup !",
+        "Au revoir",
+        "À bientôt",
+        "Ça va ?",
+        "Comment vas-tu ?",
+        "Super",
+        "D'accord",
+        "Ok merci",
+        "Bonne journée !",
+    ],
+}
+
+_SMALLTALK = re.compile(
+    r"^\W*(bonjour|bonsoir|salut|coucou|hello|hi|hey|yo|merci( beaucoup| bien)?|thanks|thank you|"
+    r"au revoir|bye|a bientot|a plus|bonne (journee|soiree)|ok|okay|d'accord|super|parfait|top|cool|"
+    r"ca va|comment (ca va|vas[- ]tu|allez[- ]vous))(\W+(merci|a toi|a vous|!|\?))*\W*$"
+)
+
+_RETRIEVE = re.compile(
+    r"\b(projets?|experiences?|competences?|formations?|etudes?|diplomes?|stages?|alternance|entreprises?|"
+    r"parcours|technos?|technologies?|langages?|frameworks?|outils|cv|postes?|metiers?|ecoles?|"
+    r"loisirs|passions?|hobbies|contact|github|linkedin)\b"
+)
+
+
+def _normalize_text(text: str) -> str:
+    """Lowercase a text and strip its accents, like the keyword index does."""
+    return "".join(c for c in unicodedata.normalize("NFKD", text.lower()) if not unicodedata.combining(c)).strip()
+
+
+class IntentRouter:
+    """
+    Local router deciding whether a question needs retrieval, without calling the LLM.
+
+    A rule set catches the obvious cases (greetings, thanks, questions naming a portfolio
+    topic). Other questions are compared to the centroid of each intent's example embeddings,
+    built from seed examples and from the decisions the LLM took on past traffic.
+    Questions that are not clearly one intent are "uncertain" and left to the LLM.
+    """
+
+    def __init__(self, embeddings: Embeddings, params: Optional[IntentRouterParams] = None):
+        """
+        Embed the examples and compute the intent centroids.
+
+        Args:
+            embeddings (Embeddings): Embedding model of the vector store.
+            params (Optional[IntentRouterParams]): Custom router parameters.
+        """
+        if params is None:
+            params = IntentRouterParams()
+        self.params = params
+        self.embeddings = embeddings
+
+        # Decisions are appended by a single background writer, off the event loop
+        self._log_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="intent-log")
+        self._logged_lines = 0
+        self.routed: Dict[str, int] = {"retrieve": 0, "smalltalk": 0, "uncertain": 0}
+
+        self._intents: List[str] = []
+        self._centroids = np.zeros((0, 0), dtype=np.float32)
+        if self.params.enabled:
+            self.fit(self._load_examples())
+
+    def _load_examples(self) -> Dict[str, List[str]]:
+        """
+        Gather the seed examples and the most recent logged decisions.
+
+        Returns:
+            Dict[str, List[str]]: Example questions of each intent.
+        """
+        examples = {intent: list(questions) for intent, questions in SEED_EXAMPLES.items()}
+        path = self.params.traffic_log_path
+        if not path or not os.path.exists(path):
+            return examples
+
+        lines = deque(maxlen=self.params.max_traffic_examples)
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                lines.append(line)
+                self._logged_lines += 1
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("intent") in examples and record.get("question"):
+                examples[record["intent"]].append(record["question"])
+
+        logger.info(f"🧭 Loaded {len(lines)} logged routing decisions from '{path}'")
+        return examples
+
+    def fit(self, examples: Dict[str, List[str]]):
+        """
+        Compute the normalized centroid of each intent's examples.
+
+        Args:
+            examples (Dict[str, List[str]]): Example questions of each intent.
+        """
+        intents, centroids = [], []
+        for intent, questions in examples.items():
+            if not questions:
+                continue
+            vectors = np.asarray(self.embeddings.embed_documents(questions), dtype=np.float32)
+            vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+            centroid = vectors.mean(axis=0)
+            intents.append(intent)
+            centroids.append(centroid / max(np.linalg.norm(centroid), 1e-12))
+
+        self._intents = intents
+        self._centroids = np.stack(centroids) if centroids else np.zeros((0, 0), dtype=np.float32)
+        logger.info(f"🧭 Intent router fitted on {sum(len(q) for q in examples.values())} examples")
+
+    def classify(self, question: str, question_vector: Optional[List[float]] = None) -> Intent:
+        """
+        Classify a question.
+
+        Args:
+            question (str): The user's question.
+            question_vector (Optional[List[float]]): Question embedding, when already computed.
+
+        Returns:
+            Intent: "retrieve", "smalltalk" or "uncertain".
+        """
+        intent = self._classify(question, question_vector)
+        self.routed[intent] += 1
+        logger.debug(f"🧭 Routed {question!r} as {intent}")
+        return intent
+
+    def _classify(self, question: str, question_vector: Optional[List[float]]) -> Intent:
+        """Rules first, then the nearest centroid."""
+        if not self.params.enabled:
+            return "uncertain"
+
+        text = _normalize_text(question)
+        if _SMALLTALK.match(text):
+            return "smalltalk"
+
+        self_contained = len(french_tokenize(question)) >= self.params.min_retrieve_terms
+        if _RETRIEVE.search(text):
+            return "retrieve" if self_contained else "uncertain"
+
+        if not self._intents:
+            return "uncertain"
+        if question_vector is None:
+            question_vector = self.embeddings.embed_query(question)
+
+        vector = np.asarray(question_vector, dtype=np.float32)
+        vector /= max(np.linalg.norm(vector), 1e-12)
+        similarities = self._centroids @ vector
+        order = np.argsort(-similarities)
+
+        best = similarities[order[0]]
+        runner_up = similarities[order[1]] if len(order) > 1 else -1.0
+        if best < self.params.min_similarity or best - runner_up < self.params.min_margin:
+            return "uncertain"
+
+        intent = self._intents[order[0]]
+        if intent == "retrieve" and not self_contained:
+            return "uncertain"
+        return intent
+
+    def record(self, question: str, intent: Intent):
+        """
+        Log a routing decision taken by the LLM, to train the router on the next start.
+        The decision is written in the background, so the caller never waits for the disk.
+
+        Args:
+            question (str): The user's question.
+            intent (Intent): "retrieve" if the LLM called the retrieval tool, "smalltalk" otherwise.
+        """
+        if not self.params.traffic_log_path:
+            return
+        self._log_writer.submit(self._append, {"question": question, "intent": intent})
+
+    def _append(self, record: dict):
+        """
+        Append a decision to the traffic log, in the writer thread. Once the log holds twice
+        `max_traffic_examples` decisions, it is trimmed to the last `max_traffic_examples`,
+        the only ones loaded as examples.
+
+        Args:
+            record (dict): Question and intent.
+        """
+        path = self.params.traffic_log_path
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._logged_lines += 1
+
+            if self._logged_lines >= 2 * self.params.max_traffic_examples:
+                with open(path, encoding="utf-8") as f:
+                    lines = deque(f, maxlen=self.params.max_traffic_examples)
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.writelines(lines)
+                os.replace(tmp_path, path)
+                self._logged_lines = len(lines)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not log routing decision: {e}")
+
+    def stats(self) -> dict:
+        """
+        Get the routing counters.
+
+        Returns:
+            dict: Number of questions routed to each intent.
+        """
+        return dict(self.routed)
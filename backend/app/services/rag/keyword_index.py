@@ -0,0 +1,183 @@
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+# Tokens keep a trailing "+" and inner "." so that "c++" or "node.js" stay whole. "-" and "#" split
+# tokens, as clean_text turns them into spaces in the indexed chunks: "scikit-learn" gives
+# "scikit" and "learn", "c#" gives "c", on both sides.
+_TOKEN = re.compile(r"[a-z0-9]+(?:\++|(?:\.[a-z0-9]+)+)?")
+# Elided articles and pronouns ("l'", "d'", "qu'"...), dropped before tokenizing so that a lone
+# "c" or "r" (the languages) is still a search term
+_ELISION = re.compile(r"\b(?:qu|[cdjlmnst])['’]")
+
+# Damping constant of Reciprocal Rank Fusion, as in the original paper
+RRF_K = 60
+
+FRENCH_STOPWORDS = frozenset("""
+a au aux avec ce ces dans de des du elle en et eu il ils je la le les leur lui ma mais me
+meme mes moi mon ne nos notre nous on ou par pas pour qu que qui sa se ses son sur ta te tes toi
+ton tu un une vos votre vous y est sont ete etre avoir ai as avons avez ont suis es sommes etes cette cet
+quel quelle quels quelles comment quoi dont plus tres aussi
+the of and to in is for on with as by an at or from this that
+""".split())
+
+
+def _strip_accents(text: str) -> str:
+    """Remove diacritics, so "expérience" and "experience" match."""
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def french_tokenize(text: str) -> List[str]:
+    """
+    Split a French (or English) text into normalized search terms.
+
+    Text is lowercased and stripped of accents, elisions such as "l'" or "d'" are
+    dropped with the stopwords, and a light plural stemming removes a final "s" or "x".
+    Queries and chunks go through the same tokenization, chunks having been cleaned by
+    clean_text beforehand.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        List[str]: Search terms, in order.
+    """
+    terms = []
+    for token in _TOKEN.findall(_ELISION.sub(" ", _strip_accents(text.lower()))):
+        if token in FRENCH_STOPWORDS:
+            continue
+        if len(token) > 3 and token[-1] in "sx" and token[-2] != "s" and token.isalpha():
+            token = token[:-1]
+        terms.append(token)
+    return terms
+
+
+class BM25Index:
+    """
+    Incremental inverted index of document chunks, scored with BM25.
+
+    Chunks can be added, replaced and removed one by one; document frequencies and
+    average length are updated along, so the index never needs a full rebuild.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Create an empty index.
+
+        Args:
+            k1 (float): Term frequency saturation.
+            b (float): Length normalization strength.
+        """
+        self.k1 = k1
+        self.b = b
+
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._chunk_terms: Dict[str, Counter] = {}
+        self._chunk_lengths: Dict[str, int] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._chunk_lengths)
+
+    def add(self, chunk_id: str, text: str):
+        """
+        Index a chunk, replacing its previous version if any.
+
+        Args:
+            chunk_id (str): Chunk ID.
+            text (str): Chunk text.
+        """
+        terms = Counter(french_tokenize(text))
+        with self._lock:
+            self._remove(chunk_id)
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[chunk_id] = frequency
+            self._chunk_terms[chunk_id] = terms
+            self._chunk_lengths[chunk_id] = sum(terms.values())
+            self._total_length += self._chunk_lengths[chunk_id]
+
+    def remove(self, chunk_id: str):
+        """
+        Remove a chunk from the index.
+
+        Args:
+            chunk_id (str): Chunk ID.
+        """
+        with self._lock:
+            self._remove(chunk_id)
+
+    def _remove(self, chunk_id: str):
+        """Remove a chunk, lock held."""
+        terms = self._chunk_terms.pop(chunk_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[chunk_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._chunk_lengths.pop(chunk_id)
+
+    def clear(self):
+        """Remove every chunk."""
+        with self._lock:
+            self._postings.clear()
+            self._chunk_terms.clear()
+            self._chunk_lengths.clear()
+            self._total_length = 0
+
+    def search(self, query: str, k: int = 10, allowed_ids: Optional[set] = None) -> List[Tuple[str, float]]:
+        """
+        Rank the chunks containing the query terms.
+
+        Args:
+            query (str): Query text.
+            k (int): Number of results to return.
+            allowed_ids (Optional[set]): Only rank these chunks, when given.
+
+        Returns:
+            List[Tuple[str, float]]: Chunk IDs and BM25 scores, best first.
+        """
+        terms = set(french_tokenize(query))
+        scores: Dict[str, float] = {}
+
+        with self._lock:
+            count = len(self._chunk_lengths)
+            if not count:
+                return []
+            average_length = self._total_length / count
+
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk_id, frequency in postings.items():
+                    if allowed_ids is not None and chunk_id not in allowed_ids:
+                        continue
+                    length_norm = self.k1 * (1 - self.b + self.b * self._chunk_lengths[chunk_id] / average_length)
+                    scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + length_norm)
+
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = RRF_K) -> List[Tuple[str, float]]:
+    """
+    Merge several rankings of the same items with Reciprocal Rank Fusion.
+
+    Args:
+        rankings (List[List[str]]): Item IDs of each ranking, best first.
+        k (int): Damping constant.
+
+    Returns:
+        List[Tuple[str, float]]: Item IDs and fused scores, best first.
+    """
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] = scores.get(item, 0.0) + 1 / (k + rank + 1)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -0,0 +1,84 @@
+import logging
+import threading
+from typing import List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+logger = logging.getLogger(__name__)
+
+
+class MultiProcessEmbeddings(Embeddings):
+    """
+    Sentence-transformers embeddings encoding documents in a pool of worker processes.
+
+    The pool is started on the first document batch and reused for the following ones.
+    Queries are short and latency-sensitive, so they are encoded in the current process.
+
+    Texts are preprocessed like HuggingFaceEmbeddings does (newlines replaced by spaces),
+    so both give the same vectors and can share the embedding cache and the index.
+    """
+
+    def __init__(self, model_name: str, processes: int, model_kwargs: Optional[dict] = None):
+        """
+        Load the model in the current process. Worker processes load their own copy when the pool starts.
+
+        Args:
+            model_name (str): Name of the sentence-transformers model.
+            processes (int): Number of worker processes.
+            model_kwargs (Optional[dict]): Extra SentenceTransformer arguments, such as the backend.
+        """
+        from sentence_transformers import SentenceTransformer
+
+        self.model_name = model_name
+        self.processes = processes
+        self.model = SentenceTransformer(model_name, **(model_kwargs or {}))
+
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def _get_pool(self) -> dict:
+        """Start the worker processes on first use."""
+        with self._pool_lock:
+            if self._pool is None:
+                logger.info(f"🧵 Starting {self.processes} embedding worker processes for '{self.model_name}'")
+                self._pool = self.model.start_multi_process_pool(target_devices=["cpu"] * self.processes)
+            return self._pool
+
+    @staticmethod
+    def _preprocess(text: str) -> str:
+        """Apply the preprocessing of HuggingFaceEmbeddings."""
+        return text.replace("\n", " ")
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents in the worker processes.
+
+        Args:
+            texts (List[str]): Texts to embed.
+
+        Returns:
+            List[List[float]]: One vector per text, in the same order.
+        """
+        if not texts:
+            return []
+        vectors = self.model.encode([self._preprocess(text) for text in texts], pool=self._get_pool())
+        return vectors.tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a query in the current process.
+
+        Args:
+            text (str): Query to embed.
+
+        Returns:
+            List[float]: Query vector.
+        """
+        return self.model.encode(self._preprocess(text)).tolist()
+
+    def close(self):
+        """Stop the worker processes."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self.model.stop_multi_process_pool(self._pool)
+                self._pool = None
@@ -0,0 +1,341 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from langchain_core.documents import Document
+
+logger = logging.getLogger(__name__)
+
+
+class NumpyVectorIndex:
+    """
+    In-process vector index for small corpora, searched by brute force.
+
+    Vectors are stored normalized as float32 in a `.npy` file opened with mmap, so several
+    worker processes share the same pages. Chunk IDs, texts and metadata are stored in a JSON
+    file alongside. Changes stay in memory until persist() writes a new version of both files
+    and atomically replaces the manifest pointing to them; other processes pick it up on
+    their next search, by comparing the version number recorded in the manifest.
+
+    Writes never modify the arrays and lists searches are reading: they build new ones
+    and swap them under the lock.
+
+    Method names follow the subset of the Chroma vector store API used by EmbeddingDocumentStore,
+    and scores are squared L2 distances between normalized vectors (lower is closer), like
+    Chroma's default distance.
+    """
+
+    MANIFEST = "manifest.json"
+    # Versions kept on disk: a process that read the previous manifest can still load its files
+    KEEP_VERSIONS = 2
+    LOAD_ATTEMPTS = 3
+
+    def __init__(self, path: str):
+        """
+        Open the index stored in a directory, or start an empty one.
+
+        Args:
+            path (str): Directory of the index files.
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self._dirty = False
+        self._load_empty()
+        self._reload_if_changed()
+
+    # ------------------- Loading -------------------
+
+    def _load_empty(self):
+        """Reset to an empty index."""
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[dict] = []
+        self._positions: Dict[str, int] = {}
+
+    def _read_manifest(self) -> Optional[dict]:
+        """
+        Read the manifest of the persisted version.
+
+        Returns:
+            Optional[dict]: Manifest with its "version", None if nothing was persisted yet.
+        """
+        try:
+            with open(os.path.join(self.path, self.MANIFEST), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        # Manifests written before the version was recorded: the version is in the file names
+        manifest.setdefault("version", int(manifest["vectors"].split("-", 1)[1].split(".", 1)[0]))
+        return manifest
+
+    def _reload_if_changed(self):
+        """Load the persisted version if another process (or a previous run) wrote a newer one."""
+        manifest = self._read_manifest()
+        if manifest is None or manifest["version"] == self._version or self._dirty:
+            return
+
+        vectors, meta, version = self._load_manifest(manifest)
+        with self._lock:
+            # Local changes or a newer version loaded by another thread win
+            if self._dirty or (self._version is not None and version <= self._version):
+                return
+            self._vectors = vectors
+            self._ids = meta["ids"]
+            self._texts = meta["texts"]
+            self._metadatas = meta["metadatas"]
+            self._positions = {chunk_id: i for i, chunk_id in enumerate(self._ids)}
+            self._version = version
+        logger.info(f"📂 Loaded vector index '{self.path}' ({len(self._ids)} chunks)")
+
+    def _load_manifest(self, manifest: dict) -> Tuple[np.ndarray, dict, int]:
+        """
+        Load the files a manifest points to.
+
+        If a writer replaced the manifest and removed the files it pointed to between the
+        manifest read and the file loads, the manifest is read again.
+
+        Args:
+            manifest (dict): Manifest read by _read_manifest().
+
+        Returns:
+            Tuple[np.ndarray, dict, int]: Memory-mapped vectors, chunk IDs/texts/metadata
+                and version of the loaded files.
+        """
+        for attempt in range(self.LOAD_ATTEMPTS):
+            try:
+                with open(os.path.join(self.path, manifest["metadata"]), encoding="utf-8") as f:
+                    meta = json.load(f)
+                vectors = np.load(os.path.join(self.path, manifest["vectors"]), mmap_mode="r")
+                return vectors, meta, manifest["version"]
+            except FileNotFoundError:
+                if attempt == self.LOAD_ATTEMPTS - 1:
+                    raise
+                logger.warning(f"⚠️ Vector index '{self.path}' changed while loading, reading the manifest again")
+                manifest = self._read_manifest()
+
+    # ------------------- Writes -------------------
+
+    def upsert(self, ids: List[str], texts: List[str], vectors: List[List[float]], metadatas: List[dict]):
+        """
+        Insert or replace chunks. Changes are kept in memory until persist().
+
+        Args:
+            ids (List[str]): Chunk IDs.
+            texts (List[str]): Chunk texts.
+            vectors (List[List[float]]): Chunk vectors, normalized here.
+            metadatas (List[dict]): Chunk metadata.
+        """
+        if not ids:
+            return
+
+        new_vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(new_vectors, axis=1, keepdims=True)
+        new_vectors /= np.where(norms == 0, 1, norms)
+
+        with self._lock:
+            # Copies: the mmap is read-only, and searches may still be reading the current lists
+            vectors_copy = np.array(self._vectors) if self._vectors.size else np.zeros((0, new_vectors.shape[1]), dtype=np.float32)
+            chunk_ids, texts_copy, metadatas_copy = list(self._ids), list(self._texts), list(self._metadatas)
+            positions = dict(self._positions)
+
+            appended = []
+            for chunk_id, text, vector, metadata in zip(ids, texts, new_vectors, metadatas):
+                position = positions.get(chunk_id)
+                if position is None:
+                    positions[chunk_id] = len(chunk_ids)
+                    chunk_ids.append(chunk_id)
+                    texts_copy.append(text)
+                    metadatas_copy.append(metadata)
+                    appended.append(vector)
+                else:
+                    vectors_copy[position] = vector
+                    texts_copy[position] = text
+                    metadatas_copy[position] = metadata
+
+            if appended:
+                vectors_copy = np.vstack([vectors_copy, np.stack(appended)])
+            self._vectors, self._ids, self._texts, self._metadatas = vectors_copy, chunk_ids, texts_copy, metadatas_copy
+            self._positions = positions
+            self._dirty = True
+
+    def delete(self, ids: List[str]):
+        """
+        Delete chunks. Changes are kept in memory until persist().
+
+        Args:
+            ids (List[str]): IDs of the chunks to delete.
+        """
+        with self._lock:
+            removed = {self._positions[chunk_id] for chunk_id in ids if chunk_id in self._positions}
+            if not removed:
+                return
+
+            keep = [i for i in range(len(self._ids)) if i not in removed]
+            vectors = np.array(self._vectors[keep]) if keep else np.zeros((0, self._vectors.shape[1]), dtype=np.float32)
+            chunk_ids = [self._ids[i] for i in keep]
+            texts = [self._texts[i] for i in keep]
+            metadatas = [self._metadatas[i] for i in keep]
+            self._vectors, self._ids, self._texts, self._metadatas = vectors, chunk_ids, texts, metadatas
+            self._positions = {chunk_id: i for i, chunk_id in enumerate(chunk_ids)}
+            self._dirty = True
+
+    def delete_collection(self):
+        """Delete every chunk, in memory and on disk."""
+        with self._lock:
+            self._load_empty()
+            self._dirty = True
+        self.persist()
+
+    def persist(self):
+        """
+        Write the index as a new version of the files and atomically switch the manifest to it.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+
+            # Strictly increasing, even for two writes within the clock resolution
+            version = max(time.time_ns(), (self._version or 0) + 1)
+            vectors_file = f"vectors-{version}.npy"
+            metadata_file = f"metadata-{version}.json"
+
+            np.save(os.path.join(self.path, vectors_file), self._vectors)
+            with open(os.path.join(self.path, metadata_file), "w", encoding="utf-8") as f:
+                json.dump({"ids": self._ids, "texts": self._texts, "metadatas": self._metadatas}, f, ensure_ascii=False)
+
+            manifest_path = os.path.join(self.path, self.MANIFEST)
+            tmp_path = f"{manifest_path}.{version}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "version": version,
+                    "vectors": vectors_file,
+                    "metadata": metadata_file,
+                    "count": len(self._ids)
+                }, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, manifest_path)
+
+            self._vectors = np.load(os.path.join(self.path, vectors_file), mmap_mode="r")
+            self._version = version
+            self._dirty = False
+
+            self._remove_old_versions(vectors_file, metadata_file)
+        logger.info(f"💾 Persisted vector index '{self.path}' ({len(self._ids)} chunks)")
+
+    def _remove_old_versions(self, vectors_file: str, metadata_file: str):
+        """
+        Delete the files of the versions older than the last `KEEP_VERSIONS`. The previous
+        version is kept for processes that read the previous manifest but did not load its
+        files yet; processes still mapping older files keep their pages until they reload,
+        as the data is only unlinked.
+        """
+        versions = sorted({
+            int(name.split("-", 1)[1].split(".", 1)[0])
+            for name in os.listdir(self.path)
+            if name.startswith(("vectors-", "metadata-"))
+        }, reverse=True)
+
+        for version in versions[self.KEEP_VERSIONS:]:
+            for name in (f"vectors-{version}.npy", f"metadata-{version}.json"):
+                if name in (vectors_file, metadata_file):
+                    continue
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass
+
+    # ------------------- Reads -------------------
+
+    def revision(self) -> Optional[int]:
+        """
+        Identify the persisted version of the index, loading the one written by another process if any.
+
+        Returns:
+            Optional[int]: Version number of the loaded files, None if nothing was persisted yet.
+        """
+        self._reload_if_changed()
+        return self._version
+
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None, where: Optional[dict] = None) -> dict:
+        """
+        List the stored chunks.
+
+        Args:
+            ids (Optional[List[str]]): Chunks to return, all by default. Unknown IDs are ignored.
+            include (Optional[List[str]]): IDs, metadata and texts are always returned, vectors
+                only when "embeddings" is included.
+            where (Optional[dict]): Metadata values the chunks must have.
+
+        Returns:
+            dict: Chunk "ids", "metadatas" and "documents", and "embeddings" if requested.
+        """
+        self._reload_if_changed()
+        with self._lock:
+            vectors, metadatas = self._vectors, self._metadatas
+            if ids is None:
+                positions = range(len(self._ids))
+            else:
+                positions = [self._positions[chunk_id] for chunk_id in ids if chunk_id in self._positions]
+            if where:
+                positions = [i for i in positions if all(metadatas[i].get(k) == v for k, v in where.items())]
+            stored = {
+                "ids": [self._ids[i] for i in positions],
+                "metadatas": [metadatas[i] for i in positions],
+                "documents": [self._texts[i] for i in positions],
+            }
+        if include and "embeddings" in include:
+            stored["embeddings"] = [vectors[i] for i in positions]
+        return stored
+
+    def similarity_search_by_vector_with_relevance_scores(
+        self,
+        embedding: List[float],
+        k: int = 4,
+        filter: Optional[dict] = None
+    ) -> List[Tuple[Document, float]]:
+        """
+        Find the closest chunks with one matrix-vector product and a partial sort.
+
+        Args:
+            embedding (List[float]): Query vector.
+            k (int): Number of results to return.
+            filter (Optional[dict]): Metadata values the chunks must have.
+
+        Returns:
+            List[Tuple[Document, float]]: Chunks and their distances, closest first.
+        """
+        self._reload_if_changed()
+        with self._lock:
+            vectors, ids, texts, metadatas = self._vectors, self._ids, self._texts, self._metadatas
+        if not ids:
+            return []
+
+        query = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        similarities = vectors @ query
+
+        if filter:
+            mask = np.array([all(m.get(key) == value for key, value in filter.items()) for m in metadatas])
+            similarities = np.where(mask, similarities, -np.inf)
+            k = min(k, int(mask.sum()))
+        k = min(k, len(ids))
+        if k <= 0:
+            return []
+
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        return [
+            (Document(id=ids[i], page_content=texts[i], metadata=metadatas[i]), float(2 - 2 * similarities[i]))
+            for i in top
+        ]
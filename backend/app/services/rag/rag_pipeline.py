@@ -1,24 +1,32 @@
+import asyncio
 import logging
-import re
-from typing import List
+import time
+import uuid
+from concurrent.futures import CancelledError
+from typing import Annotated, AsyncIterator, List, Optional, Tuple
 from dotenv import load_dotenv
 
 from langsmith import traceable
 from pydantic import BaseModel, Field
-from langchain_core.tools import tool
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import InjectedToolCallId, StructuredTool
 from langgraph.prebuilt import ToolNode, tools_condition
 from langchain_core.documents import Document
 from langgraph.graph import StateGraph, MessagesState, END, START
-from langchain_core.messages import HumanMessage, RemoveMessage
-from langchain.chat_models import init_chat_model
-from langgraph.checkpoint.memory import InMemorySaver
-from langmem.short_term import SummarizationNode
-from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.types import Command
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage, RemoveMessage
 
 from app.core.config import settings
+from app.services.rag.answer_cache import SemanticAnswerCache, SemanticAnswerCacheParams
 from app.services.rag.embedding_document_store import EmbeddingDocumentStore
+from app.services.rag.session_memory import BoundedMemorySaver, SessionMemoryParams
 from app.services.rag.rag_prompts import build_prompt_without_context, build_prompt_with_context
-from app.services.rag.cms_service import cms
+from app.services.rag.cms_service import CMS_CATEGORIES
+from app.services.rag.conversation_summarizer import ConversationSummarizer, ConversationSummaryParams
+from app.services.rag.intent_router import IntentRouter, IntentRouterParams
+from app.services.rag.speculative_retrieval import Speculation, SpeculativeRetrievalParams, SpeculativeRetriever
+from app.services.rag.context_selection import ContextSelectionParams, estimate_tokens, format_context, select_context
+from app.utils.text_cleaner import MarkdownStreamCleaner, clean_markdown
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
@@ -27,8 +35,7 @@ logger.setLevel(logging.DEBUG)
 # To ensure environment variables are loaded before loading langsmith
 load_dotenv()
 
-vector_store = EmbeddingDocumentStore()
-memory = InMemorySaver()
+memory = BoundedMemorySaver(SessionMemoryParams(sqlite_path=settings.SESSION_DB_PATH))
 
 
 class RetrieveState(BaseModel):
@@ -37,49 +44,45 @@ class RetrieveState(BaseModel):
 
     Attributes:
         question (str): The user question to retrieve relevant documents for.
+        category (str, optional): Only search the documents of this category.
         context (List[Document], optional): Documents retrieved for the question.
         answer (str, optional): Generated answer for the question.
     """
     question: str
+    category: Optional[str] = Field(
+        default=None,
+        description=f"Catégorie à laquelle limiter la recherche, parmi : {', '.join(CMS_CATEGORIES)}. "
+                    "Laisser vide si la question porte sur plusieurs catégories ou si elle est incertaine."
+    )
     context: List[Document] = Field(default_factory=list)
     answer: str = ""
 
 
 
-@tool(
-    response_format="content_and_artifact",
-    description=(
-        "Récupère les informations personnelles de l'utilisateur (expérience, projets, compétences, formation, autre) "
-        "pertinentes à la question posée. "
-        "Le contenu renvoyé représente la mémoire de la personne, sur laquelle elle peut baser ses réponses. "
-        "Ne pas inventer d'informations absentes des documents."
-    )
+RETRIEVE_TOOL_DESCRIPTION = (
+    "Récupère les informations personnelles de l'utilisateur (expérience, projets, compétences, formation, autre) "
+    "pertinentes à la question posée. "
+    "Préciser une catégorie quand la question vise clairement un seul type d'information. "
+    "Le contenu renvoyé représente la mémoire de la personne, sur laquelle elle peut baser ses réponses. "
+    "Ne pas inventer d'informations absentes des documents."
 )
-def retrieve(state: RetrieveState):
-    """
-     Retrieve documents relevant to a user's question from the vector store.
 
-     Args:
-         state (RetrieveState): Contains the question and optional context.
 
-     Returns:
-         Tuple[str, List[Document]]: Serialized content of retrieved documents
-         and the raw document objects.
-     """
-    logger.debug(f"🔹 Entering retrieve() for question: {state.question!r}")
-
-    try:
-        retrieved_docs, scores = vector_store.similarity_search(state.question)
+def _category_filter(state: RetrieveState) -> Optional[str]:
+    """
+    Get the category filter requested by the LLM, ignoring unknown categories.
 
-        serialized = "\n\n".join(
-            f"Source: {doc.metadata}\nContent: {doc.page_content}"
-            for doc in retrieved_docs
-        )
+    Args:
+        state (RetrieveState): Tool arguments.
 
-        return serialized, retrieved_docs
-    except Exception as e:
-        logger.exception(f"❌ Error in retrieve: {e}")
-        raise
+    Returns:
+        str | None: A known category, or None to search every category.
+    """
+    if state.category in CMS_CATEGORIES:
+        return state.category
+    if state.category:
+        logger.debug(f"Ignoring unknown category filter {state.category!r}")
+    return None
 
 
 class RAGPipeline:
@@ -90,31 +93,237 @@ class RAGPipeline:
         ai_information (dict): AI assistant metadata fetched from CMS.
         vector_store (EmbeddingDocumentStore): Vector store for document retrieval.
         llm: Initialized language model for response generation.
-        summarization_node (SummarizationNode): Node for summarizing conversation context.
+        summarizer (ConversationSummarizer): Incremental summarization of long conversations.
+        retrieve_tool (StructuredTool): Retrieval tool bound to the vector store.
         tools (ToolNode): Node containing retrieval tools.
+        llm_with_tools: Chat model with the retrieval tool bound, built once.
+        answer_cache (SemanticAnswerCache): Cache of first-turn answers, looked up by question similarity.
+        context_params (ContextSelectionParams): Selection of the retrieved chunks sent to the LLM.
+        intent_router (IntentRouter): Local classifier routing clear questions without the routing LLM call.
+        speculative (SpeculativeRetriever): Searches started while the routing LLM call is in flight.
         graph: Compiled LangGraph execution graph.
     """
 
-    def __init__(self):
-        self.ai_information = cms.fetch_ai_information()
+    # Graph nodes whose LLM output is the answer shown to the user
+    ANSWER_NODES = ("query_or_respond", "respond", "generate")
+
+    def __init__(
+        self,
+        vector_store: EmbeddingDocumentStore,
+        llm,
+        ai_information: dict,
+        answer_cache_params: Optional[SemanticAnswerCacheParams] = None,
+        context_params: Optional[ContextSelectionParams] = None,
+        intent_router_params: Optional[IntentRouterParams] = None,
+        speculative_params: Optional[SpeculativeRetrievalParams] = None,
+        summary_params: Optional[ConversationSummaryParams] = None
+    ):
+        """
+        Assemble the pipeline from already loaded services.
+
+        Args:
+            vector_store (EmbeddingDocumentStore): Vector store for document retrieval.
+            llm: Initialized chat model.
+            ai_information (dict): AI assistant metadata fetched from CMS.
+            answer_cache_params (Optional[SemanticAnswerCacheParams]): Custom answer cache parameters.
+            context_params (Optional[ContextSelectionParams]): Custom context selection parameters.
+            intent_router_params (Optional[IntentRouterParams]): Custom intent router parameters.
+            speculative_params (Optional[SpeculativeRetrievalParams]): Custom speculative retrieval parameters.
+            summary_params (Optional[ConversationSummaryParams]): Custom conversation summarization parameters.
+        """
+        self.ai_information = ai_information
         self.vector_store = vector_store
+        self.llm = llm
+        self.context_params = context_params or ContextSelectionParams()
+
+        self.summarizer = ConversationSummarizer(self.llm, summary_params)
 
-        self.model = settings.MISTRAL_MODEL_NAME
-        self.llm = init_chat_model(
-            self.model,
-            model_provider="mistralai",
-            api_key=settings.MISTRAL_API_KEY
+        self.retrieve_tool = StructuredTool.from_function(
+            func=self._retrieve,
+            coroutine=self._aretrieve,
+            name="retrieve",
+            description=RETRIEVE_TOOL_DESCRIPTION,
+            response_format="content_and_artifact"
         )
+        self.tools = ToolNode([self.retrieve_tool])
+        self.llm_with_tools = self.llm.bind_tools([self.retrieve_tool])
+        self.answer_cache = SemanticAnswerCache(answer_cache_params)
+        self.intent_router = IntentRouter(self.vector_store.embeddings, intent_router_params)
+        self.speculative = SpeculativeRetriever(speculative_params)
+        self._build_graph()
+
+
+    def _retrieve(self, state: RetrieveState, tool_call_id: Annotated[str, InjectedToolCallId]):
+        """
+         Retrieve documents relevant to a user's question from the vector store.
+         Results of a matching speculative search are reused instead of searching again.
+
+         Args:
+             state (RetrieveState): Contains the question and optional context.
+             tool_call_id (str): ID of the tool call, injected by the ToolNode.
+
+         Returns:
+             Tuple[str, List[Document]]: Serialized content of the selected passages
+             and the passages themselves.
+         """
+        logger.debug(f"🔹 Entering retrieve() for question: {state.question!r} (category: {state.category!r})")
+
+        try:
+            category = _category_filter(state)
+            results = self._speculative_results(self.speculative.claim(tool_call_id), state.question, category)
+            if results is None:
+                results = self.vector_store.similarity_search(
+                    state.question, k=self.context_params.candidates, category=category
+                )
+            retrieved_docs, scores = results
+            return self._select_context(retrieved_docs, scores)
+        except Exception as e:
+            logger.exception(f"❌ Error in retrieve: {e}")
+            raise
+
+
+    async def _aretrieve(self, state: RetrieveState, tool_call_id: Annotated[str, InjectedToolCallId]):
+        """
+         Asynchronous version of the retrieve tool. Embedding and vector store search
+         run in the store's thread pool instead of the event loop.
+
+         Args:
+             state (RetrieveState): Contains the question and optional context.
+             tool_call_id (str): ID of the tool call, injected by the ToolNode.
+
+         Returns:
+             Tuple[str, List[Document]]: Serialized content of the selected passages
+             and the passages themselves.
+         """
+        logger.debug(f"🔹 Entering aretrieve() for question: {state.question!r} (category: {state.category!r})")
 
-        self.summarization_node = SummarizationNode(
-            token_counter=count_tokens_approximately,
-            model=self.llm,
-            max_tokens=350,
-            output_messages_key="messages"
+        try:
+            category = _category_filter(state)
+            results = await self._aspeculative_results(self.speculative.claim(tool_call_id), state.question, category)
+            if results is None:
+                results = await self.vector_store.asimilarity_search(
+                    state.question, k=self.context_params.candidates, category=category
+                )
+            retrieved_docs, scores = results
+            return self._select_context(retrieved_docs, scores)
+        except Exception as e:
+            logger.exception(f"❌ Error in retrieve: {e}")
+            raise
+
+
+    def _start_speculation(self, state: MessagesState) -> Optional[Speculation]:
+        """
+        Start searching on the user message before the LLM decides whether to retrieve.
+
+        Args:
+            state (MessagesState): Current conversation messages.
+
+        Returns:
+            Optional[Speculation]: The running search, None if speculation is disabled.
+        """
+        question = self._last_question(state)
+        if not self.speculative.params.enabled or not question:
+            return None
+        future = self.vector_store.similarity_search_future(question, k=self.context_params.candidates)
+        return Speculation(question=question, future=future)
+
+
+    def _hand_over_speculation(self, speculation: Optional[Speculation], response_messages: dict):
+        """
+        Give the speculative search to the retrieve tool call of the LLM response, or discard it.
+
+        Args:
+            speculation (Optional[Speculation]): The running search.
+            response_messages (dict): Output of the routing LLM call.
+        """
+        if speculation is None:
+            return
+        response = response_messages["messages"][-1]
+        tool_call = next(
+            (call for call in getattr(response, "tool_calls", None) or [] if call["name"] == self.retrieve_tool.name),
+            None
         )
+        if tool_call is None:
+            self.speculative.discard(speculation)
+        else:
+            self.speculative.register(tool_call["id"], speculation)
 
-        self.tools = ToolNode([retrieve])
-        self._build_graph()
+
+    def _speculative_results(self, speculation: Optional[Speculation], question: str, category: Optional[str]):
+        """
+        Get the results of the speculative search if they answer the requested query.
+
+        Args:
+            speculation (Optional[Speculation]): Search handed over to the tool call.
+            question (str): Query requested by the LLM.
+            category (Optional[str]): Category filter requested by the LLM.
+
+        Returns:
+            Optional[Tuple[List[Document], List[float]]]: Search results, None if they cannot be used.
+        """
+        if speculation is None:
+            return None
+        vectors = (None, None)
+        if self.speculative.needs_vectors(speculation, question, category):
+            vectors = (self.vector_store.embed_query(speculation.question), self.vector_store.embed_query(question))
+        if not self.speculative.accepts(speculation, question, category, *vectors):
+            return None
+        try:
+            return speculation.future.result()
+        except (CancelledError, Exception) as e:
+            logger.warning(f"⚠️ Speculative retrieval failed, searching again: {e!r}")
+            return None
+
+
+    async def _aspeculative_results(self, speculation: Optional[Speculation], question: str, category: Optional[str]):
+        """
+        Asynchronous version of _speculative_results().
+
+        Args:
+            speculation (Optional[Speculation]): Search handed over to the tool call.
+            question (str): Query requested by the LLM.
+            category (Optional[str]): Category filter requested by the LLM.
+
+        Returns:
+            Optional[Tuple[List[Document], List[float]]]: Search results, None if they cannot be used.
+        """
+        if speculation is None:
+            return None
+        vectors = (None, None)
+        if self.speculative.needs_vectors(speculation, question, category):
+            vectors = (
+                await self.vector_store.aembed_query(speculation.question),
+                await self.vector_store.aembed_query(question)
+            )
+        if not self.speculative.accepts(speculation, question, category, *vectors):
+            return None
+        try:
+            return await asyncio.wrap_future(speculation.future)
+        except (CancelledError, Exception) as e:
+            logger.warning(f"⚠️ Speculative retrieval failed, searching again: {e!r}")
+            return None
+
+
+    def _select_context(self, docs: List[Document], scores: List[Optional[float]]) -> Tuple[str, List[Document]]:
+        """
+        Trim the retrieved chunks to the ones worth their prompt tokens, and serialize them.
+
+        Args:
+            docs (List[Document]): Retrieved chunks, most relevant first.
+            scores (List[Optional[float]]): Search scores of the chunks.
+
+        Returns:
+            Tuple[str, List[Document]]: Tool message content and the selected passages.
+        """
+        selected = select_context(docs, self.vector_store.relevances(scores), self.context_params)
+        content = format_context(selected)
+        # Compared with what the tool used to send: every chunk, with its full metadata
+        baseline = "\n\n".join(f"Source: {doc.metadata}\nContent: {doc.page_content}" for doc in docs)
+        logger.info(
+            f"✂️ Context: {len(docs)} chunks (~{estimate_tokens(baseline)} tokens) "
+            f"→ {len(selected)} passages (~{estimate_tokens(content)} tokens)"
+        )
+        return content, selected
 
 
     def _build_graph(self):
@@ -123,20 +332,35 @@ class RAGPipeline:
         """
         graph_builder = StateGraph(MessagesState)
 
-        graph_builder.add_node(self.query_or_respond)
+        graph_builder.add_node(
+            "route",
+            RunnableLambda(self.route, afunc=self.aroute),
+            destinations=("tools", "respond", "query_or_respond")
+        )
+        # LLM nodes get both implementations: invoke() uses the sync one, ainvoke() the async one
+        graph_builder.add_node(
+            "query_or_respond",
+            RunnableLambda(self.query_or_respond, afunc=self.aquery_or_respond)
+        )
+        graph_builder.add_node(
+            "respond",
+            RunnableLambda(self.respond, afunc=self.arespond)
+        )
         graph_builder.add_node(self.tools)
-        graph_builder.add_node(self.generate)
+        graph_builder.add_node(
+            "generate",
+            RunnableLambda(self.generate, afunc=self.agenerate)
+        )
         graph_builder.add_node(self.cleanup_messages)
         graph_builder.add_node(self.cleanup_markdown)
-        graph_builder.add_node("summarize", self.summarization_node)
 
-        graph_builder.add_edge(START, "summarize")
-        graph_builder.add_edge("summarize", "query_or_respond")
+        graph_builder.add_edge(START, "route")
         graph_builder.add_conditional_edges(
             "query_or_respond",
             tools_condition,
             {END: END, "tools": "tools"}
         )
+        graph_builder.add_edge("respond", "cleanup_markdown")
         graph_builder.add_edge("tools", "generate")
         graph_builder.add_edge("generate", "cleanup_messages")
         graph_builder.add_edge("cleanup_messages", "cleanup_markdown")
@@ -151,6 +375,9 @@ class RAGPipeline:
         """
                Execute the RAG pipeline on a user question.
 
+               Without an event loop to defer to, a due summarization runs right after
+               the answer is computed (or before it, when background summarization is disabled).
+
                Args:
                    question (str): The user's input question.
                    session_id (str): Unique session/thread identifier.
@@ -163,21 +390,349 @@ class RAGPipeline:
 
         try:
             config = {"configurable": {"thread_id": session_id}}
-            result = self.graph.invoke(initial_state, config)
-            logger.debug(f"RESULTS : {result}")
+            start = time.perf_counter()
+            if not self.summarizer.params.background:
+                self.summarizer.summarize(self.graph, config)
+
+            cached_answer, question_vector, index_version = self._lookup_answer_cache(question, config)
+            if cached_answer is not None:
+                self.graph.update_state(config, self._cached_turn(question, cached_answer), as_node="cleanup_markdown")
+                answer = cached_answer
+            else:
+                result = self.graph.invoke(initial_state, config)
+                answer = self._extract_answer(result)
+
+                if question_vector is not None:
+                    self.answer_cache.store(question, question_vector, answer, index_version)
+
+            self._log_turn_latency(start)
+            if self.summarizer.params.background:
+                self.summarizer.summarize(self.graph, config)
+            return answer
+        except Exception as e:
+            logger.exception(f"❌ Error while executing RAG pipeline: {e}")
+            raise
+
 
-            messages = result.get("messages", [])
-            last_ai_message = next((m for m in reversed(messages) if m.type == "ai"), None)
+    @traceable
+    async def aexecute(self, question: str, session_id: str) -> str:
+        """
+               Execute the RAG pipeline on a user question without blocking the event loop.
 
-            logger.info("✅ RAG pipeline execution completed successfully.")
-            logger.debug(f"Final result: {last_ai_message}")
+               LLM calls use the model's async client and retrieval runs in the
+               vector store's thread pool. A due summarization runs in the background
+               once the answer is returned.
+
+               Args:
+                   question (str): The user's input question.
+                   session_id (str): Unique session/thread identifier.
+
+               Returns:
+                   str: Final AI-generated response content.
+        """
+        logger.info(f"🟢 Starting async RAG pipeline for question: {question!r}")
+        initial_state = { "messages": [HumanMessage(content=question)]}
 
-            return last_ai_message.content
+        try:
+            config = {"configurable": {"thread_id": session_id}}
+            start = time.perf_counter()
+            if not self.summarizer.params.background:
+                await self.summarizer.asummarize(self.graph, config)
+
+            async with self.summarizer.session_lock(session_id):
+                cached_answer, question_vector, index_version = await self._alookup_answer_cache(question, config)
+                if cached_answer is not None:
+                    await self.graph.aupdate_state(config, self._cached_turn(question, cached_answer), as_node="cleanup_markdown")
+                    answer = cached_answer
+                else:
+                    result = await self.graph.ainvoke(initial_state, config)
+                    answer = self._extract_answer(result)
+
+                    if question_vector is not None:
+                        self.answer_cache.store(question, question_vector, answer, index_version)
+
+            self._log_turn_latency(start)
+            if self.summarizer.params.background:
+                self.summarizer.schedule(self.graph, config)
+            return answer
         except Exception as e:
             logger.exception(f"❌ Error while executing RAG pipeline: {e}")
             raise
 
 
+    async def astream(self, question: str, session_id: str) -> AsyncIterator[str]:
+        """
+        Execute the RAG pipeline and stream the answer tokens as the LLM produces them.
+
+        Markdown is removed incrementally from the stream, the same way the
+        cleanup_markdown node does on the stored answer.
+
+        Args:
+            question (str): The user's input question.
+            session_id (str): Unique session/thread identifier.
+
+        Yields:
+            str: Cleaned pieces of the answer.
+        """
+        logger.info(f"🟢 Starting streamed RAG pipeline for question: {question!r}")
+        initial_state = { "messages": [HumanMessage(content=question)]}
+        config = {"configurable": {"thread_id": session_id}}
+        cleaner = MarkdownStreamCleaner()
+        streamed = []
+
+        try:
+            start = time.perf_counter()
+            if not self.summarizer.params.background:
+                await self.summarizer.asummarize(self.graph, config)
+
+            async with self.summarizer.session_lock(session_id):
+                cached_answer, question_vector, index_version = await self._alookup_answer_cache(question, config)
+                if cached_answer is not None:
+                    await self.graph.aupdate_state(config, self._cached_turn(question, cached_answer), as_node="cleanup_markdown")
+                    yield cached_answer
+                else:
+                    async for chunk, metadata in self.graph.astream(initial_state, config, stream_mode="messages"):
+                        # Only answer tokens: skip tool messages and tool call requests
+                        if metadata.get("langgraph_node") not in self.ANSWER_NODES:
+                            continue
+                        if not isinstance(chunk, AIMessageChunk) or chunk.tool_call_chunks:
+                            continue
+                        if not isinstance(chunk.content, str):
+                            continue
+
+                        text = cleaner.feed(chunk.content)
+                        if text:
+                            streamed.append(text)
+                            yield text
+
+                    text = cleaner.flush()
+                    if text:
+                        streamed.append(text)
+                        yield text
+
+                    if question_vector is not None:
+                        self.answer_cache.store(question, question_vector, "".join(streamed), index_version)
+
+            self._log_turn_latency(start)
+            if self.summarizer.params.background:
+                self.summarizer.schedule(self.graph, config)
+            logger.info("✅ Streamed RAG pipeline execution completed successfully.")
+        except Exception as e:
+            logger.exception(f"❌ Error while streaming RAG pipeline: {e}")
+            raise
+
+
+    def _log_turn_latency(self, start: float):
+        """
+        Log how long a turn took, with the summarization mode it ran under.
+
+        Args:
+            start (float): perf_counter() value at the start of the turn.
+        """
+        mode = "background" if self.summarizer.params.background else "inline"
+        logger.info(f"⏱️ Turn answered in {(time.perf_counter() - start) * 1000:.0f} ms ({mode} summarization)")
+
+
+    def _lookup_answer_cache(self, question: str, config: dict) -> Tuple[Optional[str], Optional[List[float]], int]:
+        """
+        Look up the semantic answer cache for a question.
+
+        Only first-turn questions use the cache, since the conversation history
+        can change the answer of later ones.
+
+        Args:
+            question (str): The user's input question.
+            config (dict): Graph configuration of the session.
+
+        Returns:
+            Tuple[Optional[str], Optional[List[float]], int]: Cached answer (None on miss),
+            question embedding (None if the cache does not apply) and vector store index version.
+        """
+        index_version = self.vector_store.current_index_version()
+        if self.graph.get_state(config).values.get("messages"):
+            return None, None, index_version
+
+        question_vector = self.vector_store.embed_query(question)
+        return self.answer_cache.lookup(question_vector, index_version), question_vector, index_version
+
+
+    async def _alookup_answer_cache(self, question: str, config: dict) -> Tuple[Optional[str], Optional[List[float]], int]:
+        """
+        Asynchronous version of _lookup_answer_cache().
+
+        Args:
+            question (str): The user's input question.
+            config (dict): Graph configuration of the session.
+
+        Returns:
+            Tuple[Optional[str], Optional[List[float]], int]: Cached answer (None on miss),
+            question embedding (None if the cache does not apply) and vector store index version.
+        """
+        index_version = await self.vector_store.acurrent_index_version()
+        if (await self.graph.aget_state(config)).values.get("messages"):
+            return None, None, index_version
+
+        question_vector = await self.vector_store.aembed_query(question)
+        return self.answer_cache.lookup(question_vector, index_version), question_vector, index_version
+
+
+    @staticmethod
+    def _cached_turn(question: str, answer: str) -> dict:
+        """
+        Build the state update recording a turn answered from the cache in the session history.
+
+        Args:
+            question (str): The user's input question.
+            answer (str): The cached answer.
+
+        Returns:
+            dict: Messages to add to the conversation.
+        """
+        return {"messages": [HumanMessage(content=question), AIMessage(content=answer)]}
+
+
+    @staticmethod
+    def _extract_answer(result: dict) -> str:
+        """
+        Extract the final answer from the graph output.
+
+        Args:
+            result (dict): Final graph state.
+
+        Returns:
+            str: Content of the last AI message.
+        """
+        logger.debug(f"RESULTS : {result}")
+
+        messages = result.get("messages", [])
+        last_ai_message = next((m for m in reversed(messages) if m.type == "ai"), None)
+
+        logger.info("✅ RAG pipeline execution completed successfully.")
+        logger.debug(f"Final result: {last_ai_message}")
+
+        return last_ai_message.content
+
+
+    @staticmethod
+    def _last_question(state: MessagesState) -> str:
+        """
+        Get the latest user message of the conversation.
+
+        Args:
+            state (MessagesState): Current conversation messages.
+
+        Returns:
+            str: Content of the last human message.
+        """
+        message = next((m for m in reversed(state["messages"]) if m.type == "human"), None)
+        return message.content if message is not None and isinstance(message.content, str) else ""
+
+
+    @staticmethod
+    def _route_command(question: str, intent: str) -> Command:
+        """
+        Build the graph command following a routing decision.
+
+        Retrieval questions get a retrieve tool call, as if the LLM had requested it,
+        so the ToolNode runs them straight away.
+
+        Args:
+            question (str): The user's question.
+            intent (str): Intent given by the router.
+
+        Returns:
+            Command: Next node, with the tool call message when retrieving.
+        """
+        if intent == "retrieve":
+            tool_call = {"name": "retrieve", "args": {"state": {"question": question}}, "id": f"route_{uuid.uuid4().hex}"}
+            return Command(goto="tools", update={"messages": [AIMessage(content="", tool_calls=[tool_call])]})
+        if intent == "smalltalk":
+            return Command(goto="respond")
+        return Command(goto="query_or_respond")
+
+
+    def route(self, state: MessagesState) -> Command:
+        """
+        Route the question with the local intent router: straight to retrieval, to a direct
+        answer, or to the LLM when the router is unsure.
+
+        Args:
+            state (MessagesState): Current conversation messages.
+
+        Returns:
+            Command: Next node to run.
+        """
+        question = self._last_question(state)
+        return self._route_command(question, self.intent_router.classify(question))
+
+
+    async def aroute(self, state: MessagesState) -> Command:
+        """
+        Asynchronous version of route(). The question embedding is computed in the store's
+        thread pool, and is reused from the query cache by the retrieval that follows.
+
+        Args:
+            state (MessagesState): Current conversation messages.
+
+        Returns:
+            Command: Next node to run.
+        """
+        question = self._last_question(state)
+        question_vector = await self.vector_store.aembed_query(question) if question else None
+        return self._route_command(question, self.intent_router.classify(question, question_vector))
+
+
+    def respond(self, state: MessagesState):
+        """
+        Answer small talk directly, without retrieval tools.
+
+        Args:
+            state (MessagesState): Current conversation messages.
+
+        Returns:
+            dict: LLM response messages.
+        """
+        logger.debug("🔹 Entering respond()")
+        try:
+            prompt = build_prompt_without_context(state["messages"], self.ai_information.get("name"))
+            return self.execute_llm(self.llm, prompt)
+        except Exception as e:
+            logger.exception(f"❌ Error in respond: {e}")
+            raise
+
+
+    async def arespond(self, state: MessagesState):
+        """
+        Asynchronous version of respond().
+
+        Args:
+            state (MessagesState): Current conversation messages.
+
+        Returns:
+            dict: LLM response messages.
+        """
+        logger.debug("🔹 Entering arespond()")
+        try:
+            prompt = build_prompt_without_context(state["messages"], self.ai_information.get("name"))
+            return await self.aexecute_llm(self.llm, prompt)
+        except Exception as e:
+            logger.exception(f"❌ Error in respond: {e}")
+            raise
+
+
+    def _record_route(self, state: MessagesState, response_messages: dict):
+        """
+        Log the routing decision the LLM took, so the intent router learns from it.
+
+        Args:
+            state (MessagesState): Current conversation messages.
+            response_messages (dict): Output of the routing LLM call.
+        """
+        response = response_messages["messages"][-1]
+        intent = "retrieve" if getattr(response, "tool_calls", None) else "smalltalk"
+        self.intent_router.record(self._last_question(state), intent)
+
+
     def query_or_respond(self, state: MessagesState):
         """
         Decide whether to respond directly or invoke a retrieval tool.
@@ -199,8 +754,39 @@ class RAGPipeline:
             )
 
             logger.debug("Launch LLM call")
-            llm_with_tools = self.llm.bind_tools([retrieve])
-            response_messages = self.execute_llm(llm_with_tools, prompt)
+            speculation = self._start_speculation(state)
+            response_messages = self.execute_llm(self.llm_with_tools, prompt)
+            self._hand_over_speculation(speculation, response_messages)
+            self._record_route(state, response_messages)
+
+            return response_messages
+        except Exception as e:
+            logger.exception(f"❌ Error in query_or_respond: {e}")
+            raise
+
+
+    async def aquery_or_respond(self, state: MessagesState):
+        """
+        Asynchronous version of query_or_respond().
+
+        Args:
+            state (MessagesState): Current conversation messages.
+
+        Returns:
+            dict: LLM response messages.
+        """
+        logger.debug("🔹 Entering aquery_or_respond()")
+
+        try:
+            prompt = build_prompt_without_context(
+                state["messages"],
+                self.ai_information.get("name")
+            )
+
+            speculation = self._start_speculation(state)
+            response_messages = await self.aexecute_llm(self.llm_with_tools, prompt)
+            self._hand_over_speculation(speculation, response_messages)
+            self._record_route(state, response_messages)
 
             return response_messages
         except Exception as e:
@@ -220,30 +806,67 @@ class RAGPipeline:
         """
         logger.debug("🔹 Entering generate()")
         try:
-            recent_tool_messages = []
+            prompt = build_prompt_with_context(
+                state["messages"],
+                self.ai_information.get("name"),
+                self._collect_tool_contents(state)
+            )
+
+            response_messages = self.execute_llm(self.llm, prompt)
+            return response_messages
+        except Exception as e:
+            logger.exception(f"❌ Error in generate: {e}")
+            raise
 
-            for message in reversed(state["messages"]):
-                if message.type == "tool":
-                    recent_tool_messages.append(message)
 
-            tool_messages = recent_tool_messages[::-1]
-            docs_content = "\n\n".join(msg.content for msg in tool_messages)
+    async def agenerate(self, state: MessagesState):
+        """
+        Asynchronous version of generate().
 
-            logger.debug(f"🧩 Docs content passed to LLMProcessor ({len(docs_content)} chars)")
+        Args:
+            state (MessagesState): Current conversation messages including tool outputs.
 
+        Returns:
+            dict: LLM response messages.
+        """
+        logger.debug("🔹 Entering agenerate()")
+        try:
             prompt = build_prompt_with_context(
                 state["messages"],
                 self.ai_information.get("name"),
-                docs_content
+                self._collect_tool_contents(state)
             )
 
-            response_messages = self.execute_llm(self.llm, prompt)
-            return response_messages
+            return await self.aexecute_llm(self.llm, prompt)
         except Exception as e:
             logger.exception(f"❌ Error in generate: {e}")
             raise
 
 
+    @staticmethod
+    def _collect_tool_contents(state: MessagesState) -> str:
+        """
+        Join the contents of the tool messages of the current conversation.
+
+        Args:
+            state (MessagesState): Current conversation messages including tool outputs.
+
+        Returns:
+            str: Retrieved documents content, in conversation order.
+        """
+        recent_tool_messages = []
+
+        for message in reversed(state["messages"]):
+            if message.type == "tool":
+                recent_tool_messages.append(message)
+
+        tool_messages = recent_tool_messages[::-1]
+        docs_content = "\n\n".join(msg.content for msg in tool_messages)
+
+        logger.debug(f"🧩 Docs content passed to LLMProcessor ({len(docs_content)} chars)")
+        return docs_content
+
+
     @staticmethod
     def cleanup_messages(state: MessagesState):
         """
@@ -286,14 +909,7 @@ class RAGPipeline:
 
         for message in reversed(state["messages"]):
             if message.type == "ai":
-                text = message.content
-                text = re.sub(r'(```.*?```)', '', text, flags=re.DOTALL)  # code blocks
-                text = re.sub(r'`([^`]*)`', r'\1', text)  # code inline
-                text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)  # bold
-                text = re.sub(r'\*(.*?)\*', r'\1', text)  # italic
-                text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', text)  # links
-                text = re.sub(r'#+\s*(.*)', r'\1', text)  # titles
-                message.content = text.strip()
+                message.content = clean_markdown(message.content)
                 break
 
         return {"messages": state["messages"]}
@@ -320,4 +936,22 @@ class RAGPipeline:
         return {"messages": [response]}
 
 
+    @staticmethod
+    @traceable(run_type="llm")
+    async def aexecute_llm(llm, prompt):
+        """
+        Invoke the LLM asynchronously with a given prompt.
+
+        Args:
+            llm: Language model instance.
+            prompt: Prompt to send to the model.
+
+        Returns:
+            dict: LLM response messages, including tool calls if any.
+        """
+        response = await llm.ainvoke(prompt)
+
+        logger.debug(f"LLM responded: {getattr(response, 'content', None)}")
+        logger.debug(f"Tool calls (if any): {getattr(response, 'tool_calls', None)}")
 
+        return {"messages": [response]}
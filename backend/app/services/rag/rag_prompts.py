@@ -1,26 +1,52 @@
+from functools import lru_cache
+
 from langchain_core.messages import SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 
 
+# Templates are compiled once. The system message starts with the static instructions and ends
+# with the per-request context, so consecutive turns share the same prompt prefix
+# (provider-side prefix caching).
 
+WITH_CONTEXT_SYSTEM_TEMPLATE = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        "Tu es {name}. Tu t’exprimes à la première personne, comme si c’était toi-même. "
+        "Ton rôle est de répondre naturellement et simplement, comme dans une vraie conversation. "
+        "Utilise uniquement les informations présentes dans le contexte ci-dessous. "
+        "Si une information n’y figure pas, dis simplement que tu ne t’en souviens pas ou que tu n’as pas l’information. "
+        "Ne devine jamais. Ne parle pas du 'contexte' ni du fait que tu es une IA. "
+        "Réponds en 1 à 3 phrases maximum, sans formules trop formelles ni listes."
+    ),
+])
 
+CONTEXT_TEMPLATE = (
+    "Voici les informations dont tu disposes sur toi-même :\n\n{context}\n\n"
+    "Réponds maintenant comme si c’était toi."
+)
 
-def format_prompt(prompt_template, historic, **kwargs):
-    """
-    Build a prompt by combining a system message with historic conversation messages.
+WITHOUT_CONTEXT_SYSTEM_TEMPLATE = ChatPromptTemplate.from_messages([
+    (
+        "system",
+        "Tu es {name}. Tu t’exprimes à la première personne, naturellement et simplement. "
+        "Tu ne dois parler que de ce qui se trouve dans l’historique de la conversation. "
+        "Si tu n’as pas l’information, dis-le clairement ('je ne m’en souviens pas', 'je ne suis pas sûr') ou appelle tes tools. "
+        "Ne fais aucune supposition et n’invente jamais. "
+        "Réponds en 1 à 3 phrases maximum."
+    ),
+])
 
-    Args:
-        prompt_template (ChatPromptTemplate): Template for generating the system message.
-        historic (list): List of previous messages (HumanMessage, AIMessage, etc.).
-        **kwargs: Keyword arguments to fill the template placeholders.
 
-    Returns:
-        list: List of messages starting with the system message followed by historic messages.
-    """
-    system_message_content = prompt_template.invoke(kwargs).to_string()
-    system_message = SystemMessage(system_message_content)
-    prompt = [system_message] + historic
-    return prompt
+@lru_cache(maxsize=32)
+def _with_context_instructions(name: str) -> str:
+    """Render the static instructions of context-based answers once per persona name."""
+    return WITH_CONTEXT_SYSTEM_TEMPLATE.invoke({"name": name}).to_string()
+
+
+@lru_cache(maxsize=32)
+def _without_context_system_message(name: str) -> SystemMessage:
+    """Render the system message of context-free answers once per persona name."""
+    return SystemMessage(WITHOUT_CONTEXT_SYSTEM_TEMPLATE.invoke({"name": name}).to_string())
 
 
 def build_prompt_with_context(
@@ -32,6 +58,10 @@ def build_prompt_with_context(
     Build a prompt that makes the AI speak as if it were the user,
     using only the retrieved personal context.
 
+    The context is rendered into the system message, after the static instructions, so the
+    prompt keeps starting with the same text from one turn to the next, and the conversation
+    still ends with the tool message of the retrieval.
+
       Args:
           historic (list): List of previous messages in the conversation.
           name (str, optional): Name of the AI persona. Defaults to "une IA".
@@ -40,31 +70,9 @@ def build_prompt_with_context(
       Returns:
           list: Formatted messages ready to be passed to the LLM.
       """
-    prompt_template = ChatPromptTemplate.from_messages([
-        (
-            "system",
-            "Tu es {name}. Tu t’exprimes à la première personne, comme si c’était toi-même. "
-            "Ton rôle est de répondre naturellement et simplement, comme dans une vraie conversation. "
-            "Utilise uniquement les informations présentes dans le contexte ci-dessous. "
-            "Si une information n’y figure pas, dis simplement que tu ne t’en souviens pas ou que tu n’as pas l’information. "
-            "Ne devine jamais. Ne parle pas du 'contexte' ni du fait que tu es une IA. "
-            "Réponds en 1 à 3 phrases maximum, sans formules trop formelles ni listes."
-        ),
-        (
-            "human",
-            "Voici les informations dont tu disposes sur toi-même :\n\n{context}\n\n"
-            "Réponds maintenant comme si c’était toi."
-        ),
-    ])
-
-    prompt = format_prompt(
-        prompt_template,
-        historic,
-        name=name,
-        context=docs_content
-    )
-
-    return prompt
+    instructions = _with_context_instructions(name or "une IA")
+    system_message = SystemMessage(f"{instructions}\n\n{CONTEXT_TEMPLATE.format(context=docs_content)}")
+    return [system_message, *historic]
 
 
 def build_prompt_without_context(historic, name: str = "une IA"):
@@ -78,24 +86,4 @@ def build_prompt_without_context(historic, name: str = "une IA"):
     Returns:
       list: Formatted messages ready to be passed to the LLM.
     """
-    if not name:
-        name = "une IA"
-
-    prompt_template = ChatPromptTemplate.from_messages([
-        (
-            "system",
-            "Tu es {name}. Tu t’exprimes à la première personne, naturellement et simplement. "
-            "Tu ne dois parler que de ce qui se trouve dans l’historique de la conversation. "
-            "Si tu n’as pas l’information, dis-le clairement ('je ne m’en souviens pas', 'je ne suis pas sûr') ou appelle tes tools. "
-            "Ne fais aucune supposition et n’invente jamais. "
-            "Réponds en 1 à 3 phrases maximum."
-        ),
-    ])
-
-    prompt = format_prompt(
-        prompt_template,
-        historic,
-        name=name
-    )
-
-    return prompt
+    return [_without_context_system_message(name or "une IA"), *historic]
@@ -0,0 +1,286 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.models.cms_table import CMSTableSpec, TableSyncStats
+from app.models.indexing_report import IndexingReport
+from app.models.reindex_job import ReindexJob
+from app.services.rag.cms_service import cms, find_table
+from app.services.rag.components import embedding_store
+from app.services.rag.indexing_progress import IndexingProgress
+
+logger = logging.getLogger(__name__)
+
+
+class ReindexJobManager:
+    """
+    Runs reindex jobs one at a time in a background thread.
+
+    Triggers are coalesced: a trigger arriving while a job of the same mode is queued joins
+    it, and a trigger arriving while one is running queues a single follow-up job, so the
+    changes made during the run are picked up without piling up identical jobs.
+    """
+
+    def __init__(self, max_history: int = 20):
+        """
+        Args:
+            max_history (int): Number of finished jobs kept for status queries.
+        """
+        self.max_history = max_history
+
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reindex")
+        self._jobs: "OrderedDict[str, ReindexJob]" = OrderedDict()
+        self._progress: Dict[str, IndexingProgress] = {}
+        self._table_stats: Dict[str, TableSyncStats] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, mode: str, entries: Iterable[str] = (), tables: Iterable[str] = ()) -> ReindexJob:
+        """
+        Queue a reindex, or join the queued one of the same mode.
+
+        Args:
+            mode (str): "full", "delta", "rebuild", "entries" or "tables".
+            entries (Iterable[str]): CMS entries to reindex in "entries" mode, as "route/documentId".
+            tables (Iterable[str]): Routes of the tables to reindex in "tables" mode.
+
+        Returns:
+            ReindexJob: The job that will run the reindex.
+        """
+        with self._lock:
+            queued = next((job for job in self._jobs.values() if job.status == "queued" and job.mode == mode), None)
+            if queued is not None:
+                queued.requests += 1
+                queued.entries += [entry for entry in entries if entry not in queued.entries]
+                queued.tables += [table for table in tables if table not in queued.tables]
+                logger.info(f"🔁 Reindex trigger coalesced into queued job {queued.id} ({queued.requests} requests)")
+                return queued.model_copy()
+
+            job = ReindexJob(
+                id=uuid.uuid4().hex, mode=mode, entries=list(dict.fromkeys(entries)), tables=list(dict.fromkeys(tables))
+            )
+            self._jobs[job.id] = job
+            self._progress[job.id] = IndexingProgress()
+            self._trim_history()
+
+        self._executor.submit(self._run, job.id)
+        logger.info(f"🗂️ Reindex job {job.id} queued ({mode})")
+        return job.model_copy()
+
+    def get(self, job_id: str) -> Optional[ReindexJob]:
+        """
+        Get the current state of a job.
+
+        Args:
+            job_id (str): Job ID.
+
+        Returns:
+            Optional[ReindexJob]: The job with its live progress, None if unknown.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job = job.model_copy()
+            progress = self._progress.get(job_id)
+
+        if progress is not None and job.status != "queued":
+            job = job.model_copy(update=progress.snapshot())
+        return job
+
+    def table_stats(self) -> Dict[str, TableSyncStats]:
+        """
+        Get the metrics of the per-table syncs.
+
+        Returns:
+            Dict[str, TableSyncStats]: Metrics of each table synced by a "tables" job, by route.
+        """
+        with self._lock:
+            return {route: stats.model_copy() for route, stats in self._table_stats.items()}
+
+    def _trim_history(self):
+        """Forget the oldest finished jobs beyond `max_history`, lock held."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.status in ("succeeded", "partial", "failed")]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_history)]:
+            del self._jobs[job_id]
+            self._progress.pop(job_id, None)
+
+    def _update(self, job_id: str, **fields):
+        """Update a job's fields under the lock."""
+        with self._lock:
+            job = self._jobs[job_id]
+            for name, value in fields.items():
+                setattr(job, name, value)
+
+    def _finish(self, job_id: str, **fields):
+        """Freeze a job's progress into it, so its throughput stops changing once it ended."""
+        with self._lock:
+            progress = self._progress.pop(job_id)
+        self._update(job_id, **progress.snapshot(), finished_at=datetime.now(), **fields)
+
+    def _run(self, job_id: str):
+        """
+        Run a job in the worker thread.
+
+        Args:
+            job_id (str): Job ID.
+        """
+        with self._lock:
+            mode = self._jobs[job_id].mode
+            entries = list(self._jobs[job_id].entries)
+            tables = list(self._jobs[job_id].tables)
+            progress = self._progress[job_id]
+        self._update(job_id, status="running", started_at=datetime.now())
+        logger.info(f"🚀 Reindex job {job_id} started ({mode})")
+
+        try:
+            embedding_db = embedding_store.get()
+
+            failed_tables = {}
+            if mode == "entries":
+                report = self._sync_entries(embedding_db, entries, progress)
+            elif mode == "tables":
+                report, failed_tables = self._sync_tables(embedding_db, tables, progress)
+            elif mode == "delta":
+                # Fetch only the CMS changes and commit the watermarks once they are indexed
+                with progress.track("fetch"):
+                    cms_delta = cms.fetch_delta()
+                progress.count("fetch", len(cms_delta.documents))
+                report = embedding_db.sync_documents(cms_delta.documents, present_ids=cms_delta.present_ids, progress=progress)
+                cms.commit_delta(cms_delta)
+            else:
+                with progress.track("fetch"):
+                    documents = cms.fetch_all()
+                progress.count("fetch", len(documents))
+                if mode == "rebuild":
+                    report = embedding_db.rebuild_collection(documents, progress=progress)
+                else:
+                    report = embedding_db.sync_documents(documents, progress=progress)
+
+            if failed_tables:
+                error = "Failed tables: " + "; ".join(f"{route} ({message})" for route, message in failed_tables.items())
+                self._finish(job_id, status="partial", report=report, error=error)
+                logger.warning(f"⚠️ Reindex job {job_id} partially done: {report.indexed} chunks indexed. {error}")
+            else:
+                self._finish(job_id, status="succeeded", report=report)
+                logger.info(
+                    f"✅ Reindex job {job_id} done: {report.indexed} chunks indexed "
+                    f"({report.embedded} embedded, {report.unchanged} skipped)."
+                )
+        except Exception as e:
+            self._finish(job_id, status="failed", error=f"{type(e).__name__}: {e}")
+            logger.exception(f"❌ Reindex job {job_id} failed: {e}")
+
+    @staticmethod
+    def _sync_entries(embedding_db, entries: List[str], progress: IndexingProgress) -> IndexingReport:
+        """
+        Reindex the documents of changed CMS entries, leaving the rest of the collection untouched.
+
+        Each entry is refetched alone and only its chunks are compared, re-embedded or
+        deleted, so the work is proportional to the changed documents. Entries of tables
+        refetched whole (aggregated tables, single types) are handled once per table.
+
+        Args:
+            embedding_db (EmbeddingDocumentStore): Store to update.
+            entries (List[str]): Changed CMS entries, as "route/documentId".
+            progress (IndexingProgress): Tracker of the indexing phases.
+
+        Returns:
+            IndexingReport: Chunk changes summed over the entries.
+        """
+        targets = {}
+        for entry in entries:
+            route, document_id = entry.split("/", 1)
+            table = find_table(route)
+            if table is None:
+                logger.warning(f"⚠️ Ignored CMS entry of a table that is not indexed: {entry}")
+                continue
+            targets.setdefault(route if cms.refetches_table(table) else entry, (table, document_id))
+
+        report = IndexingReport()
+        for table, document_id in targets.values():
+            with progress.track("fetch"):
+                documents, scope = cms.fetch_entry(table, document_id)
+            progress.count("fetch", len(documents))
+
+            entry_report = embedding_db.sync_documents(documents, progress=progress, scope=scope)
+            for field in IndexingReport.model_fields:
+                setattr(report, field, getattr(report, field) + getattr(entry_report, field))
+        return report
+
+    def _sync_tables(
+        self, embedding_db, routes: List[str], progress: IndexingProgress
+    ) -> Tuple[IndexingReport, Dict[str, str]]:
+        """
+        Reindex some CMS tables independently, leaving the other tables untouched.
+
+        Tables are fetched in parallel, and each one is synced as soon as it arrived, restricted
+        to the chunks of its category. A failing table is recorded and does not stop the others.
+
+        Args:
+            embedding_db (EmbeddingDocumentStore): Store to update.
+            routes (List[str]): Routes of the tables to sync.
+            progress (IndexingProgress): Tracker of the indexing phases.
+
+        Returns:
+            Tuple[IndexingReport, Dict[str, str]]: Chunk changes summed over the synced tables,
+            and the failure message of each failed table, by route.
+
+        Raises:
+            RuntimeError: If every table failed.
+        """
+        tables = [table for table in map(find_table, routes) if table is not None]
+
+        def fetch(table: CMSTableSpec):
+            start = time.perf_counter()
+            with progress.track("fetch", current=False):
+                documents = cms.fetch_table(table)
+            progress.count("fetch", len(documents))
+            return documents, time.perf_counter() - start
+
+        report = IndexingReport()
+        failed: Dict[str, str] = {}
+        with ThreadPoolExecutor(max_workers=max(1, len(tables)), thread_name_prefix="cms-table") as executor:
+            futures = {executor.submit(fetch, table): table for table in tables}
+            for future in as_completed(futures):
+                table = futures[future]
+                with self._lock:
+                    stats = self._table_stats.setdefault(table.route, TableSyncStats())
+
+                try:
+                    documents, fetch_seconds = future.result()
+                    start = time.perf_counter()
+                    table_report = embedding_db.sync_documents(
+                        documents, progress=progress, scope={"category": table.category_name}
+                    )
+                    update = dict(
+                        fetch_seconds=fetch_seconds, sync_seconds=time.perf_counter() - start,
+                        documents=len(documents), report=table_report, error=None
+                    )
+                    for field in IndexingReport.model_fields:
+                        setattr(report, field, getattr(report, field) + getattr(table_report, field))
+                    logger.info(
+                        f"📑 Table '{table.route}' synced: {len(documents)} documents fetched in {fetch_seconds:.2f}s, "
+                        f"{table_report.embedded} chunks embedded in {update['sync_seconds']:.2f}s"
+                    )
+                except Exception as e:
+                    update = dict(error=f"{type(e).__name__}: {e}")
+                    failed[table.route] = update["error"]
+                    logger.exception(f"❌ Table '{table.route}' sync failed: {e}")
+
+                with self._lock:
+                    for name, value in update.items():
+                        setattr(stats, name, value)
+                    stats.syncs += 1
+                    stats.last_synced_at = datetime.now()
+
+        if tables and len(failed) == len(tables):
+            raise RuntimeError(f"Every table sync failed: {', '.join(failed)}")
+        return report, failed
+
+
+reindex_jobs = ReindexJobManager()
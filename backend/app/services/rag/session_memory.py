@@ -0,0 +1,426 @@
+import asyncio
+import atexit
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class SessionMemoryParams(BaseModel):
+    """
+    Configuration parameters for the BoundedMemorySaver.
+
+    Attributes:
+        ttl_seconds (float): Sessions not used for this long are deleted.
+        max_bytes (int): Maximum size of the sessions kept in memory, least recently used ones are evicted first.
+        sqlite_path (Optional[str]): SQLite file persisting the sessions, None to keep them in memory only.
+        flush_delay_seconds (float): Time the SQLite writer waits to batch the writes of a turn
+            into one commit. Other workers see a session update after at most this delay.
+    """
+    ttl_seconds: float = 2 * 3600
+    max_bytes: int = 64 * 1024 * 1024
+    sqlite_path: Optional[str] = None
+    flush_delay_seconds: float = 0.2
+
+
+class _SessionInfo:
+    """Bookkeeping of a session held in memory."""
+
+    def __init__(self):
+        self.last_access = time.time()
+        self.size = 0
+        self.version: Optional[int] = None
+        self.write_keys = set()
+        self.blob_keys = set()
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    LangGraph checkpointer keeping conversations in memory with a per-session TTL
+    and a global memory cap enforced by LRU eviction.
+
+    With `sqlite_path`, every session is also written to SQLite: sessions survive restarts,
+    evicted sessions are reloaded on their next turn, and several uvicorn workers
+    sharing the file see each other's updates. Writes only mark the session dirty: a
+    background thread persists the latest state of the dirty sessions in one commit, so
+    no pickling or disk IO happens on the event loop while a turn is being checkpointed.
+    Reads compare the persisted version first, and only unpickle a session another worker
+    changed, outside of the session lock; the async read runs in a thread.
+    """
+
+    def __init__(self, params: Optional[SessionMemoryParams] = None):
+        """
+        Initialize the checkpointer.
+
+        Args:
+            params (Optional[SessionMemoryParams]): Custom memory parameters.
+        """
+        super().__init__()
+        if params is None:
+            params = SessionMemoryParams()
+        self.params = params
+
+        self._sessions: "OrderedDict[str, _SessionInfo]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.bytes_held = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        # Separate connection for reads, so they never wait for the writer's commit (WAL mode)
+        self._reader = None
+        self._read_lock = threading.Lock()
+        self._last_db_sweep = 0.0
+        # Sessions to write (latest state read at flush time, or snapshots of evicted ones) and to delete
+        self._dirty = set()
+        self._evicted_snapshots = {}
+        self._deleted = set()
+        self._flush_requested = threading.Event()
+        if self.params.sqlite_path:
+            self._open_db(self.params.sqlite_path)
+            threading.Thread(target=self._writer_loop, name="session-writer", daemon=True).start()
+            atexit.register(self.flush)
+
+    def _open_db(self, path: str):
+        """Open (or create) the SQLite session table."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                thread_id TEXT PRIMARY KEY,
+                data BLOB NOT NULL,
+                version INTEGER NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_sessions_updated_at ON sessions (updated_at)")
+        self._db.commit()
+        self._reader = sqlite3.connect(path, check_same_thread=False)
+        logger.info(f"💾 Conversation memory persisted in '{path}'")
+
+    # ------------------- Checkpointer interface -------------------
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            self._expire()
+        self._load_from_db(thread_id)
+
+        with self._lock:
+            info = self._sessions.get(thread_id)
+            if info is None:
+                # Unknown session: avoid the defaultdict entries the parent lookup would create
+                return None
+
+            info.last_access = time.time()
+            self._sessions.move_to_end(thread_id)
+            return super().get_tuple(config)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        # The version check and a possible reload hit SQLite: keep them off the event loop
+        if self._db is None:
+            return self.get_tuple(config)
+        return await asyncio.get_running_loop().run_in_executor(None, self.get_tuple, config)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        self._reload_if_evicted(thread_id)
+        with self._lock:
+            self._restore_evicted_snapshot(thread_id)
+            result = super().put(config, checkpoint, metadata, new_versions)
+
+            info = self._session(thread_id)
+            added = self._payload_size(self.storage[thread_id][checkpoint_ns][checkpoint["id"]])
+            for channel, version in new_versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                if key not in info.blob_keys:
+                    info.blob_keys.add(key)
+                    added += self._payload_size(self.blobs[key])
+            self._grow(info, added)
+
+            self._after_write(thread_id)
+            return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        outer_key = (thread_id, config["configurable"].get("checkpoint_ns", ""), config["configurable"]["checkpoint_id"])
+        self._reload_if_evicted(thread_id)
+        with self._lock:
+            self._restore_evicted_snapshot(thread_id)
+            size_before = self._payload_size(self.writes.get(outer_key, {}))
+            super().put_writes(config, writes, task_id, task_path)
+
+            info = self._session(thread_id)
+            info.write_keys.add(outer_key)
+            self._grow(info, self._payload_size(self.writes.get(outer_key, {})) - size_before)
+
+            self._after_write(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._forget(thread_id)
+            if self._db is not None:
+                self._dirty.discard(thread_id)
+                self._evicted_snapshots.pop(thread_id, None)
+                self._deleted.add(thread_id)
+                self._flush_requested.set()
+
+    # ------------------- Bounds -------------------
+
+    def _session(self, thread_id: str) -> _SessionInfo:
+        """Get the bookkeeping of a session, registering it if needed."""
+        info = self._sessions.get(thread_id)
+        if info is None:
+            info = _SessionInfo()
+            self._sessions[thread_id] = info
+        info.last_access = time.time()
+        self._sessions.move_to_end(thread_id)
+        return info
+
+    def _grow(self, info: _SessionInfo, size: int):
+        """Account for data added to a session."""
+        info.size += size
+        self.bytes_held += size
+
+    def _after_write(self, thread_id: str):
+        """Schedule the persistence of the session if enabled, then enforce the memory cap."""
+        if self._db is not None:
+            self._deleted.discard(thread_id)
+            self._dirty.add(thread_id)
+            self._flush_requested.set()
+
+        while self.bytes_held > self.params.max_bytes and len(self._sessions) > 1:
+            oldest = next(iter(self._sessions))
+            if oldest == thread_id:
+                break
+            # Keep what the writer has not persisted yet, the session is reloaded from SQLite later
+            if oldest in self._dirty:
+                self._dirty.discard(oldest)
+                self._evicted_snapshots[oldest] = self._snapshot(oldest)
+            self._forget(oldest)
+            self.evictions += 1
+
+    def _expire(self):
+        """Delete the sessions unused for longer than the TTL."""
+        deadline = time.time() - self.params.ttl_seconds
+        while self._sessions:
+            thread_id, info = next(iter(self._sessions.items()))
+            if info.last_access >= deadline:
+                break
+            self._dirty.discard(thread_id)
+            self._forget(thread_id)
+            self.expirations += 1
+
+    def _forget(self, thread_id: str):
+        """Drop the in-memory data of a session."""
+        info = self._sessions.pop(thread_id, None)
+        self.storage.pop(thread_id, None)
+        if info is None:
+            return
+
+        for key in info.write_keys:
+            self.writes.pop(key, None)
+        for key in info.blob_keys:
+            self.blobs.pop(key, None)
+        self.bytes_held -= info.size
+
+    @staticmethod
+    def _payload_size(value: Any) -> int:
+        """Approximate the memory held by serialized checkpoint data (bytes and strings it contains)."""
+        if isinstance(value, (bytes, str)):
+            return len(value)
+        if isinstance(value, dict):
+            return sum(BoundedMemorySaver._payload_size(v) for v in value.values())
+        if isinstance(value, (tuple, list)):
+            return sum(BoundedMemorySaver._payload_size(v) for v in value)
+        return 0
+
+    # ------------------- SQLite persistence -------------------
+
+    def _snapshot(self, thread_id: str) -> Tuple[dict, int]:
+        """Copy the state of a session to persist, lock held. Pickling happens later, in the writer."""
+        info = self._sessions[thread_id]
+        info.version = time.time_ns()
+        snapshot = {
+            "storage": {ns: dict(checkpoints) for ns, checkpoints in self.storage[thread_id].items()},
+            "writes": {key: dict(self.writes[key]) for key in info.write_keys if key in self.writes},
+            "blobs": {key: self.blobs[key] for key in info.blob_keys if key in self.blobs},
+        }
+        return snapshot, info.version
+
+    def _writer_loop(self):
+        """Persist the dirty sessions in batches, and sweep the expired ones once per minute."""
+        while True:
+            if self._flush_requested.wait(timeout=60):
+                # Let the other writes of the turn arrive, so they share one commit
+                time.sleep(self.params.flush_delay_seconds)
+            try:
+                self.flush()
+                if time.time() - self._last_db_sweep > 60:
+                    with self._db_lock:
+                        self._db.execute("DELETE FROM sessions WHERE updated_at < ?", (time.time() - self.params.ttl_seconds,))
+                        self._db.commit()
+                    self._last_db_sweep = time.time()
+            except Exception as e:
+                logger.exception(f"❌ Failed to persist conversations: {e}")
+
+    def flush(self):
+        """Write the dirty sessions and apply the deletions to SQLite, in one transaction."""
+        if self._db is None:
+            return
+
+        with self._lock:
+            self._flush_requested.clear()
+            snapshots = dict(self._evicted_snapshots)
+            snapshots.update({thread_id: self._snapshot(thread_id) for thread_id in self._dirty if thread_id in self._sessions})
+            deleted = list(self._deleted)
+            self._dirty.clear()
+            self._evicted_snapshots.clear()
+            self._deleted.clear()
+
+        if not snapshots and not deleted:
+            return
+
+        now = time.time()
+        rows = [
+            (thread_id, pickle.dumps(snapshot), version, now)
+            for thread_id, (snapshot, version) in snapshots.items()
+        ]
+        with self._db_lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sessions (thread_id, data, version, updated_at) VALUES (?, ?, ?, ?)", rows
+            )
+            self._db.executemany("DELETE FROM sessions WHERE thread_id = ?", [(thread_id,) for thread_id in deleted])
+            self._db.commit()
+
+    def _reload_if_evicted(self, thread_id: str):
+        """
+        Bring an evicted session back before writing to it. A run keeps checkpointing after its
+        session was evicted, and a checkpoint only carries the channels that changed: written to
+        an empty session, it would replace the full history once persisted.
+        """
+        with self._lock:
+            if thread_id in self._sessions or self._restore_evicted_snapshot(thread_id):
+                return
+        self._load_from_db(thread_id)
+
+    def _restore_evicted_snapshot(self, thread_id: str) -> bool:
+        """
+        Bring back a session evicted before the writer persisted it, lock held.
+
+        Returns:
+            bool: True if the session was restored from its snapshot.
+        """
+        if thread_id in self._sessions or thread_id not in self._evicted_snapshots:
+            return False
+        self._restore(thread_id, *self._evicted_snapshots.pop(thread_id))
+        self._dirty.add(thread_id)
+        return True
+
+    def _load_from_db(self, thread_id: str):
+        """
+        Load a session from SQLite if it is missing from memory or was updated by another worker.
+
+        Only the persisted version is compared while the session is up to date. The read and the
+        unpickling happen outside of the session lock, and the result is dropped if the session
+        was written in the meantime.
+        """
+        if self._db is None:
+            return
+
+        with self._lock:
+            # Not persisted yet: the state held for the writer is the latest
+            if thread_id in self._dirty:
+                return
+            snapshot = self._evicted_snapshots.get(thread_id)
+            if snapshot is not None:
+                if thread_id not in self._sessions:
+                    self._restore(thread_id, *snapshot)
+                return
+            info = self._sessions.get(thread_id)
+            known_version = info.version if info is not None else None
+
+        with self._read_lock:
+            row = self._reader.execute(
+                "SELECT version, CASE WHEN version IS ? THEN NULL ELSE data END FROM sessions "
+                "WHERE thread_id = ? AND updated_at >= ?",
+                (known_version, thread_id, time.time() - self.params.ttl_seconds),
+            ).fetchone()
+        if row is None or row[0] == known_version:
+            return
+        version, data = row
+        snapshot = pickle.loads(data)
+
+        with self._lock:
+            info = self._sessions.get(thread_id)
+            current_version = info.version if info is not None else None
+            if thread_id in self._dirty or thread_id in self._evicted_snapshots or current_version != known_version:
+                return
+            self._restore(thread_id, snapshot, version)
+
+    def _restore(self, thread_id: str, snapshot: dict, version: int):
+        """Replace the in-memory state of a session with a persisted snapshot."""
+        self._forget(thread_id)
+
+        info = self._session(thread_id)
+        info.version = version
+        self.storage[thread_id] = defaultdict(dict, {ns: dict(checkpoints) for ns, checkpoints in snapshot["storage"].items()})
+        self.writes.update({key: dict(writes) for key, writes in snapshot["writes"].items()})
+        self.blobs.update(snapshot["blobs"])
+        info.write_keys = set(snapshot["writes"])
+        info.blob_keys = set(snapshot["blobs"])
+        self._grow(info, self._payload_size(snapshot))
+
+    # ------------------- Metrics -------------------
+
+    def stats(self) -> dict:
+        """
+        Report the memory usage.
+
+        Returns:
+            dict: Live sessions, bytes held and eviction counters.
+        """
+        with self._lock:
+            stats = {
+                "live_sessions": len(self._sessions),
+                "bytes_held": self.bytes_held,
+                "max_bytes": self.params.max_bytes,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+            if self._db is not None:
+                with self._db_lock:
+                    stats["persisted_sessions"] = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+                stats["pending_writes"] = len(self._dirty) + len(self._evicted_snapshots)
+            return stats
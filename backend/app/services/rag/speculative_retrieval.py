@@ -0,0 +1,179 @@
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class SpeculativeRetrievalParams(BaseModel):
+    """
+    Configuration parameters for the SpeculativeRetriever.
+
+    Attributes:
+        enabled (bool): Search on the user message while the routing LLM call is in flight.
+        min_similarity (float): Minimum cosine similarity between the user message and the
+            query requested by the LLM to reuse the speculative results.
+        max_pending (int): Maximum number of speculative results waiting for their tool call.
+    """
+    enabled: bool = True
+    min_similarity: float = 0.9
+    max_pending: int = 256
+
+
+@dataclass
+class Speculation:
+    """A similarity search started on the user message before the LLM asked for it."""
+    question: str
+    future: Future
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase a query and collapse its whitespace and trailing punctuation."""
+    return " ".join(query.lower().split()).rstrip(" ?!.")
+
+
+class SpeculativeRetriever:
+    """
+    Bookkeeping of the speculative searches started by the routing node.
+
+    The routing node starts a search on the user message, then hands it over to the
+    retrieve tool calls the LLM produced. The tool reuses the results if it was asked
+    for the same (or a very similar) query without category, and discards them otherwise.
+    """
+
+    def __init__(self, params: Optional[SpeculativeRetrievalParams] = None):
+        """
+        Initialize an empty registry.
+
+        Args:
+            params (Optional[SpeculativeRetrievalParams]): Custom parameters.
+        """
+        if params is None:
+            params = SpeculativeRetrievalParams()
+        self.params = params
+
+        self._pending: "OrderedDict[str, Speculation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def register(self, tool_call_id: str, speculation: Speculation):
+        """
+        Hand a speculative search over to a tool call.
+
+        Args:
+            tool_call_id (str): ID of the retrieve tool call.
+            speculation (Speculation): Search started on the user message.
+        """
+        with self._lock:
+            self._pending[tool_call_id] = speculation
+            while len(self._pending) > self.params.max_pending:
+                _, dropped = self._pending.popitem(last=False)
+                dropped.future.cancel()
+
+    def discard(self, speculation: Speculation):
+        """
+        Drop a speculative search the LLM did not need.
+
+        Args:
+            speculation (Speculation): Search started on the user message.
+        """
+        speculation.future.cancel()
+        with self._lock:
+            self.discarded += 1
+
+    def claim(self, tool_call_id: str) -> Optional[Speculation]:
+        """
+        Take the speculative search handed over to a tool call.
+
+        Args:
+            tool_call_id (str): ID of the retrieve tool call.
+
+        Returns:
+            Optional[Speculation]: The search, or None if there is none.
+        """
+        with self._lock:
+            return self._pending.pop(tool_call_id, None)
+
+    def accepts(
+        self,
+        speculation: Speculation,
+        query: str,
+        category: Optional[str],
+        speculative_vector: Optional[List[float]] = None,
+        query_vector: Optional[List[float]] = None
+    ) -> bool:
+        """
+        Tell whether the speculative results answer the query requested by the LLM.
+
+        Args:
+            speculation (Speculation): Search started on the user message.
+            query (str): Query requested by the LLM.
+            category (Optional[str]): Category filter requested by the LLM.
+            speculative_vector (Optional[List[float]]): Embedding of the user message.
+            query_vector (Optional[List[float]]): Embedding of the requested query.
+
+        Returns:
+            bool: True if the results can be used.
+        """
+        accepted = category is None and (
+            normalize_query(speculation.question) == normalize_query(query)
+            or (
+                speculative_vector is not None and query_vector is not None
+                and self._cosine(speculative_vector, query_vector) >= self.params.min_similarity
+            )
+        )
+
+        with self._lock:
+            if accepted:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if not accepted:
+            speculation.future.cancel()
+        logger.debug(f"🔮 Speculative retrieval {'hit' if accepted else 'miss'} for {query!r}")
+        return accepted
+
+    def needs_vectors(self, speculation: Speculation, query: str, category: Optional[str]) -> bool:
+        """
+        Tell whether comparing embeddings is needed to decide on the speculative results.
+
+        Args:
+            speculation (Speculation): Search started on the user message.
+            query (str): Query requested by the LLM.
+            category (Optional[str]): Category filter requested by the LLM.
+
+        Returns:
+            bool: True if the queries differ but could still be similar enough.
+        """
+        return category is None and normalize_query(speculation.question) != normalize_query(query)
+
+    @staticmethod
+    def _cosine(a: List[float], b: List[float]) -> float:
+        """Cosine similarity of two vectors."""
+        a, b = np.asarray(a, dtype=np.float32), np.asarray(b, dtype=np.float32)
+        norms = np.linalg.norm(a) * np.linalg.norm(b)
+        return float(a @ b / norms) if norms else 0.0
+
+    def stats(self) -> dict:
+        """
+        Get the speculation counters.
+
+        Returns:
+            dict: Reused, rejected and discarded speculative searches, and pending ones.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "discarded": self.discarded,
+                "pending": len(self._pending),
+            }
@@ -0,0 +1,14 @@
+import hashlib
+
+
+def sha256_hex(text: str) -> str:
+    """
+    Compute the SHA-256 hex digest of a text.
+
+    Args:
+        text (str): Text to hash.
+
+    Returns:
+        str: Hexadecimal SHA-256 digest of the UTF-8 encoded text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -1,7 +1,29 @@
 import re
 from html import unescape
 
+# Markdown syntax characters replaced by a space in indexed texts. Tabs are mapped to a
+# space too, since runs of spaces and tabs collapse into one space anyway. The table
+# applies to UTF-8 bytes: ASCII bytes never occur inside multi-byte characters, and
+# bytes.translate keeps a fast path that str.translate loses on non-ASCII text.
+_TEXT_TRANSLATION = bytes.maketrans(b"*_`#>-[]()~\t", b" " * 12)
+_HTML_TAG = re.compile(r"<[^>]+>")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
 def clean_text(text: str) -> str:
+    """
+    Normalize a CMS text before indexing: unescape HTML entities, remove HTML tags and
+    markdown syntax, collapse blank lines and runs of spaces or tabs, and trim.
+
+    Steps that cannot apply are skipped, and character replacements run in a single
+    translation pass, so the text is only rescanned by a regex for tags and blank lines.
+
+    Args:
+        text (str): Raw text.
+
+    Returns:
+        str: Normalized text.
+    """
     if not text:
         return ""
 
@@ -9,18 +31,209 @@ def clean_text(text: str) -> str:
     text = unescape(text)
 
     # Remove HTML tags
-    text = re.sub(r"<[^>]+>", "", text)
+    if "<" in text:
+        text = _HTML_TAG.sub("", text)
 
-    # Remove Markdown syntax (basic)
-    text = re.sub(r"[*_`#>\-\[\]()~]", " ", text)
+    # Replace Markdown syntax (basic) and tabs with spaces
+    text = text.encode("utf-8", "surrogatepass").translate(_TEXT_TRANSLATION).decode("utf-8", "surrogatepass")
 
-    # Replace multiple newlines with one
-    text = re.sub(r"\n\s*\n+", "\n\n", text)
+    # Replace multiple newlines with one blank line
+    if "\n" in text:
+        text = _BLANK_LINES.sub("\n\n", text)
 
-    # Replace multiple spaces/tabs with one space
-    text = re.sub(r"[ \t]+", " ", text)
+    # Collapse runs of spaces, each pass halves them
+    while "  " in text:
+        text = text.replace("  ", " ")
 
     # Trim leading/trailing whitespace
-    text = text.strip()
+    return text.strip()
+
+
+# Markdown constructs removed from chatbot answers, applied in this order
+_MARKDOWN_SUBSTITUTIONS = [
+    (re.compile(r'(```.*?```)', flags=re.DOTALL), ''),  # code blocks
+    (re.compile(r'`([^`]*)`'), r'\1'),  # code inline
+    (re.compile(r'\*\*(.*?)\*\*'), r'\1'),  # bold
+    (re.compile(r'\*(.*?)\*'), r'\1'),  # italic
+    (re.compile(r'\[(.*?)\]\(.*?\)'), r'\1'),  # links
+    (re.compile(r'#+\s*(.*)'), r'\1'),  # titles
+]
+
+# Text that must be present for each substitution to match, checked before each pass:
+# most answers contain no markdown and skip every pass
+_MARKDOWN_TRIGGERS = ["```", "`", "**", "*", "](", "#"]
+
+# Characters that can start a markdown construct
+_MARKDOWN_START = re.compile(r"[`*\[#]")
+_CODE_BLOCK = _MARKDOWN_SUBSTITUTIONS[0][0]
+_INLINE_CODE = _MARKDOWN_SUBSTITUTIONS[1][0]
+_TRAILING_TITLE = re.compile(r"#+\s*$")
+
+
+def _strip_markdown(text: str) -> str:
+    """Apply the markdown substitutions without the final strip."""
+    for trigger, (pattern, replacement) in zip(_MARKDOWN_TRIGGERS, _MARKDOWN_SUBSTITUTIONS):
+        if trigger in text:
+            text = pattern.sub(replacement, text)
+    return text
+
+
+def clean_markdown(text: str) -> str:
+    """
+    Remove markdown formatting (code, bold, italic, links, titles) from a text.
+
+    Args:
+        text (str): Markdown text.
+
+    Returns:
+        str: Plain text.
+    """
+    return _strip_markdown(text).strip()
+
+
+class MarkdownStreamCleaner:
+    """
+    Incremental version of clean_markdown() for streamed text.
+
+    Text is released as soon as no markdown construct can still span it: everything
+    before the first markdown character right away, and held constructs once their
+    line is complete and closed. The concatenation of all released pieces equals
+    clean_markdown() of the full text.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pending_whitespace = ""
+        self._started = False
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk of streamed text.
+
+        Args:
+            chunk (str): New text.
+
+        Returns:
+            str: Cleaned text that can be released, possibly empty.
+        """
+        self._buffer += chunk
+        cut = self._safe_cut(self._buffer)
+        if cut == 0:
+            return ""
+
+        ready, self._buffer = self._buffer[:cut], self._buffer[cut:]
+        return self._release(_strip_markdown(ready))
+
+    def flush(self) -> str:
+        """
+        Release the remaining text at the end of the stream.
+
+        Returns:
+            str: Cleaned remaining text.
+        """
+        ready, self._buffer = self._buffer, ""
+        text = self._release(_strip_markdown(ready))
+        self._pending_whitespace = ""
+        return text
+
+    def _release(self, text: str) -> str:
+        """
+        Apply the leading/trailing strip of clean_markdown() across released pieces:
+        trailing whitespace is held back until more text follows it.
+        """
+        text = self._pending_whitespace + text
+        if not self._started:
+            text = text.lstrip()
+
+        released = text.rstrip()
+        self._pending_whitespace = text[len(released):]
+        if released:
+            self._started = True
+        return released
+
+    @staticmethod
+    def _safe_cut(buffer: str) -> int:
+        """
+        Find the longest prefix of the buffer that can be cleaned independently of what follows.
+
+        Args:
+            buffer (str): Text not released yet.
+
+        Returns:
+            int: Length of the prefix that can be released.
+        """
+        first_special = _MARKDOWN_START.search(buffer)
+        if first_special is None:
+            return len(buffer)
+
+        # Apart from code and titles, constructs never span lines: cut after the last
+        # line where every code span is closed and no title marker waits for its text
+        start = first_special.start()
+        newline = buffer.rfind("\n", start)
+        while newline != -1:
+            if MarkdownStreamCleaner._is_closed(buffer[start:newline + 1]):
+                start = newline + 1
+                break
+            newline = buffer.rfind("\n", start, newline)
+
+        # Inside the last line, cut before the last space preceded only by closed
+        # bold and link constructs
+        line = buffer[start:]
+        if "\n" in line:
+            return start
+
+        space = max(line.rfind(" "), line.rfind("\t"))
+        while space > 0:
+            if MarkdownStreamCleaner._is_closed_inline(line[:space]):
+                return start + space
+            space = max(line.rfind(" ", 0, space), line.rfind("\t", 0, space))
+
+        return start
+
+    @staticmethod
+    def _is_closed(segment: str) -> bool:
+        """
+        Check that no markdown construct of a line-terminated segment can continue after it.
+
+        Args:
+            segment (str): Text ending with a newline.
+
+        Returns:
+            bool: True if the segment can be cleaned on its own.
+        """
+        text = _CODE_BLOCK.sub("", segment)
+        if "```" in text:
+            return False
+
+        text = _INLINE_CODE.sub(r"\1", text)
+        if "`" in text:
+            return False
+
+        # A title marker left at the end of the line would swallow the following lines' whitespace
+        for pattern, replacement in _MARKDOWN_SUBSTITUTIONS[2:-1]:
+            text = pattern.sub(replacement, text)
+        return not _TRAILING_TITLE.search(text)
+
+    @staticmethod
+    def _is_closed_inline(segment: str) -> bool:
+        """
+        Check that a segment of a line can be cleaned independently of the rest of the line.
+
+        Every `*` must belong to a closed bold pair and every `[` to a closed link, so that
+        the italic pass cannot pair a `*` of the segment with one that comes later.
+
+        Args:
+            segment (str): Text without newline.
+
+        Returns:
+            bool: True if the segment can be cleaned on its own.
+        """
+        if "`" in segment or "#" in segment:
+            return False
+
+        text = _MARKDOWN_SUBSTITUTIONS[2][0].sub(_MARKDOWN_SUBSTITUTIONS[2][1], segment)
+        if "*" in text:
+            return False
 
-    return text
\ No newline at end of file
+        text = _MARKDOWN_SUBSTITUTIONS[4][0].sub(_MARKDOWN_SUBSTITUTIONS[4][1], text)
+        return "[" not in text
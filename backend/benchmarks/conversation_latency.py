@@ -0,0 +1,98 @@
+"""
+Measure chatbot turn latency with inline and background conversation summarization.
+
+A scripted conversation is replayed twice against the configured LLM and vector store:
+once summarizing before generating the answer, once summarizing in the background after
+the answer is returned. The summarization budget is lowered so that summaries actually
+trigger within the script.
+
+Usage (from the backend directory):
+    uv run -m benchmarks.conversation_latency
+    uv run -m benchmarks.conversation_latency --turns 12 --budget 400
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from typing import List
+
+import numpy as np
+
+from app.services.rag.answer_cache import SemanticAnswerCacheParams
+from app.services.rag.components import ai_information, chat_model, embedding_store
+from app.services.rag.conversation_summarizer import ConversationSummaryParams
+from app.services.rag.rag_pipeline import RAGPipeline
+
+QUESTIONS = [
+    "Quels sont tes projets ?",
+    "Parle-moi de ton expérience professionnelle.",
+    "Quelles technologies utilises-tu le plus ?",
+    "Quelle formation as-tu suivie ?",
+    "Quel projet t'a le plus appris ?",
+    "As-tu déjà travaillé en équipe sur un gros projet ?",
+    "Quels langages de programmation maîtrises-tu ?",
+    "Que fais-tu en dehors du développement ?",
+]
+
+
+async def run_conversation(pipeline: RAGPipeline, turns: int) -> List[float]:
+    """
+    Replay the scripted conversation in a new session.
+
+    Args:
+        pipeline (RAGPipeline): Pipeline to query.
+        turns (int): Number of questions asked.
+
+    Returns:
+        List[float]: Latency of each turn, in milliseconds.
+    """
+    session_id = f"benchmark-{uuid.uuid4().hex}"
+    latencies = []
+    for i in range(turns):
+        start = time.perf_counter()
+        await pipeline.aexecute(QUESTIONS[i % len(QUESTIONS)], session_id)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=8, help="Number of questions in the conversation.")
+    parser.add_argument("--budget", type=int, default=600, help="History tokens that trigger a summarization.")
+    args = parser.parse_args()
+
+    vector_store, llm, information = embedding_store.get(), chat_model.get(), ai_information.get()
+
+    header = f"{'summarization':<15} {'turn p50':>10} {'turn p95':>10} {'turn max':>10} {'summaries':>10}"
+    print(header)
+    print("-" * len(header))
+    for background in (False, True):
+        pipeline = RAGPipeline(
+            vector_store=vector_store,
+            llm=llm,
+            ai_information=information,
+            # Every question must reach the LLM
+            answer_cache_params=SemanticAnswerCacheParams(similarity_threshold=2.0),
+            summary_params=ConversationSummaryParams(
+                background=background,
+                max_tokens_before_summary=args.budget,
+                max_tokens=args.budget * 3 // 4,
+                max_summary_tokens=args.budget // 4
+            )
+        )
+        latencies = await run_conversation(pipeline, args.turns)
+
+        # Let the last background summary finish before reading the counters
+        while pipeline.summarizer.stats()["running"]:
+            await asyncio.sleep(0.1)
+
+        print(
+            f"{'background' if background else 'inline':<15} {statistics.median(latencies):>8.0f}ms "
+            f"{float(np.percentile(latencies, 95)):>8.0f}ms {max(latencies):>8.0f}ms "
+            f"{pipeline.summarizer.stats()['summaries']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
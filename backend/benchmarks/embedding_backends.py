@@ -0,0 +1,157 @@
+"""
+Compare embedding backends on the portfolio's own CMS corpus.
+
+Each backend runs in a fresh process, so cold start and memory are measured from scratch.
+The first backend is the reference: the others report how much their top-k results
+drift from it.
+
+Usage (from the backend directory):
+    uv run -m benchmarks.embedding_backends
+    uv run -m benchmarks.embedding_backends --backends torch onnx onnx:onnx/model_qint8_avx2.onnx --k 5
+"""
+import argparse
+import multiprocessing
+import resource
+import statistics
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from app.services.rag.cms_service import cms
+from app.services.rag.embedding_document_store import EmbeddingDocumentStoreParams
+from app.utils.text_cleaner import clean_text
+
+
+def parse_backend(spec: str) -> Tuple[str, Optional[str]]:
+    """
+    Parse a backend given as "backend" or "backend:model_file".
+
+    Args:
+        spec (str): Backend specification.
+
+    Returns:
+        Tuple[str, Optional[str]]: Backend name and model file.
+    """
+    backend, _, model_file = spec.partition(":")
+    return backend, model_file or None
+
+
+def load_corpus(params: EmbeddingDocumentStoreParams, max_queries: int) -> Tuple[List[str], List[str]]:
+    """
+    Fetch the CMS documents and split them like the indexing does.
+
+    Args:
+        params (EmbeddingDocumentStoreParams): Store parameters giving the chunking settings.
+        max_queries (int): Maximum number of queries.
+
+    Returns:
+        Tuple[List[str], List[str]]: Chunk texts, and queries built from the document titles.
+    """
+    splitter = RecursiveCharacterTextSplitter(chunk_size=params.chunk_size, chunk_overlap=params.chunk_overlap)
+    documents = cms.fetch_all()
+
+    chunks = [chunk for doc in documents for chunk in splitter.split_text(clean_text(doc.text))]
+    queries = list(dict.fromkeys(doc.title for doc in documents if doc.title))[:max_queries]
+    return chunks, queries
+
+
+def run_backend(model_name: str, backend: str, model_file: Optional[str], chunks: List[str], queries: List[str], queue):
+    """
+    Load a backend and embed the corpus, in a child process. Results are put on the queue.
+    """
+    start = time.perf_counter()
+    from sentence_transformers import SentenceTransformer
+
+    kwargs = {}
+    if backend != "torch":
+        kwargs["backend"] = backend
+        if model_file:
+            kwargs["model_kwargs"] = {"file_name": model_file}
+    model = SentenceTransformer(model_name, **kwargs)
+    model.encode("warmup")
+    cold_start = time.perf_counter() - start
+
+    start = time.perf_counter()
+    doc_vectors = model.encode(chunks, batch_size=32)
+    docs_per_second = len(chunks) / (time.perf_counter() - start)
+
+    latencies, query_vectors = [], []
+    for query in queries:
+        start = time.perf_counter()
+        query_vectors.append(model.encode(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    queue.put({
+        "cold_start_s": cold_start,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "docs_per_s": docs_per_second,
+        "query_p50_ms": statistics.median(latencies),
+        "query_p95_ms": float(np.percentile(latencies, 95)),
+        "doc_vectors": np.asarray(doc_vectors, dtype=np.float32),
+        "query_vectors": np.asarray(query_vectors, dtype=np.float32),
+    })
+
+
+def top_k(doc_vectors: np.ndarray, query_vectors: np.ndarray, k: int) -> np.ndarray:
+    """
+    Rank the chunks of each query by cosine similarity.
+
+    Returns:
+        np.ndarray: Indices of the k best chunks of each query.
+    """
+    docs = doc_vectors / np.linalg.norm(doc_vectors, axis=1, keepdims=True)
+    queries = query_vectors / np.linalg.norm(query_vectors, axis=1, keepdims=True)
+    return np.argsort(-(queries @ docs.T), axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx:onnx/model_qint8_avx2.onnx"],
+                        help='Backends to compare, as "backend" or "backend:model_file". The first one is the reference.')
+    parser.add_argument("--k", type=int, default=10, help="Number of retrieved chunks compared for recall.")
+    parser.add_argument("--max-queries", type=int, default=100, help="Maximum number of queries.")
+    args = parser.parse_args()
+
+    params = EmbeddingDocumentStoreParams()
+    chunks, queries = load_corpus(params, args.max_queries)
+    print(f"Corpus: {len(chunks)} chunks, {len(queries)} queries, model '{params.embedding_model}'\n")
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for spec in args.backends:
+        backend, model_file = parse_backend(spec)
+        queue = context.Queue()
+        process = context.Process(
+            target=run_backend,
+            args=(params.embedding_model, backend, model_file, chunks, queries, queue)
+        )
+        process.start()
+        results[spec] = queue.get()
+        process.join()
+
+    reference = results[args.backends[0]]
+    reference_top = top_k(reference["doc_vectors"], reference["query_vectors"], args.k)
+
+    header = f"{'backend':<40} {'cold start':>10} {'RSS':>9} {'docs/s':>8} {'q p50':>8} {'q p95':>8} {f'recall@{args.k}':>10} {'cos sim':>8}"
+    print(header)
+    print("-" * len(header))
+    for spec, result in results.items():
+        candidate_top = top_k(result["doc_vectors"], result["query_vectors"], args.k)
+        recall = np.mean([
+            len(set(ref) & set(cand)) / len(ref) for ref, cand in zip(reference_top, candidate_top)
+        ])
+        similarity = np.mean(np.sum(
+            (reference["doc_vectors"] / np.linalg.norm(reference["doc_vectors"], axis=1, keepdims=True))
+            * (result["doc_vectors"] / np.linalg.norm(result["doc_vectors"], axis=1, keepdims=True)),
+            axis=1
+        ))
+        print(
+            f"{spec:<40} {result['cold_start_s']:>9.2f}s {result['rss_mb']:>6.0f} MB {result['docs_per_s']:>8.1f} "
+            f"{result['query_p50_ms']:>6.1f}ms {result['query_p95_ms']:>6.1f}ms {recall:>10.3f} {similarity:>8.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
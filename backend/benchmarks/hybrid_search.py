@@ -0,0 +1,98 @@
+"""
+Compare the latency of dense and hybrid retrieval on the configured vector store.
+
+Queries are built from the CMS document titles, plus the chatbot's usual questions. Each
+query is embedded once before timing (the store's query cache then serves it), so both modes
+are measured on retrieval only: the vector search, and for hybrid the BM25 search, the fusion
+and the scoring of keyword-only hits. The last columns count the keyword-only hits scored
+from local vectors and the ones left unscored.
+
+Usage (from the backend directory):
+    uv run -m benchmarks.hybrid_search
+    uv run -m benchmarks.hybrid_search --k 10 --repeat 20
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from app.services.rag.cms_service import cms
+from app.services.rag.components import embedding_store
+
+QUESTIONS = [
+    "Quels sont tes projets ?",
+    "Parle-moi de ton expérience professionnelle.",
+    "Quelles technologies utilises-tu le plus ?",
+    "Quelle formation as-tu suivie ?",
+    "As-tu déjà utilisé FastAPI et Docker ?",
+    "Que fais-tu en dehors du développement ?",
+]
+
+
+def latencies(search: Callable[[str], object], queries: List[str], repeat: int) -> List[float]:
+    """
+    Time a search function over the queries.
+
+    Args:
+        search (Callable[[str], object]): Search run on each query.
+        queries (List[str]): Queries.
+        repeat (int): Number of passes over the queries.
+
+    Returns:
+        List[float]: Latency of each search, in milliseconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        for query in queries:
+            start = time.perf_counter()
+            search(query)
+            timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--k", type=int, default=10, help="Number of retrieved chunks.")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of passes over the queries.")
+    parser.add_argument("--max-queries", type=int, default=100, help="Maximum number of queries.")
+    args = parser.parse_args()
+
+    store = embedding_store.get()
+    titles = [doc.title for doc in cms.fetch_all() if doc.title]
+    queries = list(dict.fromkeys(QUESTIONS + titles))[:args.max_queries]
+    for query in queries:
+        store.embed_query(query)
+
+    scored = unscored = 0
+    for query in queries:
+        documents, distances = store.hybrid_search(query, args.k)
+        dense_ids = {
+            store._document_chunk_id(doc)
+            for doc, _ in store._dense_search(store.embed_query(query), max(args.k, store.params.hybrid_candidates))
+        }
+        for doc, distance in zip(documents, distances):
+            if store._document_chunk_id(doc) not in dense_ids:
+                scored += distance is not None
+                unscored += distance is None
+
+    modes = {
+        "dense": lambda query: store.similarity_search_by_vector(store.embed_query(query), args.k),
+        "hybrid": lambda query: store.hybrid_search(query, args.k),
+    }
+    print(f"{len(queries)} queries, k={args.k}, {args.repeat} passes, '{store.params.vector_backend}' backend\n")
+    header = f"{'mode':<8} {'p50':>9} {'p95':>9} {'max':>9} {'keyword hits scored':>20} {'unscored':>9}"
+    print(header)
+    print("-" * len(header))
+    for mode, search in modes.items():
+        timings = latencies(search, queries, args.repeat)
+        counts = f" {scored:>20} {unscored:>9}" if mode == "hybrid" else ""
+        print(
+            f"{mode:<8} {statistics.median(timings):>7.2f}ms {float(np.percentile(timings, 95)):>7.2f}ms "
+            f"{max(timings):>7.2f}ms{counts}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Measure the prompt construction overhead of a chatbot turn.
+
+A turn builds the routing prompt, binds the retrieval tool to the chat model and builds
+the generation prompt. The "per-call" variant rebuilds the templates and the tool binding
+on every turn, as the pipeline used to; the "precompiled" variant uses the templates
+compiled at import and the system messages and tool binding built once per persona.
+No request is sent to the LLM.
+
+Usage (from the backend directory):
+    uv run -m benchmarks.prompt_construction
+    uv run -m benchmarks.prompt_construction --history 20 --turns 2000
+"""
+import argparse
+import statistics
+import time
+from typing import Callable, List
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.tools import StructuredTool
+from langchain_mistralai import ChatMistralAI
+
+from app.services.rag.rag_pipeline import RETRIEVE_TOOL_DESCRIPTION, RetrieveState
+from app.services.rag.rag_prompts import (
+    CONTEXT_TEMPLATE,
+    WITH_CONTEXT_SYSTEM_TEMPLATE,
+    WITHOUT_CONTEXT_SYSTEM_TEMPLATE,
+    build_prompt_with_context,
+    build_prompt_without_context,
+)
+
+NAME = "Paul"
+CONTEXT = "[Projets - Portfolio]\nUn portfolio avec un chatbot RAG en FastAPI et LangGraph.\n\n" * 4
+
+
+def retrieve(state: RetrieveState):
+    """Stand-in for the pipeline's retrieve tool, with the same arguments schema."""
+    return "", []
+
+
+def per_call_turn(llm, tool, historic: List):
+    """Build a turn's prompts the way the pipeline did before precompilation."""
+    routing_template = ChatPromptTemplate.from_messages(WITHOUT_CONTEXT_SYSTEM_TEMPLATE.messages)
+    routing_prompt = [SystemMessage(routing_template.invoke({"name": NAME}).to_string())] + historic
+    llm.bind_tools([tool])
+
+    generation_template = ChatPromptTemplate.from_messages([
+        *WITH_CONTEXT_SYSTEM_TEMPLATE.messages,
+        ("human", CONTEXT_TEMPLATE),
+    ])
+    generation_prompt = [SystemMessage(generation_template.invoke({"name": NAME, "context": CONTEXT}).to_string())] + historic
+    return routing_prompt, generation_prompt
+
+
+def precompiled_turn(historic: List):
+    """Build a turn's prompts with the precompiled templates. The pipeline binds the tool once, at startup."""
+    routing_prompt = build_prompt_without_context(historic, NAME)
+    generation_prompt = build_prompt_with_context(historic, NAME, CONTEXT)
+    return routing_prompt, generation_prompt
+
+
+def measure(turn: Callable[[], object], turns: int) -> List[float]:
+    """
+    Time a turn function.
+
+    Returns:
+        List[float]: Duration of each turn, in microseconds.
+    """
+    durations = []
+    for _ in range(turns):
+        start = time.perf_counter()
+        turn()
+        durations.append((time.perf_counter() - start) * 1_000_000)
+    return durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--history", type=int, default=10, help="Number of messages already in the conversation.")
+    parser.add_argument("--turns", type=int, default=1000, help="Number of turns measured.")
+    args = parser.parse_args()
+
+    # No request is sent, so any API key works
+    llm = ChatMistralAI(model="mistral-small-latest", api_key="benchmark")
+    tool = StructuredTool.from_function(
+        func=retrieve,
+        name="retrieve",
+        description=RETRIEVE_TOOL_DESCRIPTION,
+        response_format="content_and_artifact"
+    )
+
+    historic = [
+        HumanMessage(f"Question {i}") if i % 2 == 0 else AIMessage(f"Réponse {i}")
+        for i in range(args.history)
+    ] + [HumanMessage("Quels sont tes projets ?")]
+
+    variants = {
+        "per-call": lambda: per_call_turn(llm, tool, historic),
+        "precompiled": lambda: precompiled_turn(historic),
+    }
+
+    header = f"{'variant':<12} {'p50':>10} {'p95':>10} {'mean':>10}"
+    print(f"History: {len(historic)} messages, {args.turns} turns\n")
+    print(header)
+    print("-" * len(header))
+    for name, turn in variants.items():
+        measure(turn, min(100, args.turns))  # warmup
+        durations = sorted(measure(turn, args.turns))
+        print(
+            f"{name:<12} {statistics.median(durations):>8.1f}us "
+            f"{durations[int(len(durations) * 0.95) - 1]:>8.1f}us {statistics.mean(durations):>8.1f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Measure the throughput of the text normalization on the portfolio's CMS export.
+
+`clean_text` (run on every document before indexing) and `clean_markdown` (run on every
+chatbot answer, also streamed through MarkdownStreamCleaner) are compared with the
+implementations they replaced, run as one `re.sub` per step. Every output is checked
+against the reference, so the benchmark fails if the normalization changed.
+
+The corpus is fetched from the CMS, or read from a JSON export (a list of texts, or of
+documents with a "text" field) written by --save.
+
+Usage (from the backend directory):
+    uv run -m benchmarks.text_normalization
+    uv run -m benchmarks.text_normalization --save .cache/cms_export.json
+    uv run -m benchmarks.text_normalization --export .cache/cms_export.json --repeat 20 --stream-chunk 8
+"""
+import argparse
+import json
+import re
+import time
+from html import unescape
+from typing import Callable, List
+
+from app.utils.text_cleaner import MarkdownStreamCleaner, clean_markdown, clean_text
+
+
+def reference_clean_text(text: str) -> str:
+    """clean_text as it was before precompilation."""
+    if not text:
+        return ""
+    text = unescape(text)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = re.sub(r"[*_`#>\-\[\]()~]", " ", text)
+    text = re.sub(r"\n\s*\n+", "\n\n", text)
+    text = re.sub(r"[ \t]+", " ", text)
+    return text.strip()
+
+
+def reference_clean_markdown(text: str) -> str:
+    """clean_markdown as it was before the passes were skipped when they cannot match."""
+    text = re.sub(r'(```.*?```)', '', text, flags=re.DOTALL)
+    text = re.sub(r'`([^`]*)`', r'\1', text)
+    text = re.sub(r'\*\*(.*?)\*\*', r'\1', text)
+    text = re.sub(r'\*(.*?)\*', r'\1', text)
+    text = re.sub(r'\[(.*?)\]\(.*?\)', r'\1', text)
+    text = re.sub(r'#+\s*(.*)', r'\1', text)
+    return text.strip()
+
+
+def stream_clean_markdown(text: str, chunk_size: int) -> str:
+    """Clean a text fed to MarkdownStreamCleaner in chunks, like a streamed answer."""
+    cleaner = MarkdownStreamCleaner()
+    pieces = [cleaner.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size)]
+    pieces.append(cleaner.flush())
+    return "".join(pieces)
+
+
+def load_corpus(export: str = None) -> List[str]:
+    """
+    Read the texts of a CMS export, or fetch them from the CMS.
+
+    Args:
+        export (str, optional): JSON export path.
+
+    Returns:
+        List[str]: Raw document texts.
+    """
+    if export:
+        with open(export, encoding="utf-8") as f:
+            items = json.load(f)
+        return [item["text"] if isinstance(item, dict) else item for item in items]
+
+    from app.services.rag.cms_service import cms
+    return [doc.text for doc in cms.fetch_all()]
+
+
+def throughput(function: Callable[[str], str], texts: List[str], repeat: int) -> float:
+    """
+    Time a normalization function over the corpus.
+
+    Returns:
+        float: Throughput in MB/s of UTF-8 input.
+    """
+    size = sum(len(text.encode("utf-8")) for text in texts) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            function(text)
+    return size / (time.perf_counter() - start) / 1_000_000
+
+
+def check(function: Callable[[str], str], reference: Callable[[str], str], texts: List[str], name: str):
+    """Fail if a function does not give the reference output on every text."""
+    for i, text in enumerate(texts):
+        if function(text) != reference(text):
+            raise SystemExit(f"{name} differs from the reference on text {i}: {text[:80]!r}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--export", help="JSON export of the CMS texts, fetched from the CMS when omitted.")
+    parser.add_argument("--save", help="Write the corpus as a JSON export, for reproducible runs.")
+    parser.add_argument("--repeat", type=int, default=10, help="Number of passes over the corpus.")
+    parser.add_argument("--stream-chunk", type=int, default=4, help="Characters per streamed chunk.")
+    args = parser.parse_args()
+
+    texts = load_corpus(args.export)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(texts, f, ensure_ascii=False)
+
+    streamed = lambda text: stream_clean_markdown(text, args.stream_chunk)
+    variants = [
+        ("clean_text", reference_clean_text, clean_text),
+        ("clean_markdown", reference_clean_markdown, clean_markdown),
+        ("clean_markdown (stream)", None, streamed),
+    ]
+
+    size = sum(len(text.encode("utf-8")) for text in texts) / 1_000_000
+    print(f"Corpus: {len(texts)} texts, {size:.2f} MB, {args.repeat} passes\n")
+    header = f"{'function':<24} {'reference':>12} {'current':>12} {'speedup':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, reference, function in variants:
+        check(function, reference or reference_clean_markdown, texts, name)
+        current = throughput(function, texts, args.repeat)
+        if reference is None:
+            print(f"{name:<24} {'':>12} {current:>7.1f} MB/s {'':>8}")
+            continue
+        before = throughput(reference, texts, args.repeat)
+        print(f"{name:<24} {before:>7.1f} MB/s {current:>7.1f} MB/s {current / before:>7.1f}x")
+    print("\nOutputs identical to the reference on every text.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Shared fixtures.
+
+Settings are filled with test values before the app modules are imported, and the embedding
+model is replaced by a deterministic bag-of-words embedding, so the tests need neither a model
+download nor a Chroma server or a CMS.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import List
+
+import numpy as np
+import pytest
+from langchain_core.embeddings import Embeddings
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+for name, value in {
+    "ADMIN_PASSWORD": "admin-password",
+    "MISTRAL_MODEL_NAME": "mistral-test",
+    "MISTRAL_API_KEY": "test",
+    "CHROMA_API_URL": "localhost",
+    "CMS_API_URL": "http://cms.test",
+    "CMS_API_KEY": "test",
+    "CMS_WEBHOOK_SECRET": "webhook-secret",
+    "EMAIL_HOST": "localhost",
+    "EMAIL_PORT": "25",
+    "EMAIL_USER": "test",
+    "EMAIL_PASSWORD": "test",
+    "EMAIL_RECIPIENT": "test@example.com",
+    "LANGSMITH_TRACING": "false",
+}.items():
+    os.environ.setdefault(name, value)
+
+from app.services.rag.keyword_index import french_tokenize  # noqa: E402
+
+
+class FakeEmbeddings(Embeddings):
+    """Normalized hashed bag of words: texts sharing terms get similar vectors."""
+
+    dimensions = 64
+
+    def __init__(self):
+        self.calls = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for term in french_tokenize(text) or [text]:
+            vector[int(hashlib.sha256(term.encode()).hexdigest(), 16) % self.dimensions] += 1.0
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        return self._embed(text)
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Scripted chat model: with the retrieve tool bound it asks for a search, except for greetings,
+    and it otherwise answers `answer`. Prompts are recorded in `prompts`. Streams the answer three characters at a time. Every call
+    waits `delay` seconds, asynchronously in the async methods.
+    """
+
+    answer: str = "Je suis **Paul**, développeur."
+    greeting: str = "Bonjour !"
+    delay: float = 0.0
+    calls: int = 0
+    prompts: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools_bound=True)
+
+    def _reply(self, messages, tools_bound: bool = False, **kwargs) -> AIMessage:
+        self.calls += 1
+        self.prompts.append(messages)
+        question = messages[-1].content
+        if tools_bound and "bonjour" in question.lower():
+            return AIMessage(content=self.greeting)
+        if tools_bound:
+            return AIMessage(content="", tool_calls=[
+                {"name": "retrieve", "args": {"state": {"question": question}}, "id": f"call_{self.calls}"}
+            ])
+        return AIMessage(content=self.answer)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        time.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages, **kwargs))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        return ChatResult(generations=[ChatGeneration(message=self._reply(messages, **kwargs))])
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        await asyncio.sleep(self.delay)
+        message = self._reply(messages, **kwargs)
+        if message.tool_calls:
+            call = message.tool_calls[0]
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {"name": call["name"], "args": json.dumps(call["args"]), "id": call["id"], "index": 0}
+            ]))
+            return
+        for start in range(0, len(message.content), 3):
+            token = message.content[start:start + 3]
+            if run_manager:
+                await run_manager.on_llm_new_token(token)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+@pytest.fixture
+def make_store(tmp_path, monkeypatch):
+    """
+    Build EmbeddingDocumentStore instances on an in-process numpy index in a temporary directory.
+    Each call returns a new instance, like another worker process opening the same files.
+    """
+    from app.services.rag import embedding_document_store as module
+
+    monkeypatch.setattr(module, "HuggingFaceEmbeddings", lambda **kwargs: FakeEmbeddings())
+
+    def make(**params):
+        module.EmbeddingDocumentStore._instance = None
+        params = {
+            "vector_backend": "numpy",
+            "numpy_index_path": str(tmp_path / "vector_index"),
+            "embedding_cache_path": None,
+            "refresh_check_seconds": 0,
+            **params,
+        }
+        return module.EmbeddingDocumentStore(module.EmbeddingDocumentStoreParams(**params))
+
+    yield make
+    module.EmbeddingDocumentStore._instance = None
+
+
+@pytest.fixture
+def make_pipeline(make_store):
+    """Build a RAGPipeline on a temporary store and the scripted chat model."""
+    from app.services.rag.rag_pipeline import RAGPipeline
+
+    def make(store=None, llm=None, **params):
+        return RAGPipeline(
+            vector_store=store or make_store(),
+            llm=llm or FakeChatModel(),
+            ai_information={"name": "Paul"},
+            **params
+        )
+
+    return make
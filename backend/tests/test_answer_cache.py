@@ -0,0 +1,52 @@
+from datetime import datetime
+
+from app.models.document_model import DocumentModel
+from app.services.rag.answer_cache import SemanticAnswerCache, SemanticAnswerCacheParams
+
+
+def test_similar_question_hits_and_different_one_misses():
+    cache = SemanticAnswerCache(SemanticAnswerCacheParams(similarity_threshold=0.9))
+    cache.store("Quels sont tes projets ?", [1.0, 0.0, 0.0], "Un portfolio.", index_version=0)
+
+    assert cache.lookup([0.99, 0.05, 0.0], index_version=0) == "Un portfolio."
+    assert cache.lookup([0.0, 1.0, 0.0], index_version=0) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_index_change_drops_every_answer():
+    cache = SemanticAnswerCache()
+    cache.store("Quels sont tes projets ?", [1.0, 0.0], "Un portfolio.", index_version=0)
+
+    assert cache.lookup([1.0, 0.0], index_version=1) is None
+    assert cache.lookup([1.0, 0.0], index_version=0) is None
+
+
+def test_answer_built_before_a_reindex_is_not_stored():
+    cache = SemanticAnswerCache()
+    cache.lookup([1.0, 0.0], index_version=2)
+    cache.store("Quels sont tes projets ?", [1.0, 0.0], "Ancienne réponse.", index_version=1)
+
+    assert cache.lookup([1.0, 0.0], index_version=2) is None
+
+
+def test_expired_and_overflowing_answers_are_dropped():
+    cache = SemanticAnswerCache(SemanticAnswerCacheParams(max_entries=1, ttl_seconds=3600))
+    cache.store("a", [1.0, 0.0], "A", index_version=0)
+    cache.store("b", [0.0, 1.0], "B", index_version=0)
+    assert cache.lookup([1.0, 0.0], index_version=0) is None
+    assert cache.lookup([0.0, 1.0], index_version=0) == "B"
+
+    cache.params.ttl_seconds = 0
+    assert cache.lookup([0.0, 1.0], index_version=0) is None
+
+
+def test_index_version_follows_a_reindex_made_by_another_worker(make_store):
+    serving = make_store()
+    reindexing = make_store()
+    version = serving.current_index_version()
+
+    reindexing.sync_documents([
+        DocumentModel(id="1", title="Projet", text="Un chatbot RAG", category="Projets", updated_at=datetime(2025, 1, 1))
+    ])
+
+    assert serving.current_index_version() > version
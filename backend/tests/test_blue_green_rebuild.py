@@ -0,0 +1,124 @@
+import os
+import threading
+
+import pytest
+
+from app.models.document_model import DocumentModel
+
+DOCUMENTS = [
+    DocumentModel(id=str(i), title=f"Projet {i}", text=f"Projet {i} en Python avec FastAPI.", category="Projets",
+                  updated_at=None)
+    for i in range(6)
+]
+
+
+@pytest.fixture
+def store(make_store):
+    store = make_store(retired_grace_seconds=0)
+    store.sync_documents(DOCUMENTS)
+    return store
+
+
+def collections(store) -> set:
+    """Physical collections left on disk."""
+    path = store.params.numpy_index_path
+    return {name for name in os.listdir(path) if os.path.isdir(os.path.join(path, name))}
+
+
+def test_rebuild_swaps_the_live_collection_and_keeps_the_previous_one(store):
+    former = store.live_collection
+
+    report = store.rebuild_collection(DOCUMENTS)
+
+    alias = store._read_alias()
+    assert report.added == len(DOCUMENTS)
+    assert alias["live"] == store.live_collection != former
+    assert alias["previous"] == former
+    documents, _ = store.similarity_search("Projet 3 Python", k=1)
+    assert documents[0].metadata["title"] == "Projet 3"
+
+
+def test_other_processes_follow_the_swap(store, make_store):
+    other = make_store(retired_grace_seconds=0)
+
+    store.rebuild_collection(DOCUMENTS)
+    other.similarity_search("Projet", k=1)
+
+    assert other.live_collection == store.live_collection
+
+
+def test_searches_keep_answering_during_a_rebuild(store):
+    stop = threading.Event()
+    empty_results = []
+
+    def search():
+        while not stop.is_set():
+            documents, _ = store.similarity_search("Projet 3 Python", k=2)
+            empty_results.append(not documents)
+
+    searcher = threading.Thread(target=search)
+    searcher.start()
+    try:
+        store.rebuild_collection(DOCUMENTS)
+    finally:
+        stop.set()
+        searcher.join()
+
+    assert empty_results and not any(empty_results)
+
+
+def test_too_small_rebuild_is_rejected_and_dropped(store):
+    live = store._read_alias()
+    before = collections(store)
+
+    with pytest.raises(ValueError, match="less than"):
+        store.rebuild_collection(DOCUMENTS[:2])
+
+    assert store._read_alias() == live
+    assert collections(store) == before
+    assert len(store.similarity_search("Projet", k=10)[0]) == len(DOCUMENTS)
+
+
+def test_rebuild_is_refused_while_another_one_runs(store):
+    with store._swap_lock:
+        with pytest.raises(RuntimeError):
+            store.rebuild_collection(DOCUMENTS)
+        with pytest.raises(RuntimeError):
+            store.rollback_collection()
+
+
+def test_rollback_serves_the_previous_collection_again(store):
+    with pytest.raises(ValueError):
+        store.rollback_collection()
+
+    former = store.live_collection
+    store.rebuild_collection(DOCUMENTS)
+    rebuilt = store.live_collection
+
+    assert store.rollback_collection() == former
+    assert store.live_collection == former
+    assert store._read_alias()["previous"] == rebuilt
+    assert len(store.similarity_search("Projet", k=10)[0]) == len(DOCUMENTS)
+
+
+def test_collections_older_than_the_previous_one_are_dropped(store):
+    original = store.live_collection
+    for _ in range(3):
+        store.rebuild_collection(DOCUMENTS)
+
+    alias = store._read_alias()
+    # Each rebuild retires the collection kept for rollback, dropped at once with a zero grace period
+    assert alias["retired"] == {}
+    assert collections(store) == {alias["live"], alias["previous"]}
+    assert original not in collections(store)
+
+
+def test_retired_collections_wait_for_their_grace_period(make_store):
+    store = make_store(retired_grace_seconds=3600)
+    store.sync_documents(DOCUMENTS)
+    original = store.live_collection
+    store.rebuild_collection(DOCUMENTS)
+    store.rebuild_collection(DOCUMENTS)
+
+    assert set(store._read_alias()["retired"]) == {original}
+    assert original in collections(store)
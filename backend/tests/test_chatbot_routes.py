@@ -0,0 +1,81 @@
+import json
+import uuid
+from typing import List, Tuple
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes_chatbot
+from app.services.rag.intent_router import IntentRouterParams
+
+
+class ReadyComponent:
+    """Stand-in for a LazyComponent that finished loading."""
+
+    ready = True
+
+    def __init__(self, instance):
+        self.instance = instance
+
+    def get(self):
+        return self.instance
+
+    async def aget(self):
+        return self.instance
+
+
+@pytest.fixture
+def pipeline(make_pipeline, monkeypatch):
+    pipeline = make_pipeline(intent_router_params=IntentRouterParams(enabled=False))
+    monkeypatch.setattr(routes_chatbot, "rag_pipeline", ReadyComponent(pipeline))
+    return pipeline
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(routes_chatbot.router)
+    return TestClient(app)
+
+
+def events(body: str) -> List[Tuple[str, dict]]:
+    """Parse a server-sent events body into (event, data) pairs."""
+    parsed = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        parsed.append((fields["event"], json.loads(fields["data"])))
+    return parsed
+
+
+def ask(client: TestClient, route: str, message: str):
+    return client.post(f"/chatbot/{route}", json={"message": message, "sessionId": uuid.uuid4().hex})
+
+
+def test_send_message_returns_the_answer(client, pipeline):
+    response = ask(client, "send-message", "Quels sont tes projets ?")
+
+    assert response.status_code == 200
+    assert response.json() == {"message": "Quels sont tes projets ?", "answer": "Je suis Paul, développeur."}
+
+
+def test_stream_message_sends_tokens_then_done(client, pipeline):
+    response = ask(client, "stream-message", "Quels sont tes projets ?")
+
+    assert response.headers["content-type"].startswith("text/event-stream")
+    parsed = events(response.text)
+    assert [event for event, _ in parsed[:-1]] == ["token"] * (len(parsed) - 1)
+    assert "".join(data["token"] for _, data in parsed[:-1]) == "Je suis Paul, développeur."
+    assert parsed[-1] == ("done", {"message": "Quels sont tes projets ?"})
+
+
+def test_stream_message_ends_with_an_error_event_on_failure(client, pipeline, monkeypatch):
+    async def failing_stream(question, session_id):
+        yield "Je"
+        raise RuntimeError("LLM unavailable")
+
+    monkeypatch.setattr(pipeline, "astream", failing_stream)
+
+    parsed = events(ask(client, "stream-message", "Quels sont tes projets ?").text)
+
+    assert parsed == [("token", {"token": "Je"}), ("error", {"detail": "Internal server error"})]
@@ -0,0 +1,162 @@
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import pytest
+
+from app.models.cms_table import CMSTableSpec
+from app.services.rag import cms_service as cms_module
+from app.services.rag.cms_service import CMSService
+
+TABLES = [
+    CMSTableSpec(route="projects", title_keys=["title"], content_keys=["text"], category_name="Projets",
+                 params={"filters[locale]": "fr", "populate": "*"}),
+    CMSTableSpec(route="contact-links", title_keys=["title"], content_keys=["text"], category_name="Contacts",
+                 aggregate_documents=True),
+    CMSTableSpec(route="homepage", title_keys=["title"], content_keys=["text"], category_name="Plus sur toi",
+                 paginated=False),
+]
+
+
+def entry(document_id: str, day: int, text: str = "Un texte") -> dict:
+    return {"documentId": document_id, "title": document_id, "text": text,
+            "updatedAt": f"2025-01-{day:02d}T00:00:00.000Z"}
+
+
+def parse(date: str) -> datetime:
+    return datetime.fromisoformat(date.replace("Z", "+00:00")).astimezone(timezone.utc)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body: Optional[dict] = None, headers: Optional[dict] = None):
+        self.status_code, self.body, self.headers = status_code, body, headers or {}
+
+    def json(self) -> dict:
+        return self.body
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeStrapi:
+    """Serves the tables like Strapi: pagination, updatedAt filter, ID-only listings and ETags."""
+
+    def __init__(self):
+        self.collections: Dict[str, List[dict]] = {
+            "projects": [entry("p1", 1), entry("p2", 1)],
+            "contact-links": [entry("c1", 1), entry("c2", 1)],
+        }
+        self.homepage = entry("home", 1)
+        self.requests = []
+
+    def get(self, url: str, params: dict, headers: dict, timeout: float) -> FakeResponse:
+        route = url.rsplit("/", 1)[1]
+        self.requests.append((route, dict(params), dict(headers)))
+
+        if route == "homepage":
+            etag = f'"{self.homepage["updatedAt"]}"'
+            if headers.get("If-None-Match") == etag:
+                return FakeResponse(304)
+            return FakeResponse(200, {"data": self.homepage}, {"ETag": etag})
+
+        items = self.collections[route]
+        if "filters[updatedAt][$gt]" in params:
+            items = [item for item in items if parse(item["updatedAt"]) > parse(params["filters[updatedAt][$gt]"])]
+        if params.get("fields[0]") == "documentId":
+            items = [{"documentId": item["documentId"]} for item in items]
+        page, size = params["pagination[page]"], params["pagination[pageSize]"]
+        return FakeResponse(200, {
+            "data": items[(page - 1) * size:page * size],
+            "meta": {"pagination": {"pageCount": max(1, -(-len(items) // size))}},
+        })
+
+    def requests_to(self, route: str) -> List[dict]:
+        return [params for requested, params, _ in self.requests if requested == route]
+
+
+@pytest.fixture
+def strapi(monkeypatch):
+    monkeypatch.setattr(cms_module, "CMS_TABLES", TABLES)
+    return FakeStrapi()
+
+
+@pytest.fixture
+def service(strapi):
+    service = CMSService("http://cms.test", params=cms_module.CMSFetchParams(page_size=1))
+    service.session = strapi
+    return service
+
+
+def sync(service: CMSService):
+    delta = service.fetch_delta()
+    service.commit_delta(delta)
+    return delta
+
+
+def test_first_sync_fetches_everything(service):
+    delta = sync(service)
+
+    assert {doc.id for doc in delta.documents} == {"p1", "p2", "agg_c1_c2", "home"}
+    assert set(delta.changed_tables) == {"projects", "contact-links", "homepage"}
+    assert service.sync_state["projects"].watermark == "2025-01-01T00:00:00.000Z"
+
+
+def test_only_documents_updated_after_the_watermark_are_fetched(service, strapi):
+    sync(service)
+    strapi.collections["projects"][1] = entry("p2", 3, "Modifié")
+    strapi.requests.clear()
+
+    delta = sync(service)
+
+    assert [doc.id for doc in delta.documents] == ["p2"]
+    assert delta.changed_tables == ["projects"]
+    assert service.sync_state["projects"].watermark == "2025-01-03T00:00:00.000Z"
+    assert {"p1", "p2", "agg_c1_c2", "home"} <= delta.present_ids
+
+    strapi.requests.clear()
+    delta = sync(service)
+    assert delta.documents == [] and delta.changed_tables == []
+    changed_requests = [params for params in strapi.requests_to("projects") if "filters[updatedAt][$gt]" in params]
+    assert changed_requests[0]["filters[updatedAt][$gt]"] == "2025-01-03T00:00:00.000Z"
+
+
+def test_deleted_documents_are_missing_from_present_ids(service, strapi):
+    sync(service)
+    del strapi.collections["projects"][0]
+
+    delta = sync(service)
+
+    assert delta.documents == []
+    assert "p1" not in delta.present_ids and "p2" in delta.present_ids
+    assert delta.changed_tables == ["projects"]
+
+
+def test_listing_keeps_the_table_filters_but_not_its_projection(service, strapi):
+    sync(service)
+    strapi.requests.clear()
+
+    sync(service)
+
+    listing = [params for params in strapi.requests_to("projects") if params.get("fields[0]") == "documentId"]
+    assert listing and all(params["filters[locale]"] == "fr" and "populate" not in params for params in listing)
+
+
+def test_unchanged_single_type_is_not_downloaded_again(service, strapi):
+    sync(service)
+    strapi.requests.clear()
+
+    delta = sync(service)
+
+    [(_, _, headers)] = [request for request in strapi.requests if request[0] == "homepage"]
+    assert headers["If-None-Match"] == '"2025-01-01T00:00:00.000Z"'
+    assert "home" in delta.present_ids and "homepage" not in delta.changed_tables
+
+
+def test_aggregated_table_is_refetched_whole_when_an_entry_changes(service, strapi):
+    sync(service)
+    strapi.collections["contact-links"].append(entry("c3", 2))
+
+    delta = sync(service)
+
+    assert [doc.id for doc in delta.documents] == ["agg_c1_c2_c3"]
+    assert delta.changed_tables == ["contact-links"]
+    assert delta.present_ids >= {"agg_c1_c2_c3"} and "agg_c1_c2" not in delta.present_ids
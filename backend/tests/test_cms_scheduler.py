@@ -0,0 +1,134 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.cms_table import CMSTableSpec
+from app.models.document_model import DocumentModel
+from app.services.rag import cms_scheduler as cms_scheduler_module
+from app.services.rag import cms_service as cms_module
+from app.services.rag import reindex_jobs as reindex_jobs_module
+from app.services.rag.cms_scheduler import CMSSchedulerParams, CMSSyncScheduler
+from app.services.rag.reindex_jobs import ReindexJobManager
+
+TABLES = [
+    CMSTableSpec(route="projects", title_keys=["title"], content_keys=["text"], category_name="Projets",
+                 refresh_seconds=60),
+    CMSTableSpec(route="experiences", title_keys=["title"], content_keys=["text"], category_name="Expériences",
+                 refresh_seconds=300),
+    CMSTableSpec(route="skills", title_keys=["title"], content_keys=["text"], category_name="Compétences"),
+]
+
+
+def test_tables_are_due_on_their_own_interval():
+    scheduler = CMSSyncScheduler(TABLES)
+
+    assert scheduler.due_tables(0) == ["projects", "experiences"]
+    assert scheduler.due_tables(59) == []
+    assert scheduler.due_tables(60) == ["projects"]
+    assert scheduler.due_tables(300) == ["projects", "experiences"]
+
+
+class RecordingJobs:
+    """Stand-in for the reindex job manager, recording the submitted jobs."""
+
+    def __init__(self):
+        self.submitted = []
+        self.submitted_event = threading.Event()
+
+    def submit(self, mode, entries=(), tables=()):
+        self.submitted.append((mode, list(tables)))
+        self.submitted_event.set()
+        return SimpleNamespace(id=f"job-{len(self.submitted)}")
+
+    def table_stats(self):
+        return {}
+
+
+def test_due_tables_are_synced_by_one_tables_job(monkeypatch):
+    jobs = RecordingJobs()
+    monkeypatch.setattr(cms_scheduler_module, "reindex_jobs", jobs)
+    tables = [table.model_copy(update={"refresh_seconds": 0.05}) for table in TABLES[:2]] + TABLES[2:]
+    scheduler = CMSSyncScheduler(tables, CMSSchedulerParams(tick_seconds=0.01))
+
+    scheduler.start()
+    try:
+        assert scheduler.stats()["skills"]["next_refresh_in"] is None
+        assert jobs.submitted_event.wait(timeout=5)
+    finally:
+        scheduler.stop()
+
+    assert jobs.submitted[0] == ("tables", ["projects", "experiences"])
+
+
+def test_unscheduled_tables_start_no_thread():
+    scheduler = CMSSyncScheduler(TABLES[2:])
+    scheduler.start()
+    assert scheduler._thread is None
+
+
+class TableCMS:
+    """Stand-in for the CMS service, failing the tables listed in `failing`."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+
+    def fetch_table(self, table: CMSTableSpec):
+        if table.route in self.failing:
+            raise ConnectionError(f"{table.route} unavailable")
+        return [DocumentModel(id=f"{table.route}-1", title=table.route, text=f"Une entrée de {table.route}.",
+                              category=table.category_name, updated_at=None)]
+
+
+@pytest.fixture
+def manager(make_store, monkeypatch) -> ReindexJobManager:
+    store = make_store()
+    monkeypatch.setattr(cms_module, "CMS_TABLES", TABLES)
+    monkeypatch.setattr(reindex_jobs_module, "embedding_store", SimpleNamespace(get=lambda: store))
+    return ReindexJobManager()
+
+
+def run_tables_job(manager: ReindexJobManager, routes):
+    job = manager.submit("tables", tables=routes)
+    deadline = time.monotonic() + 5
+    while manager.get(job.id).status in ("queued", "running"):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    return manager.get(job.id)
+
+
+def test_failing_table_leaves_the_job_partial(manager, monkeypatch):
+    monkeypatch.setattr(reindex_jobs_module, "cms", TableCMS(failing=["experiences"]))
+
+    job = run_tables_job(manager, ["projects", "experiences", "skills"])
+
+    assert job.status == "partial"
+    assert job.error == "Failed tables: experiences (ConnectionError: experiences unavailable)"
+    assert job.report.added == 2
+
+    stats = manager.table_stats()
+    assert stats["experiences"].error == "ConnectionError: experiences unavailable"
+    assert stats["projects"].error is None and stats["projects"].documents == 1
+    assert all(table_stats.syncs == 1 for table_stats in stats.values())
+
+
+def test_job_fails_when_every_table_fails(manager, monkeypatch):
+    monkeypatch.setattr(reindex_jobs_module, "cms", TableCMS(failing=["projects", "experiences"]))
+
+    job = run_tables_job(manager, ["projects", "experiences"])
+
+    assert job.status == "failed"
+    assert job.error.startswith("RuntimeError: Every table sync failed")
+
+
+def test_scheduler_stats_include_the_last_table_syncs(manager, monkeypatch):
+    monkeypatch.setattr(reindex_jobs_module, "cms", TableCMS())
+    monkeypatch.setattr(cms_scheduler_module, "reindex_jobs", manager)
+    run_tables_job(manager, ["projects"])
+
+    stats = CMSSyncScheduler(TABLES).stats()
+
+    assert stats["projects"]["refresh_seconds"] == 60
+    assert stats["projects"]["last_sync"].report.added == 1
+    assert stats["skills"]["last_sync"] is None
@@ -0,0 +1,17 @@
+from app.services.rag.cms_service import cms
+
+DOCUMENTS = [{"title": "Master", "text": "Informatique"}, {"title": "Licence", "text": "Mathématiques"}]
+
+
+def test_aggregate_without_cms_ids_is_identified_by_its_category():
+    first = cms._clean_aggregated_documents(DOCUMENTS, ["title"], ["text"], None, category="Formations")
+    edited = cms._clean_aggregated_documents(DOCUMENTS[:1], ["title"], ["text"], None, category="Formations")
+
+    assert first.id == edited.id == "agg_Formations"
+
+
+def test_aggregate_with_cms_ids_is_identified_by_them():
+    documents = [{**doc, "documentId": f"doc{i}"} for i, doc in enumerate(DOCUMENTS)]
+    aggregated = cms._clean_aggregated_documents(documents[::-1], ["title"], ["text"], None, category="Formations")
+
+    assert aggregated.id == "agg_doc0_doc1"
@@ -0,0 +1,81 @@
+import threading
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import reindex_routes
+from app.services.rag import cms_webhook as cms_webhook_module
+from app.services.rag.cms_webhook import CMSWebhookDebouncer, CMSWebhookParams
+
+SECRET = "webhook-secret"
+
+
+class RecordingJobs:
+    """Stand-in for the reindex job manager, recording the submitted jobs."""
+
+    def __init__(self):
+        self.submitted = []
+        self.submitted_event = threading.Event()
+
+    def submit(self, mode, entries=(), tables=()):
+        self.submitted.append((mode, list(entries)))
+        self.submitted_event.set()
+        return type("Job", (), {"id": f"job-{len(self.submitted)}"})()
+
+
+@pytest.fixture
+def jobs(monkeypatch) -> RecordingJobs:
+    jobs = RecordingJobs()
+    monkeypatch.setattr(cms_webhook_module, "reindex_jobs", jobs)
+    monkeypatch.setattr(reindex_routes, "CMS_WEBHOOK_SECRET", SECRET)
+    monkeypatch.setattr(
+        reindex_routes, "cms_webhook", CMSWebhookDebouncer(CMSWebhookParams(debounce_seconds=0.5, max_delay_seconds=5))
+    )
+    return jobs
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(reindex_routes.router)
+    return TestClient(app)
+
+
+def webhook(client: TestClient, payload: dict, secret: str = SECRET):
+    return client.post("/rag/cms-webhook", json=payload, headers={"Authorization": f"Bearer {secret}"})
+
+
+def entry_event(document_id: str, event: str = "entry.update", model: str = "project") -> dict:
+    return {"event": event, "model": model, "entry": {"documentId": document_id}}
+
+
+def test_wrong_secret_is_rejected(client, jobs):
+    assert webhook(client, entry_event("a1"), secret="admin-password").status_code == 401
+    assert client.post("/rag/cms-webhook", json=entry_event("a1")).status_code == 401
+
+
+def test_webhook_is_disabled_without_a_dedicated_secret(client, jobs, monkeypatch):
+    monkeypatch.setattr(reindex_routes, "CMS_WEBHOOK_SECRET", None)
+    assert webhook(client, entry_event("a1"), secret="admin-password").status_code == 404
+
+
+def test_unindexed_models_and_events_are_ignored(client, jobs):
+    assert webhook(client, entry_event("a1", model="newsletter")).json()["status"] == "ignored"
+    assert webhook(client, entry_event("a1", event="media.create")).json()["status"] == "ignored"
+
+
+def test_entry_without_document_id_is_rejected(client, jobs):
+    response = webhook(client, {"event": "entry.update", "model": "project", "entry": {"id": 3}})
+    assert response.status_code == 422
+
+
+def test_burst_of_edits_is_reindexed_by_one_job(client, jobs):
+    for document_id in ("a1", "a1", "b2"):
+        response = webhook(client, entry_event(document_id))
+        assert response.status_code == 202
+        assert response.json()["status"] == "queued"
+    webhook(client, {"event": "entry.delete", "uid": "api::project.project", "entry": {"documentId": "c3"}})
+
+    assert jobs.submitted_event.wait(timeout=5)
+    assert jobs.submitted == [("entries", ["projects/a1", "projects/b2", "projects/c3"])]
@@ -0,0 +1,18 @@
+import pytest
+from pydantic import ValidationError
+
+from app.core import config
+
+
+def test_embedding_backend_without_its_runtime_is_rejected(monkeypatch):
+    monkeypatch.setattr(config, "_is_installed", lambda module: module != "onnxruntime")
+
+    with pytest.raises(ValidationError, match=r"onnx backend needs onnxruntime: install it with `uv sync --extra onnx`"):
+        config.Settings(EMBEDDING_BACKEND="onnx")
+
+    assert config.Settings(EMBEDDING_BACKEND="torch").EMBEDDING_BACKEND == "torch"
+
+
+def test_missing_package_of_a_submodule_counts_as_not_installed():
+    assert not config._is_installed("not_a_package.submodule")
+    assert config._is_installed("json")
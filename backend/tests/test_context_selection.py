@@ -0,0 +1,31 @@
+from langchain_core.documents import Document
+
+from app.services.rag.context_selection import ContextSelectionParams, select_context
+
+
+def chunk(doc_id: str, text: str = "texte") -> Document:
+    return Document(page_content=text, metadata={"id": doc_id, "chunk_nb": 0})
+
+
+def test_low_relevance_does_not_end_selection_in_fused_order():
+    documents = [chunk("a"), chunk("b"), chunk("c"), chunk("d")]
+    selected = select_context(documents, [0.7, 0.2, 0.8, 0.35], ContextSelectionParams())
+    assert [doc.metadata["id"] for doc in selected] == ["a", "c"]
+
+
+def test_first_chunk_is_always_kept():
+    selected = select_context([chunk("a")], [0.05], ContextSelectionParams())
+    assert [doc.metadata["id"] for doc in selected] == ["a"]
+
+
+def test_token_budget_ends_selection():
+    documents = [chunk("a", "x" * 40), chunk("b", "x" * 40), chunk("c", "x")]
+    params = ContextSelectionParams(max_context_tokens=15)
+    selected = select_context(documents, [0.9, 0.9, 0.9], params)
+    assert [doc.metadata["id"] for doc in selected] == ["a"]
+
+
+def test_unscored_keyword_hits_skip_the_relevance_cutoffs():
+    documents = [chunk("a"), chunk("b"), chunk("c")]
+    selected = select_context(documents, [0.9, None, 0.1], ContextSelectionParams())
+    assert [doc.metadata["id"] for doc in selected] == ["a", "b"]
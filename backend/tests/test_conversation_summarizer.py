@@ -0,0 +1,128 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage
+
+from app.models.document_model import DocumentModel
+from app.services.rag.conversation_summarizer import (
+    SUMMARY_MESSAGE_ID,
+    SUMMARY_PREFIX,
+    ConversationSummarizer,
+    ConversationSummaryParams,
+)
+from app.services.rag.intent_router import IntentRouterParams
+
+DOCUMENTS = [
+    DocumentModel(id="1", title="Chatbot", text="Un chatbot RAG en Python.", category="Projets",
+                  updated_at=datetime(2025, 1, 1)),
+]
+
+QUESTIONS = [
+    "Quels sont tes projets ?",
+    "Quelles technologies utilises-tu le plus ?",
+    "Parle-moi de ton expérience professionnelle.",
+]
+
+
+def summary_params(background: bool) -> ConversationSummaryParams:
+    return ConversationSummaryParams(
+        background=background, max_tokens_before_summary=60, max_tokens=50, max_summary_tokens=20
+    )
+
+
+@pytest.fixture
+def make_summarized_pipeline(make_store, make_pipeline):
+    def factory(background: bool):
+        store = make_store()
+        store.add_documents(DOCUMENTS)
+        return make_pipeline(
+            store=store,
+            intent_router_params=IntentRouterParams(enabled=False),
+            summary_params=summary_params(background),
+        )
+    return factory
+
+
+def history(pipeline, session_id: str) -> list:
+    return pipeline.graph.get_state({"configurable": {"thread_id": session_id}}).values["messages"]
+
+
+def test_short_history_is_not_summarized():
+    summarizer = ConversationSummarizer(model=None, params=summary_params(background=True))
+    assert not summarizer.needs_summary([HumanMessage(content="Bonjour"), AIMessage(content="Bonjour !")])
+
+    disabled = ConversationSummarizer(model=None, params=ConversationSummaryParams(enabled=False, max_tokens_before_summary=0))
+    assert not disabled.needs_summary([HumanMessage(content="Bonjour")])
+
+
+def test_rewrite_keeps_the_messages_added_after_the_snapshot():
+    summarized = [HumanMessage(content="Question 1", id="h1"), AIMessage(content="Réponse 1", id="a1")]
+    added = [HumanMessage(content="Question 2", id="h2"), AIMessage(content="Réponse 2", id="a2")]
+    result = type("Result", (), {"running_summary": type("Summary", (), {
+        "summary": "Paul a parlé de ses projets.", "summarized_message_ids": {"h1", "a1"}
+    })()})()
+
+    update = ConversationSummarizer._rewrite(summarized + added, None, result)
+
+    assert isinstance(update[0], RemoveMessage)
+    assert update[1] == SystemMessage(content=f"{SUMMARY_PREFIX}Paul a parlé de ses projets.", id=SUMMARY_MESSAGE_ID)
+    assert update[2:] == added
+
+
+def test_inline_summary_folds_the_oldest_turns(make_summarized_pipeline):
+    pipeline = make_summarized_pipeline(background=False)
+    session_id = uuid.uuid4().hex
+
+    # Inline summaries run before the turn: only the fourth one starts over the token budget
+    questions = [*QUESTIONS, "Que fais-tu en dehors du développement ?"]
+    for question in questions:
+        pipeline.execute(question, session_id)
+
+    messages = history(pipeline, session_id)
+    assert messages[0].id == SUMMARY_MESSAGE_ID
+    assert messages[0].content.startswith(SUMMARY_PREFIX)
+    assert messages[-2].content == questions[-1]
+    assert pipeline.summarizer.stats()["summaries"] >= 1
+
+
+def test_background_summary_runs_after_the_answer(make_summarized_pipeline):
+    pipeline = make_summarized_pipeline(background=True)
+    session_id = uuid.uuid4().hex
+
+    async def run_turns():
+        for question in QUESTIONS:
+            await pipeline.aexecute(question, session_id)
+        await asyncio.gather(*pipeline.summarizer._tasks)
+
+    asyncio.run(run_turns())
+
+    # The last turn was answered on the whole history, the summary replaced it afterwards
+    last_turn_prompt = next(prompt for prompt in pipeline.llm.prompts if prompt[-1].content == QUESTIONS[-1])
+    assert any(message.content == QUESTIONS[0] for message in last_turn_prompt)
+    assert pipeline.summarizer.stats()["running"] == 0
+    assert pipeline.summarizer.stats()["summaries"] >= 1
+    assert history(pipeline, session_id)[0].id == SUMMARY_MESSAGE_ID
+
+
+def test_one_background_summary_per_session_at_a_time(make_summarized_pipeline, monkeypatch):
+    pipeline = make_summarized_pipeline(background=True)
+    summarizer = pipeline.summarizer
+    calls = []
+
+    async def slow_summarize(graph, config):
+        calls.append(config["configurable"]["thread_id"])
+        await asyncio.sleep(0.05)
+
+    monkeypatch.setattr(summarizer, "asummarize", slow_summarize)
+
+    async def schedule_twice():
+        for session_id in ("a", "a", "b"):
+            summarizer.schedule(pipeline.graph, {"configurable": {"thread_id": session_id}})
+        await asyncio.gather(*summarizer._tasks)
+
+    asyncio.run(schedule_twice())
+
+    assert calls == ["a", "b"]
+    assert summarizer.stats()["running"] == 0
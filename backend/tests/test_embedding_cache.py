@@ -0,0 +1,47 @@
+import sqlite3
+
+from app.services.rag.embedding_cache import EmbeddingCache
+
+
+def last_used(cache: EmbeddingCache, text_hash: str) -> float:
+    """Read an access time from the file, like another process would."""
+    with sqlite3.connect(cache.path) as conn:
+        return conn.execute("SELECT last_used FROM embeddings WHERE text_hash = ?", (text_hash,)).fetchone()[0]
+
+
+def test_access_times_are_written_in_batches(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"), access_flush_size=3)
+    cache.put_many("model", {"a": [1.0], "b": [2.0]})
+    written = last_used(cache, "a")
+
+    cache.get_many("model", ["a"])
+    cache.get_many("model", ["a", "b"])
+    assert last_used(cache, "a") == written
+
+    cache.get_many("model", ["a", "b", "missing"])
+    cache.put_many("model", {"c": [3.0]})
+    cache.get_many("model", ["c"])
+    assert last_used(cache, "a") > written
+    assert (cache.hits, cache.misses) == (6, 1)
+
+
+def test_entry_count_is_tracked_without_counting_rows(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"))
+    cache.put_many("model", {"a": [1.0], "b": [2.0]})
+    cache.put_many("model", {"b": [2.0], "c": [3.0]})
+    assert cache.stats()["entries"] == 3
+
+    reopened = EmbeddingCache(cache.path)
+    assert reopened.stats()["entries"] == 3
+
+
+def test_eviction_uses_buffered_access_times(tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.put_many("model", {"a": [1.0]})
+    cache.put_many("model", {"b": [2.0]})
+    assert cache.get_many("model", ["a"]) == {"a": [1.0]}
+
+    cache.put_many("model", {"c": [3.0]})
+
+    assert set(cache.get_many("model", ["a", "b", "c"])) == {"a", "c"}
+    assert cache.stats()["entries"] == 2
@@ -0,0 +1,65 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from app.models.document_model import DocumentModel
+
+DOCUMENTS = [
+    DocumentModel(id=str(i), title=f"Projet {i}", text=f"Projet Python numéro {i}.", category="Projets",
+                  updated_at=datetime(2025, 1, 1))
+    for i in range(5)
+] + [
+    DocumentModel(id="acme", title="Alternance", text="Stage chez Acme, logiciels embarqués.", category="Expériences",
+                  updated_at=datetime(2025, 1, 1)),
+]
+QUERY = "projet Python Acme"
+
+
+class RemoteOnly:
+    """Stands for a Chroma collection: searches work, reading the stored vectors is a network call."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+    def get(self, *args, include=None, **kwargs):
+        assert "embeddings" not in (include or []), "hybrid search read the stored vectors from the vector store"
+        return self.collection.get(*args, include=include, **kwargs)
+
+
+def keyword_only_results(store, query):
+    """Hybrid search results whose chunks the vector search did not return."""
+    documents, distances = store.hybrid_search(query, k=3)
+    dense_ids = {store._document_chunk_id(doc) for doc, _ in store._dense_search(store.embed_query(query), 3)}
+    return [(doc, distance) for doc, distance in zip(documents, distances) if store._document_chunk_id(doc) not in dense_ids]
+
+
+def test_numpy_backend_scores_keyword_hits_from_the_index(make_store):
+    store = make_store(hybrid_candidates=3)
+    store.add_documents(DOCUMENTS)
+
+    results = keyword_only_results(store, QUERY)
+
+    assert results
+    query = np.asarray(store.embed_query(QUERY))
+    for doc, distance in results:
+        similarity = query @ np.asarray(store.embeddings.embed_documents([doc.page_content])[0])
+        assert distance == pytest.approx(2 - 2 * similarity, abs=1e-6)
+
+
+@pytest.mark.parametrize("cached", [True, False])
+def test_remote_backend_scores_keyword_hits_without_reading_the_store(make_store, monkeypatch, tmp_path, cached):
+    store = make_store(hybrid_candidates=3, embedding_cache_path=str(tmp_path / "cache.db") if cached else None)
+    store.add_documents(DOCUMENTS)
+    # Only the vector search path is swapped, the collection alias stays on the numpy files
+    monkeypatch.setattr(store, "_refresh_live_collection", lambda force=False: None)
+    monkeypatch.setattr(store.params, "vector_backend", "chroma")
+    store.vector_store = RemoteOnly(store.vector_store)
+
+    results = keyword_only_results(store, QUERY)
+
+    assert results
+    assert all((distance is not None) == cached for _, distance in results)
@@ -0,0 +1,73 @@
+from datetime import datetime
+from typing import Iterator, List
+
+import pytest
+
+from app.models.document_model import DocumentModel
+from app.services.rag.indexing_progress import IndexingProgress
+
+
+def document(doc_id: str, sentences: int = 3, day: int = 1, word: str = "projet") -> DocumentModel:
+    text = " ".join(f"Phrase {i} sur le {word} {doc_id}, avec assez de mots pour remplir un morceau." for i in range(sentences))
+    return DocumentModel(id=doc_id, title=f"Document {doc_id}", text=text, category="Projets",
+                         updated_at=datetime(2025, 1, day))
+
+
+@pytest.fixture
+def store(make_store):
+    # About one sentence per chunk
+    return make_store(chunk_size=100, chunk_overlap=0, ingest_batch_size=3)
+
+
+@pytest.fixture
+def events(store, monkeypatch) -> List[str]:
+    """Record the documents read and the batches embedded, in order."""
+    events = []
+    embed_documents = store.embeddings.embed_documents
+
+    def recording_embed(texts):
+        events.append(f"embed {len(texts)}")
+        return embed_documents(texts)
+
+    monkeypatch.setattr(store.embeddings, "embed_documents", recording_embed)
+    return events
+
+
+def reading(documents: List[DocumentModel], events: List[str]) -> Iterator[DocumentModel]:
+    for doc in documents:
+        events.append(f"read {doc.id}")
+        yield doc
+
+
+def test_chunks_are_embedded_in_batches_as_documents_are_read(store, events):
+    count = store.add_documents(reading([document("a"), document("b"), document("c")], events))
+
+    batches = [int(event.split()[1]) for event in events if event.startswith("embed")]
+    assert sum(batches) == count == len(store.vector_store.get()["ids"])
+    assert all(size <= 3 for size in batches) and len(batches) > 1
+    assert events.index("embed 3") < events.index("read c")
+
+
+def test_sync_only_embeds_changed_chunks(store, events):
+    store.sync_documents([document("a"), document("b")])
+    events.clear()
+
+    progress = IndexingProgress()
+    report = store.sync_documents([document("a"), document("b", day=2, word="stage")], progress=progress)
+
+    embedded = sum(int(event.split()[1]) for event in events)
+    assert embedded == report.updated + report.added > 0
+    assert progress.snapshot()["chunks"] == embedded
+    assert report.unchanged >= 3
+
+
+def test_sync_deletes_removed_documents_unless_still_present(store):
+    store.sync_documents([document("a"), document("b")])
+
+    kept = store.sync_documents([document("a")], present_ids={"a", "b"})
+    assert kept.deleted == 0
+    assert {metadata["id"] for metadata in store.vector_store.get()["metadatas"]} == {"a", "b"}
+
+    removed = store.sync_documents([document("a")])
+    assert removed.deleted > 0
+    assert {metadata["id"] for metadata in store.vector_store.get()["metadatas"]} == {"a"}
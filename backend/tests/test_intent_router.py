@@ -0,0 +1,105 @@
+import asyncio
+import json
+import uuid
+from typing import Dict, List
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from app.services.rag.intent_router import IntentRouter, IntentRouterParams
+
+
+class TableEmbeddings(Embeddings):
+    """Fixed vectors by text, [0, 0, 1] for unknown texts. Counts the calls."""
+
+    def __init__(self, vectors: Dict[str, List[float]]):
+        self.vectors = vectors
+        self.calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        return [self.vectors.get(text, [0.0, 0.0, 1.0]) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+@pytest.fixture
+def router() -> IntentRouter:
+    router = IntentRouter(TableEmbeddings({}), IntentRouterParams(min_similarity=0.5, min_margin=0.1))
+    router.embeddings.vectors = {
+        "Utilises-tu Rust au quotidien ?": [1.0, 0.1, 0.0],
+        "Tu vas bien aujourd'hui ?": [0.1, 1.0, 0.0],
+        "Rust ou alors Go ?": [1.0, 0.9, 0.0],
+        "Vraiment ?": [1.0, 0.0, 0.0],
+    }
+    router.fit({"retrieve": ["Utilises-tu Rust au quotidien ?"], "smalltalk": ["Tu vas bien aujourd'hui ?"]})
+    return router
+
+
+@pytest.mark.parametrize("question", ["Bonjour !", "Merci beaucoup", "Ça va ?", "ok merci !"])
+def test_greetings_and_thanks_are_small_talk(router, question):
+    assert router.classify(question) == "smalltalk"
+
+
+def test_questions_naming_a_topic_are_retrieved_when_self_contained(router):
+    assert router.classify("Quels sont tes projets en Python ?") == "retrieve"
+    # Too short to search without the conversation
+    assert router.classify("Et tes projets ?") == "uncertain"
+
+
+def test_other_questions_go_to_the_nearest_centroid_when_clear(router):
+    assert router.classify("Utilises-tu Rust au quotidien ?") == "retrieve"
+    assert router.classify("Tu vas bien aujourd'hui ?") == "smalltalk"
+    # Too close to both centroids, too far from both, or too short to retrieve
+    assert router.classify("Rust ou alors Go ?") == "uncertain"
+    assert router.classify("Qui es-tu vraiment ?") == "uncertain"
+    assert router.classify("Vraiment ?") == "uncertain"
+    assert router.stats() == {"retrieve": 1, "smalltalk": 1, "uncertain": 3}
+
+
+def test_disabled_router_leaves_every_question_to_the_llm():
+    embeddings = TableEmbeddings({})
+    router = IntentRouter(embeddings, IntentRouterParams(enabled=False))
+
+    assert router.classify("Bonjour") == "uncertain"
+    assert router.classify("Quels sont tes projets en Python ?") == "uncertain"
+    assert embeddings.calls == 0
+
+
+def test_logged_decisions_are_trimmed_and_become_examples(tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    params = IntentRouterParams(traffic_log_path=str(path), max_traffic_examples=3)
+    router = IntentRouter(TableEmbeddings({}), params)
+
+    for i in range(7):
+        router.record(f"Question {i}", "retrieve")
+    router._log_writer.shutdown(wait=True)
+
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    # Trimmed to the last 3 at the 6th decision, then one more appended
+    assert [line["question"] for line in lines] == ["Question 3", "Question 4", "Question 5", "Question 6"]
+    examples = IntentRouter(TableEmbeddings({}), params)._load_examples()
+    assert examples["retrieve"][-1] == "Question 6"
+    assert "Question 0" not in examples["retrieve"]
+
+
+def test_pipeline_skips_the_routing_llm_call_for_clear_questions(make_pipeline):
+    pipeline = make_pipeline()
+
+    asyncio.run(pipeline.aexecute("Quels sont tes projets en Python ?", uuid.uuid4().hex))
+    assert pipeline.llm.calls == 1
+
+    asyncio.run(pipeline.aexecute("Bonjour !", uuid.uuid4().hex))
+    assert pipeline.llm.calls == 2
+
+
+def test_pipeline_logs_the_llm_decision_on_uncertain_questions(make_pipeline, tmp_path):
+    path = tmp_path / "traffic.jsonl"
+    pipeline = make_pipeline(intent_router_params=IntentRouterParams(traffic_log_path=str(path), min_similarity=2.0))
+
+    asyncio.run(pipeline.aexecute("Qui es-tu vraiment ?", uuid.uuid4().hex))
+    pipeline.intent_router._log_writer.shutdown(wait=True)
+
+    assert pipeline.llm.calls == 2
+    assert json.loads(path.read_text(encoding="utf-8")) == {"question": "Qui es-tu vraiment ?", "intent": "retrieve"}
@@ -0,0 +1,44 @@
+import pytest
+
+from app.services.rag.keyword_index import BM25Index, french_tokenize
+from app.utils.text_cleaner import clean_text
+
+CHUNKS = {
+    "ml": "## Compétences\nJ'ai entraîné des modèles avec **scikit-learn** et PyTorch.",
+    "dotnet": "Développement d'une API en `C#` avec ASP.NET Core, c'est mon langage principal.",
+    "web": "Développeur full-stack : React, Node.js et C++ pour les modules natifs.",
+}
+
+
+@pytest.fixture
+def index() -> BM25Index:
+    """Index of the chunks, cleaned like the documents are before being split."""
+    index = BM25Index()
+    for chunk_id, text in CHUNKS.items():
+        index.add(chunk_id, clean_text(text))
+    return index
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("scikit-learn", "ml"),
+    ("Scikit Learn", "ml"),
+    ("C#", "dotnet"),
+    ("full-stack", "web"),
+    ("fullstack full stack", "web"),
+    ("node.js", "web"),
+    ("c++", "web"),
+])
+def test_search_finds_hyphenated_and_symbol_terms(index, query, expected):
+    results = index.search(query, k=3)
+    assert results, f"no result for {query!r}"
+    assert results[0][0] == expected
+
+
+@pytest.mark.parametrize("text", ["scikit-learn", "C#", "full-stack", "node.js", "c++", "L'expérience"])
+def test_queries_and_cleaned_chunks_tokenize_alike(text):
+    assert french_tokenize(text) == french_tokenize(clean_text(text))
+
+
+def test_elisions_are_dropped():
+    assert french_tokenize("c'est l'expérience d'un développeur qu'il aime") == ["experience", "developpeur", "aime"]
+    assert french_tokenize("C et R") == ["c", "r"]
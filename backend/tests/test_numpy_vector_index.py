@@ -0,0 +1,111 @@
+import json
+import os
+import threading
+
+from app.services.rag.numpy_vector_index import NumpyVectorIndex
+
+
+def add(index: NumpyVectorIndex, chunk_id: str, vector, **metadata):
+    index.upsert([chunk_id], [f"texte {chunk_id}"], [vector], [{"id": chunk_id, **metadata}])
+
+
+def test_search_returns_closest_chunks_with_filter(tmp_path):
+    index = NumpyVectorIndex(str(tmp_path))
+    add(index, "a", [1.0, 0.0], category="Projets")
+    add(index, "b", [0.0, 1.0], category="Projets")
+    add(index, "c", [0.9, 0.1], category="Expériences")
+
+    results = index.similarity_search_by_vector_with_relevance_scores([1.0, 0.0], k=2)
+    assert [doc.id for doc, _ in results] == ["a", "c"]
+    assert results[0][1] == 0.0
+
+    results = index.similarity_search_by_vector_with_relevance_scores([1.0, 0.0], k=5, filter={"category": "Projets"})
+    assert [doc.id for doc, _ in results] == ["a", "b"]
+
+
+def test_writes_swap_the_lists_searches_are_reading(tmp_path):
+    index = NumpyVectorIndex(str(tmp_path))
+    add(index, "a", [1.0, 0.0])
+    ids, texts, vectors = index._ids, index._texts, index._vectors
+
+    add(index, "b", [0.0, 1.0])
+    add(index, "a", [0.0, 1.0])
+    index.delete(["b"])
+
+    assert (ids, texts, vectors.tolist()) == (["a"], ["texte a"], [[1.0, 0.0]])
+    assert index.get(include=["embeddings"])["embeddings"][0].tolist() == [0.0, 1.0]
+
+
+def test_other_process_sees_writes_within_the_mtime_resolution(tmp_path):
+    writer, reader = NumpyVectorIndex(str(tmp_path)), NumpyVectorIndex(str(tmp_path))
+    manifest = os.path.join(str(tmp_path), NumpyVectorIndex.MANIFEST)
+
+    add(writer, "a", [1.0, 0.0])
+    writer.persist()
+    assert reader.get()["ids"] == ["a"]
+    mtime = os.stat(manifest).st_mtime_ns
+
+    add(writer, "b", [0.0, 1.0])
+    writer.persist()
+    os.utime(manifest, ns=(mtime, mtime))
+
+    assert reader.get()["ids"] == ["a", "b"]
+    assert reader.revision() == writer.revision()
+
+
+def test_manifest_without_version_is_loaded(tmp_path):
+    writer = NumpyVectorIndex(str(tmp_path))
+    add(writer, "a", [1.0, 0.0])
+    writer.persist()
+    manifest_path = os.path.join(str(tmp_path), NumpyVectorIndex.MANIFEST)
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    del manifest["version"]
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+
+    reader = NumpyVectorIndex(str(tmp_path))
+    assert reader.get()["ids"] == ["a"]
+    assert reader.revision() == writer.revision()
+
+
+def test_only_the_last_versions_are_kept_on_disk(tmp_path):
+    index = NumpyVectorIndex(str(tmp_path))
+    for i in range(4):
+        add(index, f"c{i}", [1.0, float(i)])
+        index.persist()
+
+    vectors_files = [name for name in os.listdir(str(tmp_path)) if name.startswith("vectors-")]
+    assert len(vectors_files) == NumpyVectorIndex.KEEP_VERSIONS
+    assert NumpyVectorIndex(str(tmp_path)).get()["ids"] == ["c0", "c1", "c2", "c3"]
+
+
+def test_searches_stay_consistent_during_writes(tmp_path):
+    index = NumpyVectorIndex(str(tmp_path))
+
+    def write(chunk_id: str, version: int):
+        index.upsert([chunk_id], [f"{chunk_id} v{version}"], [[1.0, float(version)]], [{"version": version}])
+
+    for i in range(20):
+        write(f"c{i}", 0)
+    errors, done = [], threading.Event()
+
+    def search():
+        while not done.is_set():
+            try:
+                for doc, _ in index.similarity_search_by_vector_with_relevance_scores([1.0, 0.0], k=50):
+                    assert doc.page_content == f"{doc.id} v{doc.metadata['version']}"
+            except Exception as e:
+                errors.append(e)
+                return
+
+    searcher = threading.Thread(target=search)
+    searcher.start()
+    for version in range(1, 200):
+        write(f"c{version % 20}", version)
+        if version % 7 == 0:
+            index.delete([f"c{version % 20}"])
+    done.set()
+    searcher.join()
+
+    assert errors == []
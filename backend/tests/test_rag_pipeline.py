@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import re
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+from langchain_core.documents import Document
+
+from app.models.document_model import DocumentModel
+from app.services.rag.context_selection import estimate_tokens
+from app.services.rag.intent_router import IntentRouterParams
+
+
+def test_context_log_compares_with_the_former_tool_output(make_pipeline, caplog):
+    pipeline = make_pipeline()
+    docs = [
+        Document(page_content="Un chatbot RAG.", metadata={"id": "1", "chunk_nb": 0, "title": "Portfolio", "category": "Projets"}),
+        Document(page_content="Une API en Go.", metadata={"id": "2", "chunk_nb": 0, "title": "Acme", "category": "Expériences"}),
+    ]
+    former = "\n\n".join(f"Source: {doc.metadata}\nContent: {doc.page_content}" for doc in docs)
+
+    with caplog.at_level(logging.INFO, logger="app.services.rag.rag_pipeline"):
+        content, _ = pipeline._select_context(docs, [0.1, 0.2])
+
+    before, after = map(int, re.search(r"~(\d+) tokens\) → .* \(~(\d+) tokens", caplog.text).groups())
+    assert (before, after) == (estimate_tokens(former), estimate_tokens(content))
+
+
+DOCUMENTS = [
+    DocumentModel(id="1", title="Chatbot", text="Un chatbot RAG en Python.", category="Projets",
+                  updated_at=datetime(2025, 1, 1)),
+]
+
+
+@pytest.fixture
+def pipeline(make_store, make_pipeline):
+    store = make_store()
+    store.add_documents(DOCUMENTS)
+    # The LLM decides whether to retrieve, as the scripted model is deterministic
+    return make_pipeline(store=store, intent_router_params=IntentRouterParams(enabled=False))
+
+
+def test_aexecute_retrieves_and_answers_without_markdown(pipeline):
+    answer = asyncio.run(pipeline.aexecute("Quels sont tes projets ?", uuid.uuid4().hex))
+
+    assert answer == "Je suis Paul, développeur."
+    generation_prompt = pipeline.llm.prompts[-1]
+    assert "Un chatbot RAG en Python." in generation_prompt[0].content
+
+
+def test_aexecute_answers_small_talk_without_retrieval(pipeline):
+    assert asyncio.run(pipeline.aexecute("Bonjour", uuid.uuid4().hex)) == "Bonjour !"
+    assert pipeline.llm.calls == 1
+
+
+def test_concurrent_turns_do_not_block_each_other(pipeline):
+    pipeline.llm.delay = 0.2
+
+    async def run_turns():
+        return await asyncio.gather(*(pipeline.aexecute(f"Projet {i} ?", uuid.uuid4().hex) for i in range(4)))
+
+    start = time.perf_counter()
+    answers = asyncio.run(run_turns())
+
+    # Two LLM calls per turn: run one after the other, the four turns would take 1.6 s
+    assert time.perf_counter() - start < 1.0
+    assert answers == ["Je suis Paul, développeur."] * 4
+
+
+def test_astream_yields_the_cleaned_answer_and_stores_it(pipeline):
+    session_id = uuid.uuid4().hex
+
+    async def collect():
+        return [token async for token in pipeline.astream("Quels sont tes projets ?", session_id)]
+
+    tokens = asyncio.run(collect())
+
+    assert len(tokens) > 1
+    assert "".join(tokens) == "Je suis Paul, développeur."
+    state = pipeline.graph.get_state({"configurable": {"thread_id": session_id}})
+    assert state.values["messages"][-1].content == "Je suis Paul, développeur."
@@ -0,0 +1,27 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from app.services.rag.rag_prompts import build_prompt_with_context
+
+HISTORY = [
+    HumanMessage("Quels sont tes projets ?"),
+    AIMessage("", tool_calls=[{"name": "retrieve", "args": {"question": "projets"}, "id": "call_1"}]),
+    ToolMessage("[Projets - Portfolio]\nUn chatbot RAG.", tool_call_id="call_1"),
+]
+
+
+def test_context_goes_into_the_system_message_after_the_instructions():
+    prompt = build_prompt_with_context(HISTORY, "Paul", "[Projets - Portfolio]\nUn chatbot RAG.")
+
+    assert isinstance(prompt[0], SystemMessage)
+    assert prompt[1:] == HISTORY
+    assert not any(isinstance(message, SystemMessage) for message in prompt[1:])
+    assert prompt[0].content.index("Tu es Paul") < prompt[0].content.index("Un chatbot RAG.")
+
+
+def test_system_prefix_is_the_same_across_turns():
+    first = build_prompt_with_context(HISTORY, "Paul", "contexte A")[0].content
+    second = build_prompt_with_context(HISTORY, "Paul", "contexte B")[0].content
+    prefix_length = first.index("contexte A")
+
+    assert prefix_length > 0
+    assert first[:prefix_length] == second[:prefix_length]
@@ -0,0 +1,146 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import reindex_routes
+from app.models.document_model import DocumentModel
+from app.services.rag import reindex_jobs as reindex_jobs_module
+from app.services.rag.reindex_jobs import ReindexJobManager
+
+PASSWORD = "admin-password"
+
+DOCUMENTS = [
+    DocumentModel(id=str(i), title=f"Projet {i}", text=f"Projet {i} en Python avec FastAPI.", category="Projets",
+                  updated_at=None)
+    for i in range(4)
+]
+
+
+class GatedCMS:
+    """Stand-in for the CMS service, whose full fetch waits until it is released."""
+
+    def __init__(self):
+        self.released = threading.Event()
+        self.fetches = 0
+        self.error = None
+
+    def fetch_all(self):
+        self.fetches += 1
+        assert self.released.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        return DOCUMENTS
+
+
+@pytest.fixture
+def cms(monkeypatch) -> GatedCMS:
+    cms = GatedCMS()
+    monkeypatch.setattr(reindex_jobs_module, "cms", cms)
+    return cms
+
+
+@pytest.fixture
+def manager(make_store, cms, monkeypatch) -> ReindexJobManager:
+    store = make_store()
+    monkeypatch.setattr(reindex_jobs_module, "embedding_store", SimpleNamespace(get=lambda: store))
+    return ReindexJobManager(max_history=3)
+
+
+def wait_for(manager: ReindexJobManager, job_id: str, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job.status not in ("queued", "running"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} still {job.status}")
+
+
+def wait_until_running(manager: ReindexJobManager, job_id: str):
+    deadline = time.monotonic() + 5
+    while manager.get(job_id).status != "running":
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_job_reports_its_phases_and_chunks(manager, cms):
+    cms.released.set()
+
+    job = wait_for(manager, manager.submit("full").id)
+
+    assert job.status == "succeeded"
+    assert job.report.added == len(DOCUMENTS)
+    assert job.chunks == len(DOCUMENTS)
+    assert job.phases["fetch"].items == len(DOCUMENTS)
+    assert job.finished_at is not None
+
+
+def test_triggers_during_a_run_are_coalesced_into_one_follow_up(manager, cms):
+    first = manager.submit("full")
+    wait_until_running(manager, first.id)
+
+    second = manager.submit("full")
+    third = manager.submit("full")
+    other_mode = manager.submit("rebuild")
+
+    assert second.id == third.id != first.id
+    assert third.requests == 2
+    assert other_mode.id not in (first.id, second.id)
+    assert manager.get(second.id).status == "queued"
+
+    cms.released.set()
+    assert [wait_for(manager, job_id).status for job_id in (first.id, second.id, other_mode.id)] == ["succeeded"] * 3
+    assert cms.fetches == 3
+
+
+def test_failed_job_records_the_error(manager, cms):
+    cms.error = ConnectionError("cms down")
+    cms.released.set()
+
+    job = wait_for(manager, manager.submit("full").id)
+
+    assert job.status == "failed"
+    assert job.error == "ConnectionError: cms down"
+    assert job.report is None
+
+
+def test_oldest_finished_jobs_are_forgotten(manager, cms):
+    cms.released.set()
+    job_ids = []
+    for _ in range(5):
+        job_ids.append(manager.submit("full").id)
+        wait_for(manager, job_ids[-1])
+
+    assert manager.get(job_ids[0]) is None
+    assert all(manager.get(job_id) is not None for job_id in job_ids[-3:])
+
+
+@pytest.fixture
+def client(manager, monkeypatch) -> TestClient:
+    monkeypatch.setattr(reindex_routes, "reindex_jobs", manager)
+    monkeypatch.setattr(reindex_routes, "ADMIN_PASSWORD", PASSWORD)
+    app = FastAPI()
+    app.include_router(reindex_routes.router)
+    return TestClient(app)
+
+
+def test_reindex_route_queues_a_job_and_returns_at_once(client, manager, cms):
+    response = client.post("/rag/reindex", data={"password": PASSWORD, "rebuild": "true"})
+
+    assert response.status_code == 202
+    body = response.json()
+    assert body["mode"] == "rebuild"
+    assert body["status_url"] == f"/rag/reindex/jobs/{body['job_id']}"
+
+    cms.released.set()
+    wait_for(manager, body["job_id"])
+    assert client.get(body["status_url"]).json()["status"] == "succeeded"
+
+
+def test_reindex_route_rejects_a_wrong_password_and_unknown_jobs(client):
+    assert client.post("/rag/reindex", data={"password": "wrong"}).status_code == 401
+    assert client.get("/rag/reindex/jobs/unknown").status_code == 404
@@ -0,0 +1,95 @@
+import asyncio
+import operator
+import threading
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+
+from app.services.rag.session_memory import BoundedMemorySaver, SessionMemoryParams
+
+
+class State(TypedDict, total=False):
+    messages: Annotated[list, operator.add]
+    step: int
+
+
+def build_graph(saver: BoundedMemorySaver, during_run=None):
+    """Two-node graph: the second node only changes `step`, so its checkpoint carries no messages blob."""
+    def first(state: State) -> State:
+        return {"messages": ["réponse"]}
+
+    def second(state: State) -> State:
+        if during_run is not None:
+            during_run()
+        return {"step": state.get("step", 0) + 1}
+
+    graph = StateGraph(State)
+    graph.add_node("first", first)
+    graph.add_node("second", second)
+    graph.add_edge(START, "first")
+    graph.add_edge("first", "second")
+    graph.add_edge("second", END)
+    return graph.compile(checkpointer=saver)
+
+
+def config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+@pytest.fixture
+def db_path(tmp_path) -> str:
+    return str(tmp_path / "sessions.sqlite3")
+
+
+def test_session_evicted_mid_run_keeps_its_history(db_path):
+    saver = BoundedMemorySaver(SessionMemoryParams(sqlite_path=db_path, max_bytes=2_000, flush_delay_seconds=60))
+    build_graph(saver).invoke({"messages": ["question 1"]}, config("visitor"))
+
+    # Another conversation fills the memory while the visitor's run is between two checkpoints
+    def other_conversation():
+        thread = threading.Thread(
+            target=build_graph(saver).invoke, args=({"messages": ["x" * 5_000]}, config("other"))
+        )
+        thread.start()
+        thread.join()
+
+    build_graph(saver, during_run=other_conversation).invoke({"messages": ["question 2"]}, config("visitor"))
+    assert saver.evictions >= 1
+    saver.flush()
+
+    reloaded = BoundedMemorySaver(SessionMemoryParams(sqlite_path=db_path))
+    state = build_graph(reloaded).get_state(config("visitor")).values
+    assert state["messages"] == ["question 1", "réponse", "question 2", "réponse"]
+    assert state["step"] == 2
+
+
+def test_session_evicted_and_persisted_is_reloaded_before_writing(db_path):
+    saver = BoundedMemorySaver(SessionMemoryParams(sqlite_path=db_path, max_bytes=2_000, flush_delay_seconds=60))
+    graph = build_graph(saver)
+    graph.invoke({"messages": ["question 1"]}, config("visitor"))
+    saver.flush()
+    graph.invoke({"messages": ["x" * 5_000]}, config("other"))
+    assert saver.stats()["live_sessions"] == 1
+
+    graph.invoke({"messages": ["question 2"]}, config("visitor"))
+    assert graph.get_state(config("visitor")).values["messages"] == ["question 1", "réponse", "question 2", "réponse"]
+
+
+def test_other_worker_update_is_picked_up(db_path):
+    first_worker = BoundedMemorySaver(SessionMemoryParams(sqlite_path=db_path, flush_delay_seconds=60))
+    second_worker = BoundedMemorySaver(SessionMemoryParams(sqlite_path=db_path, flush_delay_seconds=60))
+
+    build_graph(first_worker).invoke({"messages": ["question 1"]}, config("visitor"))
+    first_worker.flush()
+    build_graph(second_worker).invoke({"messages": ["question 2"]}, config("visitor"))
+    second_worker.flush()
+
+    state = asyncio.run(build_graph(first_worker).aget_state(config("visitor"))).values
+    assert state["messages"] == ["question 1", "réponse", "question 2", "réponse"]
+
+
+def test_unknown_session_has_no_state(db_path):
+    saver = BoundedMemorySaver(SessionMemoryParams(sqlite_path=db_path))
+    assert saver.get_tuple(config("nobody")) is None
+    assert asyncio.run(saver.aget_tuple(config("nobody"))) is None
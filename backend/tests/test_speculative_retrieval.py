@@ -0,0 +1,114 @@
+import asyncio
+import uuid
+from concurrent.futures import Future
+from datetime import datetime
+
+import pytest
+
+from app.models.document_model import DocumentModel
+from app.services.rag.intent_router import IntentRouterParams
+from app.services.rag.speculative_retrieval import (
+    Speculation,
+    SpeculativeRetrievalParams,
+    SpeculativeRetriever,
+    normalize_query,
+)
+
+
+def speculation(question: str = "Quels sont tes projets ?") -> Speculation:
+    return Speculation(question=question, future=Future())
+
+
+def test_normalized_queries_are_accepted():
+    retriever = SpeculativeRetriever()
+    assert normalize_query("  Quels sont   TES projets ?") == "quels sont tes projets"
+    assert retriever.accepts(speculation(), "quels sont tes projets", None)
+    assert retriever.stats()["hits"] == 1
+
+
+def test_category_filter_or_dissimilar_query_is_rejected_and_cancels_the_search():
+    retriever = SpeculativeRetriever()
+
+    filtered = speculation()
+    assert not retriever.accepts(filtered, "Quels sont tes projets ?", "Projets")
+    assert filtered.future.cancelled()
+
+    different = speculation()
+    assert retriever.needs_vectors(different, "Où as-tu étudié ?", None)
+    assert not retriever.accepts(different, "Où as-tu étudié ?", None, [1.0, 0.0], [0.0, 1.0])
+    assert different.future.cancelled()
+    assert retriever.stats()["misses"] == 2
+
+
+def test_similar_query_is_accepted_above_the_threshold():
+    retriever = SpeculativeRetriever(SpeculativeRetrievalParams(min_similarity=0.9))
+    assert retriever.accepts(speculation(), "Tes projets ?", None, [1.0, 0.1], [1.0, 0.0])
+
+
+def test_oldest_pending_searches_are_cancelled_over_the_limit():
+    retriever = SpeculativeRetriever(SpeculativeRetrievalParams(max_pending=2))
+    searches = [speculation() for _ in range(3)]
+    for i, search in enumerate(searches):
+        retriever.register(f"call_{i}", search)
+
+    assert searches[0].future.cancelled()
+    assert retriever.claim("call_0") is None
+    assert retriever.claim("call_2") is searches[2]
+    assert retriever.stats()["pending"] == 1
+
+
+DOCUMENTS = [
+    DocumentModel(id="1", title="Chatbot", text="Un chatbot RAG en Python.", category="Projets",
+                  updated_at=datetime(2025, 1, 1)),
+]
+
+
+@pytest.fixture
+def pipeline(make_store, make_pipeline):
+    store = make_store()
+    store.add_documents(DOCUMENTS)
+    return make_pipeline(store=store, intent_router_params=IntentRouterParams(enabled=False))
+
+
+@pytest.fixture
+def searches(pipeline, monkeypatch) -> list:
+    """Record the similarity searches run on the pipeline's store."""
+    searches = []
+    search = pipeline.vector_store.similarity_search
+
+    def recording_search(query, k=10, category=None):
+        searches.append(query)
+        return search(query, k, category)
+
+    monkeypatch.setattr(pipeline.vector_store, "similarity_search", recording_search)
+    return searches
+
+
+def test_retrieve_reuses_the_search_started_on_the_user_message(pipeline, searches):
+    asyncio.run(pipeline.aexecute("Quels sont tes projets ?", uuid.uuid4().hex))
+
+    assert searches == ["Quels sont tes projets ?"]
+    assert pipeline.speculative.stats() == {"hits": 1, "misses": 0, "discarded": 0, "pending": 0}
+    assert "Un chatbot RAG en Python." in pipeline.llm.prompts[-1][0].content
+
+
+def test_search_is_discarded_when_the_llm_answers_directly(pipeline, searches):
+    asyncio.run(pipeline.aexecute("Bonjour", uuid.uuid4().hex))
+
+    assert pipeline.speculative.stats()["discarded"] == 1
+    assert pipeline.speculative.stats()["pending"] == 0
+
+
+def test_disabled_speculation_searches_only_for_the_tool_call(make_store, make_pipeline):
+    store = make_store()
+    store.add_documents(DOCUMENTS)
+    pipeline = make_pipeline(
+        store=store,
+        intent_router_params=IntentRouterParams(enabled=False),
+        speculative_params=SpeculativeRetrievalParams(enabled=False),
+    )
+
+    asyncio.run(pipeline.aexecute("Quels sont tes projets ?", uuid.uuid4().hex))
+
+    assert pipeline.speculative.stats() == {"hits": 0, "misses": 0, "discarded": 0, "pending": 0}
+    assert "Un chatbot RAG en Python." in pipeline.llm.prompts[-1][0].content
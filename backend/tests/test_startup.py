@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import routes_health
+from app.core.startup import ComponentState, LazyComponent, StartupManager
+
+
+class Gate:
+    """Factory blocking until opened, counting its calls."""
+
+    def __init__(self, result="instance", error: Exception = None):
+        self.result, self.error = result, error
+        self.calls = 0
+        self.opened = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.opened.wait(5)
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def wait_until(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def manager(monkeypatch) -> StartupManager:
+    manager = StartupManager()
+    monkeypatch.setattr(routes_health, "startup", manager)
+    return manager
+
+
+@pytest.fixture
+def client() -> TestClient:
+    app = FastAPI()
+    app.include_router(routes_health.router)
+    return TestClient(app)
+
+
+def test_component_is_built_once_for_concurrent_callers():
+    gate = Gate()
+    component = LazyComponent("model", gate)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(component.get())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+
+    gate.opened.set()
+    for thread in threads:
+        thread.join()
+
+    assert results == ["instance"] * 4
+    assert gate.calls == 1 and component.ready
+
+
+def test_failed_build_is_reported_and_retried():
+    gate = Gate(error=RuntimeError("Chroma unreachable"))
+    gate.opened.set()
+    component = LazyComponent("vector store", gate)
+
+    with pytest.raises(RuntimeError):
+        component.get()
+    assert component.status()["state"] == ComponentState.FAILED.value
+    assert component.status()["error"] == "Chroma unreachable"
+
+    gate.error = None
+    assert component.get() == "instance"
+    assert component.status()["error"] is None
+
+
+def test_ready_answers_503_until_the_warmup_finishes(manager, client):
+    fast, slow = Gate("llm"), Gate("model")
+    fast.opened.set()
+    manager.register(LazyComponent("chat_model", fast))
+    manager.register(LazyComponent("embedding_store", slow))
+
+    warmup = threading.Thread(target=asyncio.run, args=(manager.warmup(),))
+    warmup.start()
+    wait_until(lambda: manager.components[0].ready and slow.calls == 1)
+
+    assert client.get("/health").json() == {"status": "alive"}
+    response = client.get("/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "loading"
+    assert response.json()["components"]["chat_model"]["state"] == "ready"
+    assert response.json()["components"]["embedding_store"]["state"] == "loading"
+
+    slow.opened.set()
+    warmup.join()
+
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert response.json()["cold_start_seconds"] is not None
@@ -0,0 +1,52 @@
+"""
+Golden-file tests of the text normalization.
+
+Each `tests/golden/text_cleaner/<name>.md` input comes with the expected output of
+clean_text and clean_markdown, produced by the implementations they replaced (kept as
+references in benchmarks/text_normalization.py). Faster rewrites must keep them identical.
+"""
+from pathlib import Path
+
+import pytest
+
+from app.utils.text_cleaner import MarkdownStreamCleaner, clean_markdown, clean_text
+
+GOLDEN_DIR = Path(__file__).parent / "golden" / "text_cleaner"
+INPUTS = sorted(GOLDEN_DIR.glob("*.md"))
+
+
+def read(path: Path) -> str:
+    """Read a golden file exactly, line endings included."""
+    with open(path, encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def expected(path: Path, function: str) -> str:
+    return read(path.with_suffix(f".{function}.txt"))
+
+
+@pytest.mark.parametrize("path", INPUTS, ids=lambda path: path.stem)
+def test_clean_text_matches_golden(path):
+    assert clean_text(read(path)) == expected(path, "clean_text")
+
+
+@pytest.mark.parametrize("path", INPUTS, ids=lambda path: path.stem)
+def test_clean_markdown_matches_golden(path):
+    assert clean_markdown(read(path)) == expected(path, "clean_markdown")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64])
+@pytest.mark.parametrize("path", INPUTS, ids=lambda path: path.stem)
+def test_streamed_markdown_matches_golden(path, chunk_size):
+    text = read(path)
+    cleaner = MarkdownStreamCleaner()
+    pieces = [cleaner.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size)]
+    pieces.append(cleaner.flush())
+    assert "".join(pieces) == expected(path, "clean_markdown")
+
+
+def test_golden_corpus_is_present():
+    assert INPUTS
+    for path in INPUTS:
+        assert path.with_suffix(".clean_text.txt").exists()
+        assert path.with_suffix(".clean_markdown.txt").exists()